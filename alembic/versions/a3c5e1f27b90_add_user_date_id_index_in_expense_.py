@@ -0,0 +1,36 @@
+"""Add (user_id, date, id) index in Expense and Income models.
+
+Revision ID: a3c5e1f27b90
+Revises: 4fcfaf6680e4
+Create Date: 2026-10-18 12:10:42.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e1f27b90'
+down_revision: Union[str, Sequence[str], None] = '4fcfaf6680e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_expense_user_id_date_id', 'expense',
+        ['user_id', 'date', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_income_user_id_date_id', 'income',
+        ['user_id', 'date', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_income_user_id_date_id', table_name='income')
+    op.drop_index('ix_expense_user_id_date_id', table_name='expense')
@@ -0,0 +1,72 @@
+"""Add full-text search index on Expense and Income descriptions.
+
+Revision ID: b5d9e3a47c12
+Revises: e4b82f61d3c7
+Create Date: 2026-10-18 15:02:11.482630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d9e3a47c12'
+down_revision: Union[str, Sequence[str], None] = 'e4b82f61d3c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('expense', 'income')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == 'postgresql':
+            op.execute(
+                f'CREATE INDEX ix_{table}_description_fts ON {table} '
+                "USING gin (to_tsvector('simple', "
+                "coalesce(description, '')))"
+            )
+        elif dialect == 'sqlite':
+            fts = f'{table}_fts'
+            insert_new = (
+                f'INSERT INTO {fts}(rowid, description, user_id) '
+                'VALUES (new.id, new.description, new.user_id);'
+            )
+            delete_old = (
+                f"INSERT INTO {fts}({fts}, rowid, description, user_id) "
+                "VALUES ('delete', old.id, old.description, old.user_id);"
+            )
+            op.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5(description, "
+                f"user_id, content='{table}', content_rowid='id', "
+                "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+            )
+            op.execute(
+                f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} '
+                f'BEGIN {insert_new} END'
+            )
+            op.execute(
+                f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} '
+                f'BEGIN {delete_old} END'
+            )
+            op.execute(
+                f'CREATE TRIGGER {fts}_au AFTER UPDATE OF description, '
+                f'user_id ON {table} BEGIN {delete_old} {insert_new} END'
+            )
+            # Индексирует уже существующие записи
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table in reversed(TABLES):
+        if dialect == 'postgresql':
+            op.drop_index(f'ix_{table}_description_fts', table_name=table)
+        elif dialect == 'sqlite':
+            for trigger in ('au', 'ad', 'ai'):
+                op.execute(f'DROP TRIGGER {table}_fts_{trigger}')
+            op.execute(f'DROP TABLE {table}_fts')
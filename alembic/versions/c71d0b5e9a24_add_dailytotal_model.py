@@ -0,0 +1,48 @@
+"""Add DailyTotal model.
+
+Revision ID: c71d0b5e9a24
+Revises: a3c5e1f27b90
+Create Date: 2026-10-18 13:05:17.904412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71d0b5e9a24'
+down_revision: Union[str, Sequence[str], None] = 'a3c5e1f27b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REBUILD_SQL = """
+INSERT INTO daily_totals (user_id, kind, category_id, day, amount_sum, count)
+SELECT user_id, '{kind}', category_id, date(date), sum(amount), count(id)
+FROM {kind}
+GROUP BY user_id, category_id, date(date)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False, comment='Вид записи'),
+    sa.Column('category_id', sa.Integer(), nullable=False, comment='ID категории'),
+    sa.Column('day', sa.Date(), nullable=False, comment='День'),
+    sa.Column('amount_sum', sa.Numeric(precision=14, scale=2), nullable=False, comment='Сумма за день'),
+    sa.Column('count', sa.Integer(), nullable=False, comment='Количество записей'),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'kind', 'category_id', 'day', name='uq_daily_totals_user_id_kind_category_id_day')
+    )
+    for kind in ('expense', 'income'):
+        op.execute(REBUILD_SQL.format(kind=kind))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_totals')
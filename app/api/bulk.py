@@ -0,0 +1,106 @@
+"""Пакетный импорт расходов и доходов с построчным отчетом об ошибках."""
+import codecs
+import csv
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+
+BULK_BATCH_SIZE = 1000
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def read_csv_rows(file: UploadFile) -> Iterator[dict[str, Any]]:
+    """Построчно читает CSV с заголовком; пустые ячейки пропускаются,
+    чтобы сработали значения по умолчанию схемы."""
+    lines = codecs.iterdecode(file.file, 'utf-8-sig')
+    for row in csv.DictReader(lines):
+        yield {key: value for key, value in row.items() if value != ''}
+
+
+def format_validation_error(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+
+async def import_rows(
+        rows: Iterable[dict[str, Any]], schema: type[BaseModel], crud,
+        category_registry, user: User, session: AsyncSession
+) -> dict:
+    """Проверяет строки схемой и существование категорий по кэшу
+    категорий и вставляет корректные строки пакетами.
+
+    Первый промах по кэшу сверяет его версию с БД. Если пакет все же
+    нарушил внешний ключ (категорию удалили через другой воркер), кэш
+    перечитывается, строки удаленных категорий попадают в ошибки, а
+    остальные вставляются повторно."""
+    category_ids = await category_registry.get_ids(session)
+    refreshed = False
+    created, errors = 0, []
+    for batch in batched(enumerate(rows, start=1), BULK_BATCH_SIZE):
+        valid = []
+        for index, row in batch:
+            try:
+                obj = schema.model_validate(row)
+            except ValidationError as error:
+                errors.append(
+                    {'row': index, 'errors': format_validation_error(error)}
+                )
+                continue
+            if obj.category_id not in category_ids and not refreshed:
+                category_ids = await category_registry.get_ids(
+                    session, force=True
+                )
+                refreshed = True
+            if obj.category_id not in category_ids:
+                errors.append(category_error(index, obj.category_id))
+                continue
+            valid.append((index, obj.model_dump()))
+        try:
+            created += await crud.bulk_create(
+                [data for _, data in valid], session, user=user
+            )
+        except IntegrityError:
+            await session.rollback()
+            # Откат сбрасывает загруженные атрибуты пользователя,
+            # а bulk_create читает его id
+            await session.refresh(user)
+            await category_registry.load(session)
+            category_ids = await category_registry.get_ids(session)
+            missing = [
+                (index, data) for index, data in valid
+                if data['category_id'] not in category_ids
+            ]
+            if not missing:
+                raise
+            errors.extend(
+                category_error(index, data['category_id'])
+                for index, data in missing
+            )
+            created += await crud.bulk_create(
+                [
+                    data for _, data in valid
+                    if data['category_id'] in category_ids
+                ],
+                session, user=user
+            )
+    errors.sort(key=lambda error: error['row'])
+    return {'created': created, 'errors': errors}
+
+
+def category_error(row: int, category_id: int) -> dict:
+    return {'row': row, 'errors': [
+        f'Категория с идентификатором {category_id} не найдена!'
+    ]}
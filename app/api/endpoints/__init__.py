@@ -1,3 +1,12 @@
+from .balance import router as balance_router  # noqa
+from .budget import router as budget_router  # noqa
 from .category import router as category_router  # noqa
 from .expense import router as expense_router  # noqa
+from .export import router as export_router  # noqa
 from .income import router as income_router  # noqa
+from .metrics import router as metrics_router  # noqa
+from .recurring import router as recurring_router  # noqa
+from .search import router as search_router  # noqa
+from .stats import router as stats_router  # noqa
+from .summary import router as summary_router  # noqa
+from .trends import router as trends_router  # noqa
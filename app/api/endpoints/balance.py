@@ -0,0 +1,126 @@
+from datetime import datetime as dt, timedelta
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Query
+from pydantic import TypeAdapter
+
+from app.api.validators import check_timezone, check_trend_range
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.db import SessionDep
+from app.core.periods import MONTH, bucket_starts, next_bucket
+from app.core.trends import (
+    DEFAULT_TREND_DAYS, fill_gaps, to_local, to_storage)
+from app.core.user import CurrentUserDep
+from app.crud.balance import balance_crud
+from app.crud.cache_version import cache_version_crud
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+from app.crud.ledger import ledger_version_name
+from app.schemas.balance import Balance, BalanceSeries
+from app.schemas.trends import TrendBucketSize
+
+router = APIRouter()
+
+BALANCE = TypeAdapter(Balance)
+BALANCE_SERIES = TypeAdapter(BalanceSeries)
+
+
+@router.get(
+    '', response_model=Balance,
+    summary='Получить баланс на момент.',
+    description=(
+        'Возвращает доходы минус расходы пользователя по записям с датой '
+        'до at (по умолчанию — текущий момент) часового пояса tz. Баланс '
+        'считается по месячному снимку и записям одного месяца; '
+        'недостающие снимки сохраняются, поэтому запрос идет в основную '
+        'БД.'
+    ),
+    response_description='Баланс на момент.'
+)
+async def get_balance(
+    user: CurrentUserDep, session: SessionDep, at: Optional[dt] = None,
+    tz: str = settings.ledger_timezone
+):
+    zone = check_timezone(tz)
+    at = to_local(at, zone) if at else dt.now(zone).replace(tzinfo=None)
+
+    async def compute():
+        balance = await balance_crud.get_balance(
+            session, user.id, to_storage(at, zone)
+        )
+        return BALANCE.validate_python({
+            'at': at.replace(tzinfo=zone), 'tz': tz, 'balance': balance,
+        })
+
+    return await response_cache.get_or_compute(
+        'balance', user.id,
+        await cache_version_crud.get_version(
+            ledger_version_name(user.id), session
+        ),
+        {'at': at, 'tz': tz}, BALANCE, compute
+    )
+
+
+@router.get(
+    '/series', response_model=BalanceSeries,
+    summary='Получить баланс по дням, неделям или месяцам.',
+    description=(
+        'Возвращает баланс на начало диапазона [from, to) часового пояса '
+        'tz и для каждого интервала bucket — его доходы, расходы и баланс '
+        'на его конец. Диапазон расширяется до целых интервалов.'
+    ),
+    response_description='Баланс по интервалам.'
+)
+async def get_balance_series(
+    user: CurrentUserDep, session: SessionDep,
+    bucket: TrendBucketSize = MONTH,
+    start: Annotated[Optional[dt], Query(alias='from')] = None,
+    end: Annotated[Optional[dt], Query(alias='to')] = None,
+    tz: str = settings.ledger_timezone
+):
+    zone = check_timezone(tz)
+    end = to_local(end, zone) if end else dt.now(zone).replace(tzinfo=None)
+    start = (
+        to_local(start, zone) if start
+        else end - timedelta(days=DEFAULT_TREND_DAYS[bucket])
+    )
+    check_trend_range(start, end, bucket)
+    starts = bucket_starts(start, end, bucket)
+    start, end = starts[0], next_bucket(starts[-1], bucket)
+
+    async def compute():
+        balance = float(await balance_crud.get_balance(
+            session, user.id, to_storage(start, zone)
+        ))
+        opening, totals = balance, {}
+        for crud in (income_crud, expense_crud):
+            rows = await crud.get_bucket_totals(
+                user, session, starts, bucket, zone, False
+            )
+            totals[crud.kind] = fill_gaps(rows, starts, False)
+        points = []
+        for income, expense in zip(
+                totals[income_crud.kind], totals[expense_crud.kind]
+        ):
+            balance += income['total'] - expense['total']
+            points.append({
+                'start': income['start'].replace(tzinfo=zone),
+                'income': income['total'], 'expense': expense['total'],
+                'balance': round(balance, 2),
+            })
+        return BALANCE_SERIES.validate_python({
+            'bucket': bucket, 'tz': tz,
+            'start': start.replace(tzinfo=zone),
+            'end': end.replace(tzinfo=zone),
+            'opening': opening, 'points': points,
+        })
+
+    return await response_cache.get_or_compute(
+        'balance_series', user.id,
+        await cache_version_crud.get_version(
+            ledger_version_name(user.id), session
+        ),
+        {'bucket': bucket, 'start': start, 'end': end, 'tz': tz},
+        BALANCE_SERIES, compute
+    )
@@ -0,0 +1,83 @@
+from datetime import datetime as dt
+from typing import Optional
+
+from fastapi import APIRouter
+
+from app.api.validators import (
+    check_budget_duplicate, check_category_fk, check_category_ids_exist,
+    check_own_found)
+from app.core.category_registry import expense_category_registry
+from app.core.db import ReadSessionDep, SessionDep
+from app.core.user import CurrentUserDep
+from app.crud.budget import budget_crud
+from app.schemas.budget import (
+    BudgetCreate, BudgetDB, BudgetStatus, BudgetUpdate)
+
+router = APIRouter()
+
+NOT_FOUND = 'Бюджет с идентификатором {} не найден!'
+FORBIDDEN = 'Изменять и удалять чужие бюджеты запрещено!'
+
+
+@router.post(
+    '', response_model=BudgetDB,
+    summary='Создать бюджет категории расходов.',
+    description=(
+        'Создает лимит расходов пользователя по категории за день, неделю '
+        'или месяц. У категории может быть по одному бюджету на период.'
+    ),
+    response_description='Созданный бюджет.'
+)
+async def create_budget(
+    obj_in: BudgetCreate, session: SessionDep, user: CurrentUserDep
+):
+    await check_category_ids_exist(
+        {obj_in.category_id}, expense_category_registry, session
+    )
+    await check_budget_duplicate(
+        user.id, obj_in.category_id, obj_in.period, session
+    )
+    async with check_category_fk(
+        {obj_in.category_id}, expense_category_registry, session
+    ):
+        return await budget_crud.create(obj_in, session, user=user)
+
+
+@router.get(
+    '', response_model=list[BudgetStatus],
+    summary='Получить бюджеты пользователя с их использованием.',
+    description=(
+        'Возвращает бюджеты пользователя и потраченное по каждому за '
+        'период, в который попадает момент at (по умолчанию — текущий).'
+    ),
+    response_description='Бюджеты и их использование.'
+)
+async def get_budgets(
+    user: CurrentUserDep, session: ReadSessionDep, at: Optional[dt] = None
+):
+    return await budget_crud.get_statuses(
+        session, user.id, at or dt.now()
+    )
+
+
+@router.patch('/{budget_id}', response_model=BudgetDB)
+async def update_budget(
+    budget_id: int, obj_in: BudgetUpdate, user: CurrentUserDep,
+    session: SessionDep
+):
+    budget = await budget_crud.update(
+        budget_id, obj_in=obj_in, user=user, session=session
+    )
+    return await check_own_found(
+        budget, budget_id, budget_crud, session, NOT_FOUND, FORBIDDEN
+    )
+
+
+@router.delete('/{budget_id}', response_model=BudgetDB)
+async def delete_budget(
+    budget_id: int, user: CurrentUserDep, session: SessionDep
+):
+    budget = await budget_crud.remove(budget_id, session, user=user)
+    return await check_own_found(
+        budget, budget_id, budget_crud, session, NOT_FOUND, FORBIDDEN
+    )
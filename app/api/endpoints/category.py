@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
 from app.api.validators import (
-    check_expense_category_exists, check_expense_category_name_duplicate,
-    check_income_category_exists, check_income_category_name_duplicate)
-from app.core.db import SessionDep
+    check_expense_category_found, check_expense_category_name_duplicate,
+    check_income_category_found, check_income_category_name_duplicate)
+from app.core.category_registry import (
+    expense_category_registry, income_category_registry)
+from app.core.db import ReadSessionDep, SessionDep
+from app.core.etag import conditional_response
 from app.core.user import current_superuser
 from app.crud.category import expense_category_crud, income_category_crud
 from app.schemas.category import (
@@ -29,6 +32,7 @@ async def create_expense_category(
     """Создает новую категорию расходов."""
     await check_expense_category_name_duplicate(obj_in.name, session)
     new_category = await expense_category_crud.create(obj_in, session)
+    await expense_category_registry.invalidate(session)
     return new_category
 
 
@@ -36,12 +40,21 @@ async def create_expense_category(
     '/expense',
     response_model=list[CategoryDB],
     summary='Получить все категории расходов.',
-    description='Возвращает список всех категорий расходов.',
+    description=('Возвращает список всех категорий расходов. Ответ '
+                 'содержит ETag; при совпадении If-None-Match '
+                 'возвращается 304.'),
     response_description='Список всех категорий расходов.'
 )
-async def get_expense_category(session: SessionDep):
+async def get_expense_category(
+    session: ReadSessionDep, request: Request, response: Response
+):
     """Возвращает список всех категорий расходов"""
-    all_categories = await expense_category_crud.get_multi(session)
+    all_categories = await expense_category_registry.get_all(session)
+    not_modified = conditional_response(
+        request, response, expense_category_registry.version
+    )
+    if not_modified is not None:
+        return not_modified
     return all_categories
 
 
@@ -57,12 +70,15 @@ async def update_expense_category(
     category_id: int, obj_in: CategoryUpdate, session: SessionDep
 ):
     """Обновляет информацию о существующей категории расходов."""
-    category = await check_expense_category_exists(category_id, session)
     if obj_in.name is not None:
         await check_expense_category_name_duplicate(obj_in.name, session)
-    category = await expense_category_crud.update(
-        db_obj=category, obj_in=obj_in, session=session
+    category = check_expense_category_found(
+        await expense_category_crud.update(
+            category_id, obj_in=obj_in, session=session
+        ),
+        category_id
     )
+    await expense_category_registry.invalidate(session)
     return category
 
 
@@ -76,8 +92,10 @@ async def update_expense_category(
 )
 async def delete_expense_category(category_id: int, session: SessionDep):
     """Удаляет категорию расходов"""
-    category = await check_expense_category_exists(category_id, session)
-    category = await expense_category_crud.remove(category, session)
+    category = check_expense_category_found(
+        await expense_category_crud.remove(category_id, session), category_id
+    )
+    await expense_category_registry.invalidate(session)
     return category
 
 
@@ -97,6 +115,7 @@ async def create_income_category(
     """Создает новую категорию доходов."""
     await check_income_category_name_duplicate(obj_in.name, session)
     new_category = await income_category_crud.create(obj_in, session)
+    await income_category_registry.invalidate(session)
     return new_category
 
 
@@ -104,12 +123,21 @@ async def create_income_category(
     '/income',
     response_model=list[CategoryDB],
     summary='Получить все категории доходов.',
-    description='Возвращает список всех категорий доходов.',
+    description=('Возвращает список всех категорий доходов. Ответ '
+                 'содержит ETag; при совпадении If-None-Match '
+                 'возвращается 304.'),
     response_description='Список всех категорий доходов.'
 )
-async def get_income_category(session: SessionDep):
+async def get_income_category(
+    session: ReadSessionDep, request: Request, response: Response
+):
     """Возвращает список всех категорий доходов"""
-    all_categories = await income_category_crud.get_multi(session)
+    all_categories = await income_category_registry.get_all(session)
+    not_modified = conditional_response(
+        request, response, income_category_registry.version
+    )
+    if not_modified is not None:
+        return not_modified
     return all_categories
 
 
@@ -125,12 +153,15 @@ async def update_income_category(
     category_id: int, obj_in: CategoryUpdate, session: SessionDep
 ):
     """Обновляет информацию о существующей категории доходов."""
-    category = await check_income_category_exists(category_id, session)
     if obj_in.name is not None:
         await check_income_category_name_duplicate(obj_in.name, session)
-    category = await income_category_crud.update(
-        db_obj=category, obj_in=obj_in, session=session
+    category = check_income_category_found(
+        await income_category_crud.update(
+            category_id, obj_in=obj_in, session=session
+        ),
+        category_id
     )
+    await income_category_registry.invalidate(session)
     return category
 
 
@@ -144,6 +175,8 @@ async def update_income_category(
 )
 async def delete_income_category(category_id:int, session:SessionDep):
     """Удаляет категорию доходов"""
-    category = await check_income_category_exists(category_id, session)
-    category = await income_category_crud.remove(category, session)
+    category = check_income_category_found(
+        await income_category_crud.remove(category_id, session), category_id
+    )
+    await income_category_registry.invalidate(session)
     return category
@@ -1,59 +1,233 @@
-from typing import Annotated
+from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter, Body, Depends, Query, Request, Response, UploadFile)
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.validators import check_expense_exists, check_user_own_expense
-from app.core.db import SessionDep
+from app.api.bulk import import_rows, read_csv_rows
+from app.api.validators import (
+    check_bulk_filter_not_empty, check_bulk_patch_not_empty,
+    check_category_fk, check_category_ids_exist, check_cursor, check_fields,
+    check_own_found)
+from app.core.category_registry import expense_category_registry
+from app.core.db import ReadSessionDep, SessionDep
+from app.core.etag import conditional_response
+from app.core.pagination import (
+    DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, NEXT_CURSOR_HEADER, cut_page,
+    with_cursor_fields)
+from app.core.serialization import rows_response, schema_fields
 from app.core.user import CurrentUserDep
+from app.crud.budget import budget_crud
+from app.crud.cache_version import cache_version_crud
 from app.crud.expense import expense_crud
-from app.schemas.expense import ExpenseDB, ExpenseCreate, ExpenseUpdate
+from app.crud.ledger import ledger_version_name
+from app.models import Expense
+from app.schemas.bulk import BulkAffected, BulkResult
+from app.schemas.expense import (
+    ExpenseBulkFilter, ExpenseBulkUpdate, ExpenseDB, ExpenseCreate,
+    ExpenseFilter, ExpenseUpdate, ExpenseWithBudgets)
 
 router = APIRouter()
 
+NOT_FOUND = 'Расход с идентификатором {} не найден!'
+FORBIDDEN = 'Изменять и удалять чужие расходы запрещено!'
+
+EXPENSE_FIELDS = schema_fields(ExpenseDB)
+
+
+async def with_budgets(
+    expense: Expense, session: AsyncSession
+) -> ExpenseWithBudgets:
+    """Добавляет к расходу состояние бюджетов его категории за периоды,
+    в которые попадает его дата. Потраченное читается из сумм бюджетов по
+    ключу, без суммирования расходов."""
+    budgets = await budget_crud.get_statuses(
+        session, expense.user_id, expense.date,
+        category_id=expense.category_id
+    )
+    return ExpenseWithBudgets(
+        **ExpenseDB.model_validate(expense).model_dump(), budgets=budgets
+    )
+
 
 @router.post(
-    '', response_model=ExpenseDB,
+    '', response_model=ExpenseWithBudgets,
     summary='Создает новый расход.',
-    description='Создание нового расхода.',
+    description=(
+        'Создание нового расхода. Ответ содержит состояние бюджетов '
+        'категории с учетом этого расхода.'
+    ),
     response_description='Созданный расход с присвоенным ID и другими полями'
 )
 async def create_expense(
     obj_in: ExpenseCreate, session: SessionDep, user: CurrentUserDep
 ):
-    new_expense = await expense_crud.create(obj_in, session, user=user)
-    return new_expense
+    await check_category_ids_exist(
+        {obj_in.category_id}, expense_category_registry, session
+    )
+    async with check_category_fk(
+        {obj_in.category_id}, expense_category_registry, session
+    ):
+        new_expense = await expense_crud.create(obj_in, session, user=user)
+    return await with_budgets(new_expense, session)
+
+
+@router.post(
+    '/bulk', response_model=BulkResult,
+    summary='Импортировать пакет расходов.',
+    description=(
+        'Принимает JSON-массив расходов. Корректные строки вставляются '
+        'пакетами, по каждой некорректной возвращается список ошибок.'
+    ),
+    response_description='Количество созданных записей и ошибки по строкам.'
+)
+async def bulk_create_expense(
+    rows: Annotated[list[dict[str, Any]], Body()],
+    session: SessionDep, user: CurrentUserDep
+):
+    return await import_rows(
+        rows, ExpenseCreate, expense_crud, expense_category_registry,
+        user, session
+    )
+
+
+@router.post(
+    '/bulk/csv', response_model=BulkResult,
+    summary='Импортировать расходы из CSV.',
+    description=(
+        'Принимает CSV-файл с заголовком из полей расхода. Корректные '
+        'строки вставляются пакетами, по каждой некорректной возвращается '
+        'список ошибок.'
+    ),
+    response_description='Количество созданных записей и ошибки по строкам.'
+)
+async def bulk_create_expense_csv(
+    file: UploadFile, session: SessionDep, user: CurrentUserDep
+):
+    return await import_rows(
+        read_csv_rows(file), ExpenseCreate, expense_crud,
+        expense_category_registry, user, session
+    )
 
 
 @router.get(
-    '', response_model=list[ExpenseDB]
+    '', response_model=list[ExpenseDB],
+    summary='Получить расходы пользователя постранично.',
+    description=(
+        'Возвращает страницу расходов от новых к старым. Курсор следующей '
+        f'страницы передается в заголовке {NEXT_CURSOR_HEADER}. Ответ '
+        'содержит ETag; при совпадении If-None-Match возвращается 304.'
+    ),
+    response_description='Страница расходов пользователя.'
+)
+async def get_expense_by_user(
+    user: CurrentUserDep, session: ReadSessionDep, request: Request,
+    response: Response, filters: Annotated[ExpenseFilter, Depends()],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    cursor: Optional[str] = None,
+    fields: Annotated[Optional[str], Query(
+        description=(
+            'Поля расхода через запятую, например amount,date,category_id. '
+            'По умолчанию возвращаются все поля.'
+        )
+    )] = None
+):
+    after = check_cursor(cursor)
+    fields = check_fields(fields, EXPENSE_FIELDS)
+    version = await cache_version_crud.get_version(
+        ledger_version_name(user.id), session
+    )
+    not_modified = conditional_response(request, response, user.id, version)
+    if not_modified is not None:
+        return not_modified
+    expenses = await expense_crud.get_all_expense_by_user(
+        user, session, filters=filters, limit=limit + 1, after=after,
+        fields=with_cursor_fields(fields)
+    )
+    expenses, next_cursor = cut_page(expenses, limit)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows_response(expenses, fields, response)
+
+
+@router.patch(
+    '/bulk', response_model=BulkAffected,
+    summary='Изменить расходы по фильтру.',
+    description=(
+        'Применяет патч ко всем расходам пользователя, подходящим под '
+        'фильтр, одним запросом UPDATE.'
+    ),
+    response_description='ID измененных записей.'
+)
+async def bulk_update_expense(
+    obj_in: ExpenseBulkUpdate, session: SessionDep, user: CurrentUserDep
+):
+    check_bulk_filter_not_empty(obj_in.filter)
+    patch = obj_in.patch.model_dump(exclude_unset=True)
+    check_bulk_patch_not_empty(patch)
+    if patch.get('category_id') is not None:
+        await check_category_ids_exist(
+            {patch['category_id']}, expense_category_registry, session
+        )
+    async with check_category_fk(
+        {patch.get('category_id')} - {None}, expense_category_registry,
+        session
+    ):
+        ids = await expense_crud.bulk_update(
+            obj_in.filter, patch, session, user=user
+        )
+    return {'ids': ids}
+
+
+@router.delete(
+    '/bulk', response_model=BulkAffected,
+    summary='Удалить расходы по фильтру.',
+    description=(
+        'Удаляет все расходы пользователя, подходящие под фильтр, '
+        'одним запросом DELETE.'
+    ),
+    response_description='ID удаленных записей.'
 )
-async def get_expense_by_user(user: CurrentUserDep, session: SessionDep):
-    expenses = await expense_crud.get_all_expense_by_user(user, session)
-    return expenses
+async def bulk_delete_expense(
+    filters: ExpenseBulkFilter, session: SessionDep, user: CurrentUserDep
+):
+    check_bulk_filter_not_empty(filters)
+    ids = await expense_crud.bulk_remove(filters, session, user=user)
+    return {'ids': ids}
 
 
 @router.patch(
-    '/{expense_id}', response_model=ExpenseDB
+    '/{expense_id}', response_model=ExpenseWithBudgets
 )
 async def update_expense(
     expense_id: int, obj_in: ExpenseUpdate, user: CurrentUserDep,
     session: SessionDep
 ):
-    expense = await check_expense_exists(expense_id, session)
-    expense = await expense_crud.update(
-        db_obj=expense,
-        obj_in=obj_in,
-        user=user,
-        session=session
+    if obj_in.category_id is not None:
+        await check_category_ids_exist(
+            {obj_in.category_id}, expense_category_registry, session
+        )
+    async with check_category_fk(
+        {obj_in.category_id} - {None}, expense_category_registry, session
+    ):
+        expense = await expense_crud.update(
+            expense_id,
+            obj_in=obj_in,
+            user=user,
+            session=session
+        )
+    expense = await check_own_found(
+        expense, expense_id, expense_crud, session, NOT_FOUND, FORBIDDEN
     )
-    return expense
+    return await with_budgets(expense, session)
 
 
-@router.delete('/{expense_id}', response_model=ExpenseDB)
+@router.delete('/{expense_id}', response_model=ExpenseWithBudgets)
 async def delete_expense(
     expense_id: int, user: CurrentUserDep, session: SessionDep
 ):
-    expense = await check_expense_exists(expense_id, session)
-    expense = await check_user_own_expense(expense, user, session)
-    expense = await expense_crud.remove(expense, session)
-    return expense
+    expense = await expense_crud.remove(expense_id, session, user=user)
+    expense = await check_own_found(
+        expense, expense_id, expense_crud, session, NOT_FOUND, FORBIDDEN
+    )
+    return await with_budgets(expense, session)
@@ -0,0 +1,69 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.db import ReadSessionDep
+from app.core.export import MEDIA_TYPES, export_chunks
+from app.core.user import CurrentUserDep
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+from app.schemas.expense import ExpenseDB, ExpenseFilter
+from app.schemas.export import ExportFormat
+from app.schemas.income import IncomeDB, IncomeFilter
+
+router = APIRouter()
+
+
+def export_response(
+        chunks, export_format: ExportFormat, name: str, compress: bool
+) -> StreamingResponse:
+    headers = {
+        'Content-Disposition':
+            f'attachment; filename="{name}.{export_format.value}"'
+    }
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    return StreamingResponse(
+        chunks, media_type=MEDIA_TYPES[export_format], headers=headers
+    )
+
+
+@router.get(
+    '/expense',
+    summary='Выгрузить все расходы пользователя.',
+    description=(
+        'Потоково выгружает расходы пользователя в CSV или NDJSON от '
+        'старых к новым. При gzip=true поток сжимается.'
+    ),
+    response_description='Файл с расходами.'
+)
+async def export_expense(
+    user: CurrentUserDep, session: ReadSessionDep,
+    filters: Annotated[ExpenseFilter, Depends()],
+    format: ExportFormat = ExportFormat.csv, gzip: bool = False
+):
+    rows = expense_crud.stream_by_user(user, session, filters=filters)
+    return export_response(
+        export_chunks(rows, ExpenseDB, format, gzip), format, 'expense', gzip
+    )
+
+
+@router.get(
+    '/income',
+    summary='Выгрузить все доходы пользователя.',
+    description=(
+        'Потоково выгружает доходы пользователя в CSV или NDJSON от '
+        'старых к новым. При gzip=true поток сжимается.'
+    ),
+    response_description='Файл с доходами.'
+)
+async def export_income(
+    user: CurrentUserDep, session: ReadSessionDep,
+    filters: Annotated[IncomeFilter, Depends()],
+    format: ExportFormat = ExportFormat.csv, gzip: bool = False
+):
+    rows = income_crud.stream_by_user(user, session, filters=filters)
+    return export_response(
+        export_chunks(rows, IncomeDB, format, gzip), format, 'income', gzip
+    )
@@ -1,15 +1,36 @@
-from typing import Annotated
+from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter, Body, Depends, Query, Request, Response, UploadFile)
 
-from app.api.validators import check_income_exists, check_user_own_income
-from app.core.db import SessionDep
+from app.api.bulk import import_rows, read_csv_rows
+from app.api.validators import (
+    check_bulk_filter_not_empty, check_bulk_patch_not_empty,
+    check_category_fk, check_category_ids_exist, check_cursor, check_fields,
+    check_own_found)
+from app.core.category_registry import income_category_registry
+from app.core.db import ReadSessionDep, SessionDep
+from app.core.etag import conditional_response
+from app.core.pagination import (
+    DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, NEXT_CURSOR_HEADER, cut_page,
+    with_cursor_fields)
+from app.core.serialization import rows_response, schema_fields
 from app.core.user import CurrentUserDep
+from app.crud.cache_version import cache_version_crud
 from app.crud.income import income_crud
-from app.schemas.income import IncomeDB, IncomeCreate, IncomeUpdate
+from app.crud.ledger import ledger_version_name
+from app.schemas.bulk import BulkAffected, BulkResult
+from app.schemas.income import (
+    IncomeBulkFilter, IncomeBulkUpdate, IncomeDB, IncomeCreate,
+    IncomeFilter, IncomeUpdate)
 
 router = APIRouter()
 
+NOT_FOUND = 'Доход с идентификатором {} не найден!'
+FORBIDDEN = 'Изменять и удалять чужие доходы запрещено!'
+
+INCOME_FIELDS = schema_fields(IncomeDB)
+
 
 @router.post(
     '', response_model=IncomeDB,
@@ -20,16 +41,138 @@ router = APIRouter()
 async def create_income(
     obj_in: IncomeCreate, session: SessionDep, user: CurrentUserDep
 ):
-    new_income = await income_crud.create(obj_in, session, user=user)
+    await check_category_ids_exist(
+        {obj_in.category_id}, income_category_registry, session
+    )
+    async with check_category_fk(
+        {obj_in.category_id}, income_category_registry, session
+    ):
+        new_income = await income_crud.create(obj_in, session, user=user)
     return new_income
 
 
+@router.post(
+    '/bulk', response_model=BulkResult,
+    summary='Импортировать пакет доходов.',
+    description=(
+        'Принимает JSON-массив доходов. Корректные строки вставляются '
+        'пакетами, по каждой некорректной возвращается список ошибок.'
+    ),
+    response_description='Количество созданных записей и ошибки по строкам.'
+)
+async def bulk_create_income(
+    rows: Annotated[list[dict[str, Any]], Body()],
+    session: SessionDep, user: CurrentUserDep
+):
+    return await import_rows(
+        rows, IncomeCreate, income_crud, income_category_registry,
+        user, session
+    )
+
+
+@router.post(
+    '/bulk/csv', response_model=BulkResult,
+    summary='Импортировать доходы из CSV.',
+    description=(
+        'Принимает CSV-файл с заголовком из полей дохода. Корректные '
+        'строки вставляются пакетами, по каждой некорректной возвращается '
+        'список ошибок.'
+    ),
+    response_description='Количество созданных записей и ошибки по строкам.'
+)
+async def bulk_create_income_csv(
+    file: UploadFile, session: SessionDep, user: CurrentUserDep
+):
+    return await import_rows(
+        read_csv_rows(file), IncomeCreate, income_crud,
+        income_category_registry, user, session
+    )
+
+
 @router.get(
-    '', response_model=list[IncomeDB]
+    '', response_model=list[IncomeDB],
+    summary='Получить доходы пользователя постранично.',
+    description=(
+        'Возвращает страницу доходов от новых к старым. Курсор следующей '
+        f'страницы передается в заголовке {NEXT_CURSOR_HEADER}. Ответ '
+        'содержит ETag; при совпадении If-None-Match возвращается 304.'
+    ),
+    response_description='Страница доходов пользователя.'
+)
+async def get_income_by_user(
+    user: CurrentUserDep, session: ReadSessionDep, request: Request,
+    response: Response, filters: Annotated[IncomeFilter, Depends()],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    cursor: Optional[str] = None,
+    fields: Annotated[Optional[str], Query(
+        description=(
+            'Поля дохода через запятую, например amount,date,category_id. '
+            'По умолчанию возвращаются все поля.'
+        )
+    )] = None
+):
+    after = check_cursor(cursor)
+    fields = check_fields(fields, INCOME_FIELDS)
+    version = await cache_version_crud.get_version(
+        ledger_version_name(user.id), session
+    )
+    not_modified = conditional_response(request, response, user.id, version)
+    if not_modified is not None:
+        return not_modified
+    income = await income_crud.get_all_income_by_user(
+        user, session, filters=filters, limit=limit + 1, after=after,
+        fields=with_cursor_fields(fields)
+    )
+    income, next_cursor = cut_page(income, limit)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows_response(income, fields, response)
+
+
+@router.patch(
+    '/bulk', response_model=BulkAffected,
+    summary='Изменить доходы по фильтру.',
+    description=(
+        'Применяет патч ко всем доходам пользователя, подходящим под '
+        'фильтр, одним запросом UPDATE.'
+    ),
+    response_description='ID измененных записей.'
 )
-async def get_income_by_user(user: CurrentUserDep, session: SessionDep):
-    income = await income_crud.get_all_income_by_user(user, session)
-    return income
+async def bulk_update_income(
+    obj_in: IncomeBulkUpdate, session: SessionDep, user: CurrentUserDep
+):
+    check_bulk_filter_not_empty(obj_in.filter)
+    patch = obj_in.patch.model_dump(exclude_unset=True)
+    check_bulk_patch_not_empty(patch)
+    if patch.get('category_id') is not None:
+        await check_category_ids_exist(
+            {patch['category_id']}, income_category_registry, session
+        )
+    async with check_category_fk(
+        {patch.get('category_id')} - {None}, income_category_registry,
+        session
+    ):
+        ids = await income_crud.bulk_update(
+            obj_in.filter, patch, session, user=user
+        )
+    return {'ids': ids}
+
+
+@router.delete(
+    '/bulk', response_model=BulkAffected,
+    summary='Удалить доходы по фильтру.',
+    description=(
+        'Удаляет все доходы пользователя, подходящие под фильтр, '
+        'одним запросом DELETE.'
+    ),
+    response_description='ID удаленных записей.'
+)
+async def bulk_delete_income(
+    filters: IncomeBulkFilter, session: SessionDep, user: CurrentUserDep
+):
+    check_bulk_filter_not_empty(filters)
+    ids = await income_crud.bulk_remove(filters, session, user=user)
+    return {'ids': ids}
 
 
 @router.patch(
@@ -39,21 +182,29 @@ async def update_income(
     income_id: int, obj_in: IncomeUpdate, user: CurrentUserDep,
     session: SessionDep
 ):
-    income = await check_income_exists(income_id, session)
-    income = await income_crud.update(
-        db_obj=income,
-        obj_in=obj_in,
-        user=user,
-        session=session
+    if obj_in.category_id is not None:
+        await check_category_ids_exist(
+            {obj_in.category_id}, income_category_registry, session
+        )
+    async with check_category_fk(
+        {obj_in.category_id} - {None}, income_category_registry, session
+    ):
+        income = await income_crud.update(
+            income_id,
+            obj_in=obj_in,
+            user=user,
+            session=session
+        )
+    return await check_own_found(
+        income, income_id, income_crud, session, NOT_FOUND, FORBIDDEN
     )
-    return income
 
 
 @router.delete('/{income_id}', response_model=IncomeDB)
 async def delete_income(
     income_id: int, user: CurrentUserDep, session: SessionDep
 ):
-    income = await check_income_exists(income_id, session)
-    income = await check_user_own_income(income, user, session)
-    income = await income_crud.remove(income, session)
-    return income
+    income = await income_crud.remove(income_id, session, user=user)
+    return await check_own_found(
+        income, income_id, income_crud, session, NOT_FOUND, FORBIDDEN
+    )
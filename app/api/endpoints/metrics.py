@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import response_cache
+from app.core.db import get_engines
+from app.core.metrics import (
+    CONTENT_TYPE, render_cache, render_pools, request_metrics)
+
+router = APIRouter()
+
+
+@router.get(
+    '/metrics', response_class=PlainTextResponse,
+    summary='Метрики в формате Prometheus.',
+    description=(
+        'Возвращает метрики текущего процесса в текстовом формате '
+        'Prometheus: длительность, коды ответов и число выражений SQL '
+        'запросов по шаблонам маршрутов, выполняемые запросы, состояние '
+        'пулов соединений и обращения к кэшу ответов.'
+    ),
+    response_description='Метрики в текстовом формате.',
+    include_in_schema=False
+)
+async def get_metrics():
+    lines = request_metrics.render()
+    lines += render_pools({
+        name: engine.pool for name, engine in get_engines().items()
+    })
+    lines += render_cache(response_cache.stats())
+    return PlainTextResponse(
+        '\n'.join(lines) + '\n', media_type=CONTENT_TYPE
+    )
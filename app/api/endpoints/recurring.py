@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+
+from app.api.validators import (
+    check_bulk_patch_not_empty, check_category_ids_exist, check_own_found,
+    check_recurring_range)
+from app.core.category_registry import (
+    expense_category_registry, income_category_registry)
+from app.core.db import ReadSessionDep, SessionDep
+from app.core.user import CurrentUserDep
+from app.crud.recurring import recurring_rule_crud
+from app.schemas.recurring import (
+    RecurringRuleCreate, RecurringRuleDB, RecurringRuleUpdate)
+
+router = APIRouter()
+
+NOT_FOUND = 'Правило с идентификатором {} не найдено!'
+FORBIDDEN = 'Изменять и удалять чужие правила запрещено!'
+
+CATEGORY_REGISTRIES = {
+    'expense': expense_category_registry,
+    'income': income_category_registry,
+}
+
+
+@router.post(
+    '', response_model=RecurringRuleDB,
+    summary='Создать правило повторяющейся записи.',
+    description=(
+        'Создает правило, по которому расход или доход заносится каждые '
+        'interval дней, недель или месяцев начиная с start_at. Записи '
+        'создает фоновый планировщик; повторения с датой в прошлом '
+        'заносятся при ближайшем его запуске.'
+    ),
+    response_description='Созданное правило.'
+)
+async def create_recurring_rule(
+    obj_in: RecurringRuleCreate, session: SessionDep, user: CurrentUserDep
+):
+    check_recurring_range(obj_in.start_at, obj_in.end_at)
+    await check_category_ids_exist(
+        {obj_in.category_id}, CATEGORY_REGISTRIES[obj_in.kind], session
+    )
+    return await recurring_rule_crud.create(obj_in, session, user=user)
+
+
+@router.get(
+    '', response_model=list[RecurringRuleDB],
+    summary='Получить правила повторяющихся записей пользователя.',
+    response_description='Правила пользователя.'
+)
+async def get_recurring_rules(
+    user: CurrentUserDep, session: ReadSessionDep
+):
+    return await recurring_rule_crud.get_by_user(user, session)
+
+
+@router.patch('/{rule_id}', response_model=RecurringRuleDB)
+async def update_recurring_rule(
+    rule_id: int, obj_in: RecurringRuleUpdate, user: CurrentUserDep,
+    session: SessionDep
+):
+    check_bulk_patch_not_empty(obj_in.model_dump(exclude_unset=True))
+    rule = await recurring_rule_crud.update(
+        rule_id, obj_in=obj_in, user=user, session=session
+    )
+    return await check_own_found(
+        rule, rule_id, recurring_rule_crud, session, NOT_FOUND, FORBIDDEN
+    )
+
+
+@router.delete('/{rule_id}', response_model=RecurringRuleDB)
+async def delete_recurring_rule(
+    rule_id: int, user: CurrentUserDep, session: SessionDep
+):
+    rule = await recurring_rule_crud.remove(rule_id, session, user=user)
+    return await check_own_found(
+        rule, rule_id, recurring_rule_crud, session, NOT_FOUND, FORBIDDEN
+    )
@@ -0,0 +1,62 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Query, Request, Response
+from sqlalchemy import select, union_all
+
+from app.api.validators import check_search_terms
+from app.core.db import ReadSessionDep
+from app.core.etag import conditional_response
+from app.core.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from app.core.user import CurrentUserDep
+from app.crud.cache_version import cache_version_crud
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+from app.crud.ledger import ledger_version_name
+from app.schemas.search import SearchKind, SearchResult
+
+router = APIRouter()
+
+MAX_SEARCH_QUERY_LENGTH = 200
+
+
+@router.get(
+    '', response_model=list[SearchResult],
+    summary='Найти расходы и доходы по описанию.',
+    description=(
+        'Полнотекстовый поиск по описаниям записей пользователя. Каждое '
+        'слово запроса ищется как начало слова описания, записи должны '
+        'содержать все слова. Результаты упорядочены по релевантности; '
+        'следующая страница запрашивается смещением offset. Ответ '
+        'содержит ETag; при совпадении If-None-Match возвращается 304.'
+    ),
+    response_description='Страница найденных записей.'
+)
+async def search(
+    user: CurrentUserDep, session: ReadSessionDep, request: Request,
+    response: Response,
+    q: Annotated[str, Query(
+        min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH,
+        description='Слова для поиска.'
+    )],
+    kind: Optional[SearchKind] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    offset: Annotated[int, Query(ge=0)] = 0
+):
+    terms = check_search_terms(q)
+    version = await cache_version_crud.get_version(
+        ledger_version_name(user.id), session
+    )
+    not_modified = conditional_response(request, response, user.id, version)
+    if not_modified is not None:
+        return not_modified
+    hits = union_all(*(
+        crud.search_query(user, terms, session)
+        for crud in (expense_crud, income_crud)
+        if kind in (None, crud.kind)
+    )).subquery('hits')
+    rows = await session.execute(
+        select(hits).order_by(
+            hits.c.score.desc(), hits.c.date.desc(), hits.c.id.desc()
+        ).limit(limit).offset(offset)
+    )
+    return rows.all()
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+
+from app.core.cache import response_cache
+from app.core.db import get_engines
+from app.core.pool import pool_snapshot
+from app.core.user import current_superuser
+from app.schemas.stats import CacheStats, PoolStats
+
+router = APIRouter()
+
+
+@router.get(
+    '/cache', response_model=CacheStats,
+    summary='Статистика кэша ответов. Только для суперюзеров.',
+    description=(
+        'Возвращает хранилище кэша вычисляемых ответов и счетчики попаданий '
+        'и промахов текущего процесса.'
+    ),
+    response_description='Счетчики кэша.',
+    dependencies=[Depends(current_superuser)]
+)
+async def get_cache_stats():
+    return response_cache.stats()
+
+
+@router.get(
+    '/db-pool', response_model=dict[str, PoolStats],
+    summary='Статистика пулов соединений с БД. Только для суперюзеров.',
+    description=(
+        'Для каждого движка возвращает размер пула, число занятых и '
+        'свободных соединений, переполнение, число таймаутов и гистограмму '
+        'ожидания соединения в текущем процессе.'
+    ),
+    response_description='Статистика пулов по именам движков.',
+    dependencies=[Depends(current_superuser)]
+)
+async def get_db_pool_stats():
+    return {
+        name: pool_snapshot(engine.pool)
+        for name, engine in get_engines().items()
+    }
@@ -0,0 +1,59 @@
+from datetime import datetime as dt
+from typing import Optional
+
+from fastapi import APIRouter
+from pydantic import TypeAdapter
+
+from app.core.cache import response_cache
+from app.core.db import ReadSessionDep
+from app.core.periods import period_bounds, start_of_day
+from app.core.user import CurrentUserDep
+from app.crud.cache_version import cache_version_crud
+from app.crud.daily_total import daily_total_crud
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+from app.crud.ledger import ledger_version_name
+from app.schemas.summary import LedgerSummary, Summary
+
+router = APIRouter()
+
+# Итоги расходов и доходов без момента at, в таком виде они кэшируются
+SUMMARY_TOTALS = TypeAdapter(dict[str, LedgerSummary])
+
+
+@router.get(
+    '', response_model=Summary,
+    summary='Получить итоги расходов и доходов за периоды.',
+    description=(
+        'Возвращает суммы расходов и доходов пользователя за текущие день, '
+        'неделю, месяц и за все время с разбивкой по категориям. Периоды '
+        'отсчитываются от момента at (по умолчанию — текущее время сервера).'
+    ),
+    response_description='Итоги по периодам и категориям.'
+)
+async def get_summary(
+    user: CurrentUserDep, session: ReadSessionDep,
+    at: Optional[dt] = None
+):
+    at = at or dt.now()
+    periods = period_bounds(at)
+
+    async def compute():
+        return SUMMARY_TOTALS.validate_python({
+            'expense': await daily_total_crud.get_period_totals(
+                user, session, expense_crud.kind, periods
+            ),
+            'income': await daily_total_crud.get_period_totals(
+                user, session, income_crud.kind, periods
+            ),
+        })
+
+    # Все периоды определяются началом дня at
+    totals = await response_cache.get_or_compute(
+        'summary', user.id,
+        await cache_version_crud.get_version(
+            ledger_version_name(user.id), session
+        ),
+        {'day': start_of_day(at)}, SUMMARY_TOTALS, compute
+    )
+    return {'at': at, **totals}
@@ -0,0 +1,76 @@
+from datetime import datetime as dt, timedelta
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Query
+from pydantic import TypeAdapter
+
+from app.api.validators import check_timezone, check_trend_range
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.db import ReadSessionDep
+from app.core.periods import DAY, bucket_starts, next_bucket
+from app.core.trends import DEFAULT_TREND_DAYS, fill_gaps, to_local
+from app.core.user import CurrentUserDep
+from app.crud.cache_version import cache_version_crud
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+from app.crud.ledger import ledger_version_name
+from app.schemas.trends import Trend, TrendBucketSize, TrendKind
+
+router = APIRouter()
+
+TREND = TypeAdapter(Trend)
+LEDGER_CRUDS = {crud.kind: crud for crud in (expense_crud, income_crud)}
+
+
+@router.get(
+    '', response_model=Trend,
+    summary='Получить итоги по дням, неделям или месяцам.',
+    description=(
+        'Возвращает суммы и количество расходов или доходов пользователя '
+        'по интервалам bucket в диапазоне [from, to) часового пояса tz '
+        '(по умолчанию — пояс хранения дат). Диапазон расширяется до '
+        'целых интервалов, интервалы без записей заполняются нулями. С '
+        'by_category в каждом интервале перечислены категории диапазона.'
+    ),
+    response_description='Итоги по интервалам.'
+)
+async def get_trend(
+    user: CurrentUserDep, session: ReadSessionDep,
+    kind: TrendKind = 'expense', bucket: TrendBucketSize = DAY,
+    start: Annotated[Optional[dt], Query(alias='from')] = None,
+    end: Annotated[Optional[dt], Query(alias='to')] = None,
+    tz: str = settings.ledger_timezone, by_category: bool = False
+):
+    zone = check_timezone(tz)
+    end = to_local(end, zone) if end else dt.now(zone).replace(tzinfo=None)
+    start = (
+        to_local(start, zone) if start
+        else end - timedelta(days=DEFAULT_TREND_DAYS[bucket])
+    )
+    check_trend_range(start, end, bucket)
+    starts = bucket_starts(start, end, bucket)
+    start, end = starts[0], next_bucket(starts[-1], bucket)
+
+    async def compute():
+        rows = await LEDGER_CRUDS[kind].get_bucket_totals(
+            user, session, starts, bucket, zone, by_category
+        )
+        buckets = fill_gaps(rows, starts, by_category)
+        for item in buckets:
+            item['start'] = item['start'].replace(tzinfo=zone)
+        return TREND.validate_python({
+            'kind': kind, 'bucket': bucket, 'tz': tz,
+            'start': start.replace(tzinfo=zone),
+            'end': end.replace(tzinfo=zone), 'buckets': buckets,
+        })
+
+    return await response_cache.get_or_compute(
+        'trends', user.id,
+        await cache_version_crud.get_version(
+            ledger_version_name(user.id), session
+        ),
+        {'kind': kind, 'bucket': bucket, 'start': start, 'end': end,
+         'tz': tz, 'by_category': by_category},
+        TREND, compute
+    )
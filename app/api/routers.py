@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 
 from app.api.endpoints import (
-    category_router, expense_router, income_router)
+    balance_router, budget_router, category_router, expense_router,
+    export_router, income_router, recurring_router, search_router,
+    stats_router, summary_router, trends_router)
 from app.api.endpoints.user import users_router
 from app.core.user import auth_backend, fastapi_users
 from app.schemas.user import UserCreate, UserRead
@@ -33,3 +35,27 @@ main_router.include_router(
 main_router.include_router(
     income_router, prefix='/income', tags=['Доходы']
 )
+main_router.include_router(
+    recurring_router, prefix='/recurring', tags=['Повторяющиеся записи']
+)
+main_router.include_router(
+    budget_router, prefix='/budget', tags=['Бюджеты']
+)
+main_router.include_router(
+    summary_router, prefix='/summary', tags=['Сводка']
+)
+main_router.include_router(
+    trends_router, prefix='/trends', tags=['Сводка']
+)
+main_router.include_router(
+    balance_router, prefix='/balance', tags=['Сводка']
+)
+main_router.include_router(
+    export_router, prefix='/export', tags=['Выгрузка']
+)
+main_router.include_router(
+    search_router, prefix='/search', tags=['Поиск']
+)
+main_router.include_router(
+    stats_router, prefix='/stats', tags=['Статистика']
+)
@@ -1,21 +1,33 @@
-from typing import Union
+from contextlib import asynccontextmanager
+from datetime import datetime as dt
+from typing import Optional
 from http import HTTPStatus
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import decode_cursor
+from app.core.periods import DAY, MONTH, WEEK
+from app.core.search import search_terms
+from app.crud.budget import budget_crud
 from app.crud.category import expense_category_crud, income_category_crud
-from app.crud.expense import expense_crud
-from app.crud.income import income_crud
-from app.models import ExpenseCategory, IncomeCategory, Expense, Income, User
+from app.models import ExpenseCategory, IncomeCategory
 
+MAX_TREND_BUCKETS = 1000
+# Наименьшая длина интервала тренда в днях
+MIN_BUCKET_DAYS = {DAY: 1, WEEK: 7, MONTH: 28}
 
-async def check_expense_category_exists(
-        category_id: int, session: AsyncSession
+
+def check_expense_category_found(
+        category: Optional[ExpenseCategory], category_id: int
 ) -> ExpenseCategory:
-    category = await expense_category_crud.get(category_id, session)
-    if not category:
-        HTTPException(
+    """Проверяет, что категория расходов нашлась при изменении или
+    удалении."""
+    if category is None:
+        raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'Категория с идентификатором {category_id} не найдена!'
         )
@@ -36,12 +48,13 @@ async def check_expense_category_name_duplicate(
         )
 
 
-async def check_income_category_exists(
-        category_id: int, session: AsyncSession
+def check_income_category_found(
+        category: Optional[IncomeCategory], category_id: int
 ) -> IncomeCategory:
-    category = await income_category_crud.get(category_id, session)
-    if not category:
-        HTTPException(
+    """Проверяет, что категория доходов нашлась при изменении или
+    удалении."""
+    if category is None:
+        raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'Категория с идентификатором {category_id} не найдена!'
         )
@@ -62,49 +75,164 @@ async def check_income_category_name_duplicate(
         )
 
 
-async def check_expense_exists(
-        expense_id: int, session: AsyncSession
-) -> Expense:
-    """Проверяет, существует ли расход по ID."""
-    expense = await expense_crud.get(expense_id, session)
-    if not expense:
-        HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=f'Расход с идентификатором {expense_id} не найден!'
+async def check_own_found(
+        obj, obj_id: int, crud, session: AsyncSession, not_found: str,
+        forbidden: str
+):
+    """Проверяет, что запись пользователя изменена или удалена. Запрос
+    затрагивает только записи пользователя, поэтому при неудаче
+    выясняет причину: записи нет (404, not_found с подставленным obj_id)
+    или она чужая (403, forbidden)."""
+    if obj is not None:
+        return obj
+    if await crud.get(obj_id, session) is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail=not_found.format(obj_id)
+        )
+    raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail=forbidden)
+
+
+async def check_budget_duplicate(
+        user_id: int, category_id: int, period: str, session: AsyncSession
+) -> None:
+    """Проверяет, что у пользователя еще нет бюджета категории на этот
+    период."""
+    if await budget_crud.get_by_key(
+        session, user_id, category_id, period
+    ) is not None:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Бюджет категории на этот период уже существует!'
         )
-    return expense
 
 
-async def check_user_own_expense(
-        expense: Expense, user: User, session: AsyncSession
-) -> Expense:
-    """pass"""
-    if not expense.user_id == user.id:
-        HTTPException(
-            status_code=HTTPStatus.FORBIDDEN,
-            detail='Удалять чужие расходы запрещено!'
+def check_recurring_range(start_at: dt, end_at: Optional[dt]) -> None:
+    if end_at is not None and end_at <= start_at:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Конец повторений должен быть позже их начала!'
         )
-    return expense
 
 
-async def check_income_exists(income_id: int, session: AsyncSession) -> Income:
-    """Проверяет, существует ли доход по ID."""
-    income = await income_crud.get(income_id, session)
-    if not income:
-        HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=f'Доход с идентификатором {income_id} не найден!'
+def check_cursor(cursor: Optional[str]) -> Optional[tuple[dt, int]]:
+    """Проверяет курсор пагинации и возвращает позицию (date, id)."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Некорректный курсор пагинации!'
+        )
+
+
+def check_fields(
+        fields: Optional[str], allowed: tuple[str, ...]
+) -> tuple[str, ...]:
+    """Разбирает список полей ответа через запятую. Без списка
+    возвращает все поля allowed."""
+    requested = tuple(dict.fromkeys(
+        field.strip() for field in (fields or '').split(',')
+        if field.strip()
+    ))
+    if not requested:
+        return allowed
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=(f'Неизвестные поля: {", ".join(unknown)}! Доступные '
+                    f'поля: {", ".join(allowed)}.')
+        )
+    return requested
+
+
+def check_search_terms(text: str) -> list[str]:
+    """Возвращает слова поискового запроса. Запрос без слов — 400."""
+    terms = search_terms(text)
+    if not terms:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Поисковый запрос должен содержать хотя бы одно слово!'
+        )
+    return terms
+
+
+def check_timezone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=f'Неизвестный часовой пояс {name}!'
+        )
+
+
+def check_trend_range(start: dt, end: dt, bucket: str) -> None:
+    """Проверяет, что диапазон тренда не пуст и содержит не больше
+    MAX_TREND_BUCKETS интервалов."""
+    if start >= end:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Начало диапазона должно быть раньше его конца!'
+        )
+    if (end - start).days // MIN_BUCKET_DAYS[bucket] > MAX_TREND_BUCKETS:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=(f'Диапазон содержит больше {MAX_TREND_BUCKETS} '
+                    'интервалов, выберите интервал крупнее!')
         )
-    return income
 
 
-async def check_user_own_income(
-        income: Income, user: User, session: AsyncSession
-) -> Income:
-    """pass"""
-    if not income.user_id == user.id:
-        HTTPException(
-            status_code=HTTPStatus.FORBIDDEN,
-            detail='Удалять чужие доходы запрещено!'
+def check_bulk_filter_not_empty(filters: BaseModel) -> None:
+    """Запрещает пакетное изменение без единого условия отбора."""
+    if not filters.model_dump(exclude_none=True):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Укажите хотя бы одно условие отбора записей!'
         )
-    return income
+
+
+def check_bulk_patch_not_empty(patch: dict) -> None:
+    if not patch:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Укажите хотя бы одно изменяемое поле!'
+        )
+
+
+async def check_category_ids_exist(
+        category_ids: set[int], registry, session: AsyncSession
+) -> None:
+    """Проверяет по кэшу категорий, что все категории существуют. При
+    промахе сначала сверяет версию кэша с БД: категорию могли только что
+    создать через другой воркер."""
+    missing = category_ids - await registry.get_ids(session)
+    if missing:
+        missing -= await registry.get_ids(session, force=True)
+    if missing:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=(f'Категория с идентификатором {min(missing)} '
+                    'не найдена!')
+        )
+
+
+@asynccontextmanager
+async def check_category_fk(
+        category_ids: set[int], registry, session: AsyncSession
+):
+    """Превращает нарушение внешнего ключа на категорию при записи в 404.
+
+    Кэш другого воркера может еще считать удаленную категорию
+    существующей. Тогда после отката кэш перечитывается и, если категории
+    действительно нет, возвращается 404; иные ошибки целостности
+    пробрасываются дальше."""
+    try:
+        yield
+    except IntegrityError:
+        await session.rollback()
+        await registry.load(session)
+        await check_category_ids_exist(category_ids, registry, session)
+        raise
@@ -0,0 +1,26 @@
+"""Пересчитывает таблицу daily_totals по исходным расходам и доходам.
+Снимки баланса, построенные по прежним итогам, удаляются.
+
+Запуск: python -m app.commands.rebuild_daily_totals
+"""
+import asyncio
+
+from app.core.db import AsyncSessionLocal
+from app.crud.balance import balance_crud
+from app.crud.daily_total import daily_total_crud
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+
+
+async def rebuild_daily_totals() -> None:
+    async with AsyncSessionLocal() as session:
+        for crud in (expense_crud, income_crud):
+            await daily_total_crud.rebuild(
+                session, crud.kind, crud.model, commit=False
+            )
+        await balance_crud.clear(session)
+        await session.commit()
+
+
+if __name__ == '__main__':
+    asyncio.run(rebuild_daily_totals())
@@ -0,0 +1,372 @@
+"""Заполняет базу синтетическими пользователями и их расходами и доходами
+для нагрузочных замеров на больших объемах.
+
+Данные детерминированы: одинаковые --seed, --users, --months и --end дают
+одни и те же записи. У каждого пользователя свой профиль: регулярные
+платежи в фиксированные дни месяца (аренда, квартплата, связь, кредит,
+подписки), зарплата раз или два в месяц с переносом выходного дня на
+пятницу, премия в декабре, подработка, кэшбэк и подарки. Повседневные
+траты по категориям CATEGORY_DESCRIPTIONS — пуассоновский поток с
+поправками на день недели и сезон (отпуск летом, одежда весной и осенью,
+подарки и развлечения в декабре, квартплата зимой), суммы —
+логнормальные, описания — из словаря категории.
+
+Пользователи создаются пакетом через create_users, записи — пакетами
+insert_rows (COPY на PostgreSQL, многострочные INSERT на остальных) в
+одной транзакции: дневные итоги, бюджеты и снимки баланса обновляются
+теми же хуками, что и при обычной вставке. На SQLite триггер поискового
+индекса на время загрузки удаляется, и новые записи индексируются одним
+INSERT ... SELECT в конце. Пользователи, уже существующие в базе,
+пропускаются вместе с их записями, поэтому повторный запуск не
+дублирует данные.
+
+Запуск:
+
+    python -m app.commands.seed_ledger --users 1000 --months 24 --seed 0
+"""
+import argparse
+import asyncio
+import random
+from calendar import monthrange
+from datetime import datetime as dt, timedelta
+from itertools import accumulate
+from math import log
+from time import perf_counter
+
+from sqlalchemy import func, select, text
+
+from app.core.db import AsyncSessionLocal, is_postgresql
+from app.core.init_db import create_users
+from app.core.periods import add_months, start_of_month
+from app.core.search import (
+    sqlite_backfill_sql, sqlite_insert_trigger_ddl,
+    sqlite_insert_trigger_name)
+from app.crud.cache_version import cache_version_crud
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+from app.models import ExpenseCategory, IncomeCategory, User
+from app.schemas.category import CATEGORY_DESCRIPTIONS
+
+BATCH_SIZE = 50_000
+DEFAULT_DOMAIN = 'seed.example.com'
+DEFAULT_PASSWORD = 'seed-password'
+WINTER = (1, 2, 3, 11, 12)
+# Вес часа, в который совершается повседневная трата
+HOUR_WEIGHTS = (
+    0, 0, 0, 0, 0, 0, 0, 1, 3, 4, 4, 5,
+    6, 6, 5, 5, 5, 6, 9, 10, 8, 5, 2, 1,
+)
+HOURS = range(24)
+HOUR_CUM_WEIGHTS = list(accumulate(HOUR_WEIGHTS))
+# Регулярные платежи: категория, доля пользователей, у которых он есть,
+# день месяца, диапазон суммы, описание
+BILLS = (
+    ('Аренда жилья', 0.45, 1, (20_000, 70_000), 'Аренда квартиры'),
+    ('Квартплата', 0.9, 10, (3_000, 9_000), 'Коммунальные платежи'),
+    ('Интернет и связь', 0.95, 15, (400, 1_500),
+     'Интернет и мобильная связь'),
+    ('Кредиты', 0.35, 20, (5_000, 35_000), 'Платеж по кредиту'),
+    ('Цифровые покупки', 0.6, 5, (199, 999), 'Подписка на сервисы'),
+)
+# Повседневные траты: категория, среднее число в день, медиана суммы,
+# разброс логарифма суммы, множитель выходных, множители по месяцам
+# (None — без сезонности), описания
+SPENDING = (
+    ('Продукты и хозтовары', 1.1, 500, 0.7, 1.4, None,
+     ('Продукты', 'Супермаркет', 'Рынок', 'Доставка продуктов',
+      'Хозтовары', 'Пекарня', 'Магазин у дома')),
+    ('Здоровье и красота', 0.08, 1_200, 0.8, 1.2, None,
+     ('Аптека', 'Стоматолог', 'Парикмахерская', 'Косметика',
+      'Анализы', 'Спортзал')),
+    ('Образование', 0.02, 4_000, 0.9, 1.0,
+     (1.0, 1.0, 0.9, 0.8, 0.6, 0.4, 0.3, 0.6, 2.0, 1.4, 1.0, 0.8),
+     ('Онлайн-курс', 'Книги', 'Репетитор', 'Учебники', 'Вебинар')),
+    ('Развлечения', 0.15, 800, 0.8, 2.2,
+     (0.8, 0.9, 1.0, 1.0, 1.1, 1.2, 1.2, 1.2, 1.0, 0.9, 0.9, 1.6),
+     ('Кино', 'Кафе', 'Ресторан', 'Концерт', 'Театр', 'Бар',
+      'Боулинг')),
+    ('Туризм и путешествия', 0.01, 9_000, 1.0, 1.5,
+     (0.6, 0.6, 0.7, 0.8, 1.4, 2.6, 3.0, 2.6, 1.2, 0.8, 0.5, 1.2),
+     ('Авиабилеты', 'Гостиница', 'Ж/д билеты', 'Экскурсия',
+      'Страховка для поездки')),
+    ('Непредвиденное, ремонт', 0.02, 2_500, 1.1, 1.3, None,
+     ('Ремонт техники', 'Сантехник', 'Ремонт обуви', 'Химчистка',
+      'Замена замка')),
+    ('Одежда, товары', 0.06, 2_000, 0.9, 1.6,
+     (0.9, 0.7, 1.2, 1.4, 1.1, 0.8, 0.8, 1.0, 1.4, 1.3, 1.5, 1.4),
+     ('Одежда', 'Обувь', 'Маркетплейс', 'Товары для дома',
+      'Детские вещи')),
+    ('Цифровые покупки', 0.03, 500, 0.8, 1.3, None,
+     ('Игра', 'Приложение', 'Электронная книга', 'Фильм онлайн')),
+    ('Автомобиль', 0.12, 1_500, 0.6, 1.1,
+     (1.2, 1.1, 1.0, 1.1, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.3, 1.2),
+     ('Заправка', 'Мойка', 'Парковка', 'Шиномонтаж', 'ТО', 'Штраф')),
+    ('Крупные траты', 0.004, 25_000, 0.8, 1.5,
+     (0.6, 0.6, 0.8, 0.9, 1.0, 1.0, 0.9, 0.9, 1.0, 1.0, 1.6, 2.2),
+     ('Бытовая техника', 'Мебель', 'Смартфон', 'Ноутбук', 'Ремонт')),
+    ('Чрезмерное потребление', 0.1, 450, 0.9, 1.8, None,
+     ('Доставка еды', 'Такси', 'Кофе с собой', 'Фастфуд',
+      'Импульсная покупка')),
+)
+INCOME_CATEGORIES = (
+    'Зарплата', 'Подработка', 'Премия', 'Проценты и кэшбэк', 'Подарки'
+)
+
+
+def seasonal(months, month: int) -> float:
+    return 1.0 if months is None else months[month - 1]
+
+
+def working_day(day: dt) -> dt:
+    """Переносит выплату с выходного на предшествующую пятницу."""
+    return day - timedelta(days=max(day.weekday() - 4, 0))
+
+
+def month_day(month: dt, day: int) -> dt:
+    return month.replace(day=min(day, monthrange(month.year, month.month)[1]))
+
+
+class UserProfile:
+    """Детерминированный профиль пользователя номер number: сумма и дни
+    зарплаты, набор регулярных платежей и интенсивность трат."""
+
+    def __init__(self, seed: int, number: int, user_id: int):
+        self.user_id = user_id
+        self.rnd = rnd = random.Random(f'{seed}:{number}')
+        self.salary = round(rnd.lognormvariate(log(90_000), 0.45), -2)
+        self.paydays = (5,) if rnd.random() < 0.4 else (10, 25)
+        self.freelance = rnd.random() < 0.3
+        self.birthday = rnd.randint(1, 12)
+        self.bills = [
+            (category, day, round(rnd.uniform(*amounts), -1), description)
+            for category, share, day, amounts, description in BILLS
+            if rnd.random() < share
+        ]
+        # Чем больше зарплата, тем чаще и дороже траты
+        wealth = (self.salary / 90_000) ** 0.5
+        self.spending = [
+            (category, rate * rnd.uniform(0.5, 1.5) * wealth,
+             median * rnd.uniform(0.7, 1.3) * wealth, sigma, weekend,
+             months, descriptions)
+            for (category, rate, median, sigma, weekend, months,
+                 descriptions) in SPENDING
+        ]
+
+    def amount(self, median: float, sigma: float) -> float:
+        return max(round(self.rnd.lognormvariate(log(median), sigma), 2), 1)
+
+    def at_hour(self, day: dt) -> dt:
+        hour = self.rnd.choices(
+            HOURS, cum_weights=HOUR_CUM_WEIGHTS
+        )[0]
+        return day.replace(hour=hour, minute=self.rnd.randrange(60))
+
+    def incomes(self, start: dt, end: dt, categories: dict) -> list[dict]:
+        rows = []
+
+        def add(category: str, moment: dt, amount: float, description):
+            if start <= moment < end:
+                rows.append({
+                    'user_id': self.user_id,
+                    'category_id': categories[category],
+                    'amount': round(amount, 2), 'description': description,
+                    'date': moment,
+                })
+
+        rnd, month = self.rnd, start
+        while month < end:
+            # Индексация зарплаты раз в год
+            salary = self.salary * 1.07 ** ((month - start).days // 365)
+            for payday in self.paydays:
+                add('Зарплата',
+                    working_day(month_day(month, payday)).replace(hour=10),
+                    salary / len(self.paydays),
+                    'Зарплата' if payday != 25 else 'Аванс')
+            if month.month == 12:
+                add('Премия', working_day(month_day(month, 20)),
+                    salary * rnd.uniform(0.5, 1.5), 'Годовая премия')
+            if self.freelance:
+                for _ in range(rnd.randint(0, 3)):
+                    add('Подработка',
+                        self.at_hour(month_day(month, rnd.randint(1, 28))),
+                        rnd.lognormvariate(log(12_000), 0.6), 'Фриланс')
+            add('Проценты и кэшбэк', month.replace(hour=3),
+                salary * rnd.uniform(0.005, 0.02), 'Кэшбэк за месяц')
+            if month.month in (self.birthday, 1):
+                add('Подарки', self.at_hour(month_day(month, 1)),
+                    rnd.lognormvariate(log(5_000), 0.7),
+                    'Подарок на день рождения'
+                    if month.month == self.birthday else 'Новогодний подарок')
+            month = add_months(month, 1)
+        return rows
+
+    def expenses(self, start: dt, end: dt, categories: dict) -> list[dict]:
+        rnd, rows = self.rnd, []
+        month = start
+        while month < end:
+            for category, day, amount, description in self.bills:
+                if category == 'Квартплата' and month.month in WINTER:
+                    amount *= 1.4
+                rows.append({
+                    'user_id': self.user_id,
+                    'category_id': categories[category],
+                    'amount': round(amount * rnd.uniform(0.95, 1.05), 2),
+                    'description': description, 'is_paid': True,
+                    'date': month_day(month, day).replace(hour=9),
+                })
+            month = add_months(month, 1)
+        days = (end - start).days
+        for (category, rate, median, sigma, weekend, months,
+             descriptions) in self.spending:
+            # Прореживание: кандидаты идут с наибольшей интенсивностью и
+            # принимаются с долей интенсивности своего дня
+            peak = rate * weekend * max(months or (1.0,))
+            position = rnd.expovariate(peak)
+            while position < days:
+                day = start + timedelta(days=int(position))
+                intensity = rate * seasonal(months, day.month) * (
+                    weekend if day.weekday() >= 5 else 1.0
+                )
+                if rnd.random() * peak < intensity:
+                    rows.append({
+                        'user_id': self.user_id,
+                        'category_id': categories[category],
+                        'amount': self.amount(median, sigma),
+                        'description': rnd.choice(descriptions),
+                        'is_paid': True, 'date': self.at_hour(day),
+                    })
+                position += rnd.expovariate(peak)
+        return rows
+
+
+async def ensure_categories(session, model, names) -> dict[str, int]:
+    """Создает недостающие категории и возвращает id по названию."""
+    existing = dict(
+        (await session.execute(
+            select(model.name, model.id).where(model.name.in_(names))
+        )).all()
+    )
+    missing = [name for name in names if name not in existing]
+    if missing:
+        created = await session.execute(
+            model.__table__.insert().returning(model.id, model.name),
+            [{'name': name} for name in missing]
+        )
+        existing.update({name: id for id, name in created})
+        # Воркеры перечитают кэш категорий при следующей сверке версии
+        await cache_version_crud.bump(
+            model.__tablename__, session, commit=False
+        )
+        await session.commit()
+    return existing
+
+
+async def get_user_ids(session, domain: str) -> dict[str, int]:
+    return dict(
+        (await session.execute(
+            select(User.email, User.id).where(
+                User.email.like(f'%@{domain}')
+            )
+        )).all()
+    )
+
+
+async def seed_ledger(
+        users: int, months: int, seed: int, end: dt, domain: str,
+        password: str
+) -> dict:
+    started = perf_counter()
+    start = add_months(end, -months)
+    emails = [f'user{number}@{domain}' for number in range(users)]
+    async with AsyncSessionLocal() as session:
+        existing = await get_user_ids(session, domain)
+    await create_users(
+        [email for email in emails if email not in existing], password
+    )
+    report = {'users': 0, 'skipped_users': len(existing)}
+    async with AsyncSessionLocal() as session:
+        user_ids = await get_user_ids(session, domain)
+        expense_categories = await ensure_categories(
+            session, ExpenseCategory, list(CATEGORY_DESCRIPTIONS)
+        )
+        income_categories = await ensure_categories(
+            session, IncomeCategory, list(INCOME_CATEGORIES)
+        )
+        cruds = (expense_crud, income_crud)
+        sqlite = not is_postgresql(session)
+        after = {}
+        if sqlite:
+            for crud in cruds:
+                table = crud.model.__tablename__
+                after[table] = await session.scalar(
+                    select(func.coalesce(func.max(crud.model.id), 0))
+                )
+                await session.execute(text(
+                    f'DROP TRIGGER {sqlite_insert_trigger_name(table)}'
+                ))
+        pending = {crud.kind: [] for crud in cruds}
+        inserted = {crud.kind: 0 for crud in cruds}
+
+        async def flush(crud):
+            if pending[crud.kind]:
+                await crud.insert_rows(session, pending[crud.kind])
+                inserted[crud.kind] += len(pending[crud.kind])
+                pending[crud.kind] = []
+
+        for number, email in enumerate(emails):
+            if email in existing:
+                continue
+            profile = UserProfile(seed, number, user_ids[email])
+            pending[expense_crud.kind] += profile.expenses(
+                start, end, expense_categories
+            )
+            pending[income_crud.kind] += profile.incomes(
+                start, end, income_categories
+            )
+            report['users'] += 1
+            for crud in cruds:
+                if len(pending[crud.kind]) >= BATCH_SIZE:
+                    await flush(crud)
+        for crud in cruds:
+            await flush(crud)
+        if sqlite:
+            for crud in cruds:
+                table = crud.model.__tablename__
+                await session.execute(
+                    text(sqlite_backfill_sql(table)),
+                    {'after': after[table]}
+                )
+                await session.execute(
+                    text(sqlite_insert_trigger_ddl(table))
+                )
+        await session.commit()
+    seconds = perf_counter() - started
+    rows = sum(inserted.values())
+    report.update(inserted)
+    report['seconds'] = round(seconds, 1)
+    report['rows_per_minute'] = round(rows / seconds * 60)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument(
+        '--months', type=int, default=24,
+        help='Сколько месяцев до --end заполнить'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--end', type=dt.fromisoformat,
+        default=start_of_month(dt.now()),
+        help='Конец диапазона (по умолчанию — начало текущего месяца)'
+    )
+    parser.add_argument('--domain', default=DEFAULT_DOMAIN)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    args = parser.parse_args()
+    report = asyncio.run(seed_ledger(
+        args.users, args.months, args.seed, start_of_month(args.end),
+        args.domain, args.password
+    ))
+    for name, value in report.items():
+        print(f'{name}: {value}')
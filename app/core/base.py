@@ -1,3 +1,5 @@
 """Импорты класса Base и всех моделей для Alembic."""
 from app.core.db import Base  # noqa
-from app.models import ExpenseCategory, IncomeCategory, Expense, Income, User  # noqa
+from app.models import (  # noqa
+    CacheVersion, DailyTotal, ExpenseCategory, IncomeCategory, Expense,
+    Income, User)
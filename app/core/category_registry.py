@@ -0,0 +1,84 @@
+"""Кэш категорий в памяти процесса.
+
+Категорий мало, и меняет их только суперпользователь, поэтому список и
+проверки существования обслуживаются из памяти без запросов к БД. Версия
+кэша хранится в таблице cache_version: CRUDCategory увеличивает ее в той
+же транзакции, что и изменение категорий, остальные воркеры сверяются с
+ней не чаще раза в category_cache_check_interval секунд и перечитывают
+категории при расхождении. Промах по кэшу (id нет среди категорий)
+сверяет версию сразу, чтобы новая категория не отклонялась до следующей
+плановой сверки.
+"""
+import asyncio
+from time import monotonic
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.cache_version import cache_version_crud
+from app.crud.category import (
+    CRUDCategory, expense_category_crud, income_category_crud)
+from app.schemas.category import CategoryDB
+
+
+class CategoryRegistry:
+
+    def __init__(self, crud: CRUDCategory):
+        self.crud = crud
+        self.name = crud.version_name
+        self.version: Optional[int] = None
+        self.categories: dict[int, CategoryDB] = {}
+        self.checked_at = float('-inf')
+        self.lock = asyncio.Lock()
+
+    async def load(self, session: AsyncSession) -> None:
+        """Перечитывает категории и их версию из БД."""
+        async with self.lock:
+            version = await cache_version_crud.get_version(self.name, session)
+            categories = await self.crud.get_multi(session)
+            self.categories = {
+                category.id: CategoryDB.model_validate(category)
+                for category in sorted(categories, key=lambda c: c.id)
+            }
+            self.version = version
+            self.checked_at = monotonic()
+
+    async def ensure_fresh(
+            self, session: AsyncSession, force: bool = False
+    ) -> None:
+        """Сверяет версию с БД, если с прошлой сверки прошло больше
+        category_cache_check_interval секунд или передан force."""
+        if not force and (monotonic() - self.checked_at
+                          < settings.category_cache_check_interval):
+            return
+        version = await cache_version_crud.get_version(self.name, session)
+        # Реплика может отставать: более старая версия не перечитывается
+        if self.version is None or version > self.version:
+            await self.load(session)
+        else:
+            self.checked_at = monotonic()
+
+    async def invalidate(self, session: AsyncSession) -> None:
+        """Перечитывает категории после их изменения. Версию для других
+        воркеров уже увеличил CRUDCategory в транзакции изменения."""
+        await self.load(session)
+
+    async def get_all(self, session: AsyncSession) -> list[CategoryDB]:
+        await self.ensure_fresh(session)
+        return list(self.categories.values())
+
+    async def get_ids(
+            self, session: AsyncSession, force: bool = False
+    ) -> set[int]:
+        await self.ensure_fresh(session, force)
+        return set(self.categories)
+
+
+expense_category_registry = CategoryRegistry(expense_category_crud)
+income_category_registry = CategoryRegistry(income_category_crud)
+
+
+async def load_category_registries(session: AsyncSession) -> None:
+    for registry in (expense_category_registry, income_category_registry):
+        await registry.load(session)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,9 +10,69 @@ class Settings(BaseSettings):
     app_title: str = TITLE
     description: str = DESCRIPTION
     database_url: str = 'sqlite+aiosqlite:///./fastapi.db'
+    # Пул соединений с БД. pool_size + max_overflow соединений на воркер
+    # должны помещаться в max_connections PostgreSQL; db_pool_recycle -1
+    # отключает пересоздание соединений по возрасту
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Размер кэша подготовленных выражений asyncpg на соединение (0 —
+    # отключен, нужно для pgbouncer в режиме transaction)
+    db_statement_cache_size: int = 100
+    # Режим файловой SQLite: WAL, synchronous=NORMAL, одно пишущее
+    # соединение и пул соединений только для чтения. busy_timeout — в мс,
+    # mmap_size — в байтах, cache_size — в KiB на соединение
+    sqlite_wal_mode: bool = True
+    sqlite_busy_timeout: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = 64 * 1024
+    # Реплики для чтения (JSON-список URL) и сколько секунд после записи
+    # чтения клиента идут в основную БД
+    database_replica_urls: list[str] = []
+    replica_read_your_writes_seconds: float = 5
     secret: str = 'SECRET'
     first_superuser_email: Optional[str] = None
     first_superuser_password: Optional[str] = None
+    # Как часто (в секундах) процесс сверяет версию кэша категорий с БД
+    category_cache_check_interval: float = 5.0
+    # Часовой пояс, в котором хранятся даты записей учета. Даты наивные и
+    # по умолчанию заполняются dt.now() сервера
+    ledger_timezone: str = 'UTC'
+    # Фоновое занесение повторяющихся записей: как часто (в секундах)
+    # искать наступившие повторения, сколько повторений заносить одной
+    # транзакцией и на сколько секунд воркер берет аренду задачи
+    recurring_scheduler_enabled: bool = True
+    recurring_interval: float = 60
+    recurring_batch_size: int = 1000
+    recurring_lease_seconds: float = 300
+    # Кэш вычисляемых ответов: memory — в памяти процесса, redis — общий
+    # для всех воркеров по cache_url (redis://[user:password@]host:port/db),
+    # none — отключен
+    cache_backend: Literal['memory', 'redis', 'none'] = 'memory'
+    cache_url: str = 'redis://localhost:6379/0'
+    cache_ttl: float = 300
+    cache_max_entries: int = 10_000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    # Кэш пользователей по токену: сколько секунд живет запись (0 —
+    # отключен) и сколько пользователей хранится
+    user_cache_ttl: float = 30
+    user_cache_max_entries: int = 10_000
+    # Хеширование паролей: пул thread или process из password_hash_workers
+    # исполнителей (0 — в цикле событий, не больше числа ядер минус одно),
+    # на сколько понижен их приоритет (0 — не понижать) и параметры argon2.
+    # При изменении параметров хеш пароля пересчитывается при следующем
+    # входе
+    password_hash_executor: Literal['thread', 'process'] = 'thread'
+    password_hash_workers: int = 2
+    password_hash_nice: int = 10
+    password_argon2_time_cost: int = 3
+    password_argon2_memory_cost: int = 65536
+    password_argon2_parallelism: int = 4
+    # Метрики Prometheus: middleware и GET /metrics без авторизации —
+    # закрывать снаружи на уровне прокси или отключать
+    metrics_enabled: bool = True
 
     model_config = SettingsConfigDict(env_file='.env')
 
@@ -1,13 +1,20 @@
+from itertools import cycle
+from math import ceil
+from time import time
 from typing import Annotated, Optional
 
-from fastapi import Depends
-from sqlalchemy import Boolean, CheckConstraint, DateTime, Integer
+from fastapi import Depends, Request, Response
+from sqlalchemy import (
+    Boolean, CheckConstraint, DateTime, Integer, URL, event, make_url)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import (
-    create_async_engine, async_sessionmaker, AsyncSession
+    AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.pool import InstrumentedAsyncQueuePool
 
 
 class Base(DeclarativeBase):
@@ -19,8 +26,149 @@ class GeneralFieldBase(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
 
-engine = create_async_engine(settings.database_url)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+def is_sqlite_file(url: URL) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database not in (
+        None, '', ':memory:')
+
+
+def set_sqlite_pragmas(dbapi_connection, read_only: bool) -> None:
+    """Настраивает соединение SQLite: WAL (читатели не ждут писателя),
+    synchronous=NORMAL (fsync только при checkpoint), ожидание блокировки
+    вместо ошибки, mmap и кэш страниц."""
+    pragmas = [
+        'journal_mode = WAL',
+        'synchronous = NORMAL',
+        f'busy_timeout = {settings.sqlite_busy_timeout}',
+        f'mmap_size = {settings.sqlite_mmap_size}',
+        # Отрицательное значение задает размер кэша в KiB
+        f'cache_size = -{settings.sqlite_cache_size}',
+    ]
+    if read_only:
+        pragmas.append('query_only = ON')
+    cursor = dbapi_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(f'PRAGMA {pragma}')
+    cursor.close()
+
+
+def enable_sqlite_foreign_keys(dbapi_connection, _) -> None:
+    """Включает проверку внешних ключей: без нее SQLite молча принимает
+    записи с id удаленной категории, а PostgreSQL отклоняет их."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA foreign_keys = ON')
+    cursor.close()
+
+
+def create_engine(
+        url: str, pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None, read_only: bool = False
+) -> AsyncEngine:
+    """Создает движок с настройками пула из Settings.
+
+    SQLite в памяти работает через одно общее соединение (StaticPool),
+    поэтому настройки размера пула к нему не применяются. Файловой SQLite
+    в режиме sqlite_wal_mode соединения настраиваются set_sqlite_pragmas.
+    На SQLite включается проверка внешних ключей.
+    С metrics_enabled выражения движка считаются в метриках запросов.
+    """
+    url = make_url(url)
+    options = {
+        'pool_pre_ping': settings.db_pool_pre_ping,
+        'pool_recycle': settings.db_pool_recycle,
+    }
+    if url.get_backend_name() != 'sqlite' or is_sqlite_file(url):
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=pool_size or settings.db_pool_size,
+            max_overflow=(
+                settings.db_max_overflow
+                if max_overflow is None else max_overflow
+            ),
+            pool_timeout=settings.db_pool_timeout,
+        )
+    if url.get_driver_name() == 'asyncpg':
+        options['connect_args'] = {
+            'prepared_statement_cache_size': settings.db_statement_cache_size
+        }
+    engine = create_async_engine(url, **options)
+    if settings.metrics_enabled:
+        instrument_engine(engine.sync_engine)
+    if url.get_backend_name() == 'sqlite':
+        event.listen(
+            engine.sync_engine, 'connect', enable_sqlite_foreign_keys
+        )
+    if settings.sqlite_wal_mode and is_sqlite_file(url):
+        event.listen(
+            engine.sync_engine, 'connect',
+            lambda dbapi_connection, _: set_sqlite_pragmas(
+                dbapi_connection, read_only
+            )
+        )
+    return engine
+
+
+# Файловая SQLite в режиме WAL: все записи идут через одно соединение
+# (engine), чтения — через пул соединений только для чтения (read_engine).
+# Писатели ждут соединение в пуле, а не блокировку файла, и читатели их
+# не блокируют.
+SQLITE_SPLIT = settings.sqlite_wal_mode and is_sqlite_file(
+    make_url(settings.database_url)
+)
+
+if SQLITE_SPLIT:
+    engine = create_engine(settings.database_url, pool_size=1, max_overflow=0)
+    read_engine = create_engine(settings.database_url, read_only=True)
+else:
+    engine = read_engine = create_engine(settings.database_url)
+
+# Ключ в Session.info: в текущей транзакции уже была запись
+SESSION_WROTE = 'wrote'
+
+
+class RoutingSession(Session):
+    """Сессия, которая выполняет SELECT через read_engine, а остальное —
+    через engine. После первой записи или SELECT ... FOR UPDATE и до конца
+    транзакции все выражения идут через engine, чтобы транзакция видела
+    свои изменения."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and (
+                not clause.is_select
+                or getattr(clause, '_for_update_arg', None) is not None)):
+            self.info[SESSION_WROTE] = True
+        if (clause is not None and clause.is_select
+                and not self.info.get(SESSION_WROTE)):
+            return read_engine.sync_engine
+        return engine.sync_engine
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def reset_session_wrote(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(SESSION_WROTE, None)
+
+
+if SQLITE_SPLIT:
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=RoutingSession, expire_on_commit=False
+    )
+else:
+    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+
+# Реплики только для чтения. Запросы распределяются по ним по очереди
+replica_engines = [
+    create_engine(url) for url in settings.database_replica_urls
+]
+replica_sessionmakers = cycle([
+    async_sessionmaker(replica_engine, expire_on_commit=False)
+    for replica_engine in replica_engines
+])
+
+# Cookie с моментом (unix time), до которого чтения клиента идут в основную
+# БД: реплика может еще не получить его последнюю запись
+PRIMARY_UNTIL_COOKIE = 'db_primary_until'
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
 
 
 async def get_async_session():
@@ -28,4 +176,59 @@ async def get_async_session():
         yield async_session
 
 
+def reads_from_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies[PRIMARY_UNTIL_COOKIE]) > time()
+    except (KeyError, ValueError):
+        return False
+
+
+async def get_read_session(request: Request):
+    """Сессия для обработчиков, которые только читают. Без реплик и
+    вскоре после записи клиента совпадает с обычной сессией."""
+    if not replica_engines or reads_from_primary(request):
+        sessionmaker = AsyncSessionLocal
+    else:
+        sessionmaker = next(replica_sessionmakers)
+    async with sessionmaker() as async_session:
+        yield async_session
+
+
+async def stick_to_primary_after_write(request: Request, call_next):
+    """Middleware: после успешного изменяющего запроса ставит cookie,
+    по которой чтения клиента replica_read_your_writes_seconds секунд идут
+    в основную БД."""
+    response: Response = await call_next(request)
+    if (replica_engines and request.method not in SAFE_METHODS
+            and response.status_code < 400):
+        window = settings.replica_read_your_writes_seconds
+        response.set_cookie(
+            PRIMARY_UNTIL_COOKIE, str(time() + window),
+            max_age=ceil(window), httponly=True, samesite='lax'
+        )
+    return response
+
+
+def get_engines() -> dict[str, AsyncEngine]:
+    """Возвращает движки приложения по именам для статистики пулов."""
+    engines = {'primary': engine}
+    if SQLITE_SPLIT:
+        engines['read'] = read_engine
+    for number, replica_engine in enumerate(replica_engines):
+        engines[f'replica_{number}'] = replica_engine
+    return engines
+
+
+def is_postgresql(session: AsyncSession) -> bool:
+    return session.get_bind().dialect.name == 'postgresql'
+
+
+def dialect_insert(session: AsyncSession, table):
+    """Возвращает INSERT с поддержкой ON CONFLICT для диалекта сессии."""
+    if is_postgresql(session):
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
 SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
@@ -0,0 +1,47 @@
+"""Условные GET-запросы по ETag.
+
+ETag строится из версий данных (см. таблицу cache_version) и строки запроса,
+поэтому проверка If-None-Match обходится без выполнения запроса списка.
+"""
+import hashlib
+from http import HTTPStatus
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Ответ можно хранить только в кэше клиента и нужно сверять при каждом
+# использовании
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts) -> str:
+    """Собирает слабый ETag из частей, от которых зависит ответ."""
+    raw = '|'.join(str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Проверяет If-None-Match слабым сравнением (RFC 9110, 13.1.2)."""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(
+        candidate.strip().removeprefix('W/') == opaque
+        for candidate in header.split(',')
+    )
+
+
+def conditional_response(
+        request: Request, response: Response, *parts
+) -> Optional[Response]:
+    """Ставит ETag в ответ. Возвращает готовый ответ 304, если у клиента
+    актуальная копия, иначе None."""
+    etag = make_etag(request.url.path, request.url.query, *parts)
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
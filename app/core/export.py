@@ -0,0 +1,73 @@
+"""Потоковая сериализация записей для выгрузки в CSV и NDJSON."""
+import csv
+import io
+import zlib
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+
+from app.schemas.export import ExportFormat
+
+EXPORT_CHUNK_ROWS = 1000
+GZIP_WBITS = 31
+MEDIA_TYPES = {
+    ExportFormat.csv: 'text/csv; charset=utf-8',
+    ExportFormat.ndjson: 'application/x-ndjson',
+}
+
+
+async def csv_chunks(
+        rows: AsyncIterator, schema: type[BaseModel]
+) -> AsyncIterator[bytes]:
+    """Сериализует записи в CSV с заголовком по полям схемы."""
+    fields = list(schema.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    count = 0
+    async for row in rows:
+        data = schema.model_validate(row).model_dump(mode='json')
+        writer.writerow([data[field] for field in fields])
+        count += 1
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(
+        rows: AsyncIterator, schema: type[BaseModel]
+) -> AsyncIterator[bytes]:
+    """Сериализует записи в NDJSON: один JSON-объект на строку."""
+    lines = []
+    async for row in rows:
+        lines.append(schema.model_validate(row).model_dump_json())
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines.clear()
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Сжимает поток gzip-ом, не накапливая его в памяти."""
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(
+        rows: AsyncIterator, schema: type[BaseModel],
+        export_format: ExportFormat, compress: bool = False
+) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.csv:
+        chunks = csv_chunks(rows, schema)
+    else:
+        chunks = ndjson_chunks(rows, schema)
+    if compress:
+        return gzip_chunks(chunks)
+    return chunks
@@ -32,6 +32,25 @@ async def create_user(
         pass
 
 
+async def create_users(
+        emails: list[EmailStr], password: str, is_superuser: bool = False
+):
+    """Создает пользователей с одним паролем через UserManager.create_many:
+    с той же проверкой, что и create_user, но одним INSERT и одним
+    хешированием пароля. Существующие email пропускаются."""
+    async with get_async_session_context() as session:
+        async with get_user_db_context(session) as user_db:
+            async with get_user_manager_context(user_db) as user_manager:
+                await user_manager.create_many([
+                    UserCreate(
+                        email=email,
+                        password=password,
+                        is_superuser=is_superuser
+                    )
+                    for email in emails
+                ])
+
+
 async def create_first_superuser():
     """Создает первого суперпользователя на основе настроек приложения."""
     if (settings.first_superuser_email is not None
@@ -0,0 +1,269 @@
+"""Метрики запросов в текстовом формате Prometheus.
+
+MetricsMiddleware замеряет каждый HTTP-запрос: длительность до отправки
+тела ответа целиком, число одновременно выполняемых запросов и коды
+ответов. Выражения SQL считаются событиями before_cursor_execute и
+after_cursor_execute движков (их подключает create_engine в
+app.core.db) в счетчик текущего запроса из contextvar, поэтому у каждого
+запроса свои число выражений и время в БД.
+
+Метки — метод и шаблон маршрута (/api/expense/{expense_id}), а не путь
+запроса, поэтому число рядов ограничено числом маршрутов. Запросы, не
+совпавшие ни с одним маршрутом, попадают в один ряд UNMATCHED_ROUTE.
+Метрики считаются в текущем процессе: при нескольких воркерах каждый
+отдает свои.
+"""
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app.core.pool import Histogram, InstrumentedAsyncQueuePool, pool_snapshot
+
+# Верхние границы корзин, в секундах и в выражениях на запрос
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1,
+                   2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+UNMATCHED_ROUTE = '<unmatched>'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class StatementCounter:
+    """Число и суммарное время выражений SQL одного запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+current_statements: ContextVar[Optional[StatementCounter]] = ContextVar(
+    'current_statements', default=None
+)
+
+
+class RequestMetrics:
+    """Счетчики и гистограммы запросов по методу и шаблону маршрута."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self.durations: dict[tuple[str, str], Histogram] = {}
+        self.statements: dict[tuple[str, str], Histogram] = {}
+        self.statement_seconds: dict[tuple[str, str], Histogram] = {}
+        # Все выражения процесса, в том числе вне запросов (планировщик)
+        self.statements_total = 0
+        self.statement_seconds_total = 0.0
+
+    def observe_statement(self, seconds: float) -> None:
+        self.statements_total += 1
+        self.statement_seconds_total += seconds
+        counter = current_statements.get()
+        if counter is not None:
+            counter.count += 1
+            counter.seconds += seconds
+
+    def observe_request(
+            self, method: str, route: str, status: int, seconds: float,
+            counter: StatementCounter
+    ) -> None:
+        key = (method, route)
+        self.responses[(*key, status)] = (
+            self.responses.get((*key, status), 0) + 1
+        )
+        for histograms, buckets, value in (
+                (self.durations, REQUEST_BUCKETS, seconds),
+                (self.statements, STATEMENT_BUCKETS, counter.count),
+                (self.statement_seconds, REQUEST_BUCKETS, counter.seconds),
+        ):
+            if key not in histograms:
+                histograms[key] = Histogram(buckets)
+            histograms[key].observe(value)
+
+    def render(self) -> list[str]:
+        labels = ('method', 'route')
+        lines = metric_header(
+            'http_requests_in_flight', 'gauge',
+            'Запросы, которые выполняются сейчас.'
+        )
+        lines.append(f'http_requests_in_flight {self.in_flight}')
+        lines += metric_header(
+            'http_requests_total', 'counter',
+            'Ответы по методу, маршруту и коду.'
+        )
+        lines += [
+            sample('http_requests_total',
+                   zip((*labels, 'status'), key), count)
+            for key, count in sorted(self.responses.items())
+        ]
+        for name, histograms, description in (
+                ('http_request_duration_seconds', self.durations,
+                 'Длительность запроса.'),
+                ('http_request_db_statements', self.statements,
+                 'Выражения SQL за запрос.'),
+                ('http_request_db_seconds', self.statement_seconds,
+                 'Время выполнения выражений SQL за запрос.'),
+        ):
+            lines += metric_header(name, 'histogram', description)
+            for key, histogram in sorted(histograms.items()):
+                lines += render_histogram(
+                    name, zip(labels, key), histogram
+                )
+        lines += metric_header(
+            'db_statements_total', 'counter',
+            'Выражения SQL процесса, включая выполненные вне запросов.'
+        )
+        lines.append(f'db_statements_total {self.statements_total}')
+        lines += metric_header(
+            'db_statement_seconds_total', 'counter',
+            'Время выполнения выражений SQL процесса.'
+        )
+        lines.append(
+            f'db_statement_seconds_total {self.statement_seconds_total}'
+        )
+        return lines
+
+
+def escape_label(value) -> str:
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def sample(name: str, labels: Iterable[tuple[str, object]], value) -> str:
+    text = ','.join(
+        f'{label}="{escape_label(label_value)}"'
+        for label, label_value in labels
+    )
+    return f'{name}{{{text}}} {value}' if text else f'{name} {value}'
+
+
+def metric_header(name: str, kind: str, description: str) -> list[str]:
+    return [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+
+
+def render_histogram(
+        name: str, labels: Iterable[tuple[str, object]],
+        histogram: Histogram
+) -> list[str]:
+    """Ряды гистограммы: накопительные корзины, +Inf, сумма и число."""
+    labels = list(labels)
+    snapshot = histogram.snapshot()
+    lines = [
+        sample(f'{name}_bucket', [*labels, ('le', bucket['le'])],
+               bucket['count'])
+        for bucket in snapshot['buckets']
+    ]
+    lines.append(
+        sample(f'{name}_bucket', [*labels, ('le', '+Inf')],
+               snapshot['count'])
+    )
+    lines.append(sample(f'{name}_sum', labels, snapshot['sum']))
+    lines.append(sample(f'{name}_count', labels, snapshot['count']))
+    return lines
+
+
+def render_pools(pools: dict[str, Pool]) -> list[str]:
+    """Ряды состояния пулов соединений по именам движков: занятые
+    соединения, таймауты и гистограмма ожидания соединения."""
+    snapshots = {name: pool_snapshot(pool) for name, pool in pools.items()}
+    lines = []
+    for name, kind, description in (
+            ('checked_out', 'gauge', 'Занятые соединения пула.'),
+            ('timeouts', 'counter', 'Таймауты ожидания соединения пула.'),
+    ):
+        metric = f'db_pool_{name}' + ('_total' if kind == 'counter' else '')
+        lines += metric_header(metric, kind, description)
+        lines += [
+            sample(metric, [('engine', engine)], snapshot[name])
+            for engine, snapshot in snapshots.items() if name in snapshot
+        ]
+    lines += metric_header(
+        'db_pool_wait_seconds', 'histogram', 'Ожидание соединения пула.'
+    )
+    for engine, pool in pools.items():
+        if isinstance(pool, InstrumentedAsyncQueuePool):
+            lines += render_histogram(
+                'db_pool_wait_seconds', [('engine', engine)],
+                pool.stats.wait
+            )
+    return lines
+
+
+def render_cache(stats: dict) -> list[str]:
+    lines = []
+    for result in ('hits', 'misses'):
+        name = f'response_cache_{result}_total'
+        lines += metric_header(name, 'counter', 'Обращения к кэшу ответов.')
+        lines.append(f'{name} {stats[result]}')
+    return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+) -> None:
+    context.metrics_started = perf_counter()
+
+
+def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+) -> None:
+    request_metrics.observe_statement(
+        perf_counter() - context.metrics_started
+    )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключает подсчет выражений SQL к синхронному движку."""
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def route_template(scope: dict) -> str:
+    route = scope.get('route')
+    return getattr(route, 'path_format', None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI-middleware, которое записывает запросы в request_metrics.
+
+    Длительность отсчитывается до последнего фрагмента тела ответа, так
+    что потоковая выгрузка учитывается целиком. Маршрут берется из
+    scope['route'], который FastAPI заполняет при выборе обработчика.
+    Необработанное исключение учитывается как ответ 500.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        counter = StatementCounter()
+        token = current_statements.set(counter)
+        request_metrics.in_flight += 1
+        started = perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.in_flight -= 1
+            current_statements.reset(token)
+            request_metrics.observe_request(
+                scope['method'], route_template(scope), status,
+                perf_counter() - started, counter
+            )
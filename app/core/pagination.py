@@ -0,0 +1,51 @@
+"""Курсорная (keyset) пагинация списков по ключу (date, id)."""
+import base64
+from datetime import datetime as dt
+from typing import Optional, Sequence
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+CURSOR_SEPARATOR = '|'
+# Колонки, по которым строится курсор следующей страницы
+CURSOR_FIELDS = ('date', 'id')
+MAX_CURSOR_ID = 2 ** 63 - 1
+
+
+def encode_cursor(date: dt, obj_id: int) -> str:
+    """Кодирует позицию последней записи страницы в непрозрачный курсор."""
+    raw = f'{date.isoformat()}{CURSOR_SEPARATOR}{obj_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[dt, int]:
+    """Декодирует курсор в пару (date, id). ValueError для неверного
+    курсора."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    except (ValueError, UnicodeDecodeError) as error:
+        raise ValueError('Некорректный курсор') from error
+    date, _, obj_id = raw.partition(CURSOR_SEPARATOR)
+    date, obj_id = dt.fromisoformat(date), int(obj_id)
+    # Даты записей наивные, id — положительные BIGINT: иное курсор,
+    # выданный сервером, содержать не может
+    if date.tzinfo is not None or not 0 < obj_id <= MAX_CURSOR_ID:
+        raise ValueError('Некорректный курсор')
+    return date, obj_id
+
+
+def cut_page(rows: Sequence, limit: int) -> tuple[list, Optional[str]]:
+    """Отрезает страницу из limit + 1 записей и возвращает курсор следующей."""
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(last.date, last.id)
+
+
+def with_cursor_fields(fields: Sequence[str]) -> tuple[str, ...]:
+    """Дополняет список колонок колонками курсора, если их в нем нет."""
+    return (*fields, *(
+        field for field in CURSOR_FIELDS if field not in fields
+    ))
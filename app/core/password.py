@@ -0,0 +1,148 @@
+"""Хеширование паролей вне цикла событий.
+
+argon2 и bcrypt нагружают процессор на десятки миллисекунд на пароль. Если
+выполнять их прямо в корутине, серия входов останавливает все остальные
+запросы воркера. Поэтому хеширование и проверка выполняются в отдельном
+пуле потоков или процессов, а семафор ограничивает число одновременных
+задач размером пула.
+
+Пул сам по себе не защищает цикл событий от нехватки процессора: потоки
+argon2 (parallelism на каждый хеш) конкурируют с ним за ядра, и во время
+серии входов p99 посторонних запросов растет в десятки раз. Поэтому пул
+не больше числа ядер минус одно, а его потоки и процессы работают с
+пониженным приоритетом (password_hash_nice), который на Linux наследуют и
+потоки argon2.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor)
+from typing import Callable, Optional
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from app.core.config import settings
+
+PASSWORD_HASH_EXECUTOR_PROCESS = 'process'
+
+_password_hash: Optional[PasswordHash] = None
+
+
+def build_password_hash() -> PasswordHash:
+    """Создает PasswordHash с параметрами argon2 из настроек. bcrypt
+    оставлен для проверки старых хешей, при входе они пересчитываются в
+    argon2."""
+    return PasswordHash((
+        Argon2Hasher(
+            time_cost=settings.password_argon2_time_cost,
+            memory_cost=settings.password_argon2_memory_cost,
+            parallelism=settings.password_argon2_parallelism,
+        ),
+        BcryptHasher(),
+    ))
+
+
+def get_password_hash() -> PasswordHash:
+    """Возвращает PasswordHash текущего процесса (в том числе процесса
+    пула)."""
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = build_password_hash()
+    return _password_hash
+
+
+def hash_password(password: str) -> str:
+    return get_password_hash().hash(password)
+
+
+def verify_and_update_password(
+        password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Проверяет пароль. Вторым значением возвращает новый хеш, если хеш
+    построен с устаревшими параметрами или алгоритмом."""
+    return get_password_hash().verify_and_update(password, hashed_password)
+
+
+def lower_priority(nice: int) -> None:
+    """Понижает приоритет текущего потока (или процесса пула) на nice.
+
+    На Linux приоритет задается отдельно для каждого потока и наследуется
+    созданными им потоками. Где это не поддерживается, приоритет не
+    меняется: понижать его всему процессу нельзя."""
+    if nice <= 0 or not hasattr(os, 'setpriority'):
+        return
+    try:
+        thread_id = threading.get_native_id()
+        os.setpriority(
+            os.PRIO_PROCESS, thread_id,
+            os.getpriority(os.PRIO_PROCESS, thread_id) + nice
+        )
+    except OSError:
+        pass
+
+
+def pool_size(workers: int) -> int:
+    """Размер пула: не больше числа ядер минус одно, которое остается
+    циклу событий, но не меньше одного исполнителя."""
+    if workers <= 0:
+        return 0
+    return max(1, min(workers, (os.cpu_count() or 1) - 1))
+
+
+class PasswordHasher:
+    """Выполняет хеширование в пуле из pool_size(workers) потоков или
+    процессов с приоритетом, пониженным на nice. При workers=0 хеширование
+    выполняется в цикле событий."""
+
+    def __init__(self, executor_kind: str, workers: int, nice: int = 0):
+        self.executor_kind = executor_kind
+        self.workers = pool_size(workers)
+        self.nice = nice
+        self.executor: Optional[Executor] = None
+        self.semaphore = asyncio.Semaphore(max(self.workers, 1))
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            if self.executor_kind == PASSWORD_HASH_EXECUTOR_PROCESS:
+                self.executor = ProcessPoolExecutor(
+                    self.workers, initializer=lower_priority,
+                    initargs=(self.nice,)
+                )
+            else:
+                self.executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix='password-hash',
+                    initializer=lower_priority, initargs=(self.nice,)
+                )
+        return self.executor
+
+    async def run(self, func: Callable, *args):
+        if self.workers == 0:
+            return func(*args)
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.get_executor(), func, *args
+            )
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify_and_update(
+            self, password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        return await self.run(
+            verify_and_update_password, password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.password_hash_executor, settings.password_hash_workers,
+    settings.password_hash_nice
+)
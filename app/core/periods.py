@@ -0,0 +1,76 @@
+"""Границы отчетных периодов относительно заданного момента."""
+from calendar import monthrange
+from datetime import datetime as dt, timedelta
+
+ALL_TIME = 'all'
+DAY, WEEK, MONTH = 'day', 'week', 'month'
+
+
+def start_of_day(moment: dt) -> dt:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def start_of_month(moment: dt) -> dt:
+    return start_of_day(moment).replace(day=1)
+
+
+def next_month(moment: dt) -> dt:
+    """Возвращает начало месяца, следующего за месяцем moment."""
+    return (start_of_month(moment) + timedelta(days=32)).replace(day=1)
+
+
+def period_bounds(moment: dt) -> dict[str, tuple[dt, dt]]:
+    """Возвращает полуоткрытые интервалы [start, end) текущих дня,
+    недели (с понедельника) и месяца."""
+    day = start_of_day(moment)
+    week = day - timedelta(days=day.weekday())
+    month = start_of_month(moment)
+    return {
+        'day': (day, day + timedelta(days=1)),
+        'week': (week, week + timedelta(days=7)),
+        'month': (month, next_month(month)),
+    }
+
+
+def start_of_bucket(moment: dt, bucket: str) -> dt:
+    """Возвращает начало дня, недели (с понедельника) или месяца, в
+    который попадает moment."""
+    if bucket == MONTH:
+        return start_of_month(moment)
+    day = start_of_day(moment)
+    if bucket == WEEK:
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def next_bucket(start: dt, bucket: str) -> dt:
+    """Возвращает начало интервала, следующего за интервалом start."""
+    if bucket == MONTH:
+        return next_month(start)
+    return start + timedelta(days=7 if bucket == WEEK else 1)
+
+
+def bucket_starts(start: dt, end: dt, bucket: str) -> list[dt]:
+    """Возвращает начала интервалов, покрывающих [start, end)."""
+    starts, moment = [], start_of_bucket(start, bucket)
+    while moment < end:
+        starts.append(moment)
+        moment = next_bucket(moment, bucket)
+    return starts
+
+
+def add_months(moment: dt, months: int) -> dt:
+    """Сдвигает moment на months месяцев. День, которого нет в месяце
+    (31-е и т.п.), заменяется последним днем месяца."""
+    index = moment.month - 1 + months
+    year, month = moment.year + index // 12, index % 12 + 1
+    return moment.replace(
+        year=year, month=month, day=min(moment.day, monthrange(year, month)[1])
+    )
+
+
+def add_periods(moment: dt, period: str, count: int) -> dt:
+    """Сдвигает moment на count дней, недель или месяцев."""
+    if period == MONTH:
+        return add_months(moment, count)
+    return moment + timedelta(days=count * (7 if period == WEEK else 1))
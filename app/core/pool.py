@@ -0,0 +1,90 @@
+"""Пул соединений с БД со статистикой.
+
+Помимо стандартных счетчиков QueuePool (занято, свободно, переполнение)
+замеряет, сколько запрос ждет соединение, и считает таймауты ожидания.
+Рост ожидания при занятом пуле — признак того, что пул мал для нагрузки.
+"""
+from bisect import bisect_left
+from time import perf_counter
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Верхние границы корзин гистограммы ожидания, в секундах
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+                10, 30)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """Возвращает накопительные счетчики по корзинам: в корзину le
+        попадают все значения не больше le. Значения больше последней
+        границы учтены только в count."""
+        cumulative, buckets = 0, []
+        for le, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets.append({'le': le, 'count': cumulative})
+        return {'buckets': buckets, 'sum': self.sum, 'count': self.count}
+
+
+class PoolStats:
+    def __init__(self):
+        self.wait = Histogram(WAIT_BUCKETS)
+        self.timeouts = 0
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который замеряет время получения
+    соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.wait.observe(perf_counter() - started)
+
+    def recreate(self):
+        # Статистика переживает пересоздание пула, например при dispose()
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def pool_snapshot(pool: Pool) -> dict:
+    """Возвращает текущее состояние пула и накопленную статистику."""
+    snapshot = {'pool': type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # overflow() отрицателен, пока пул не заполнен до pool_size
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        snapshot.update(
+            timeouts=pool.stats.timeouts,
+            wait_seconds=pool.stats.wait.snapshot(),
+        )
+    return snapshot
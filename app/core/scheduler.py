@@ -0,0 +1,76 @@
+"""Фоновое занесение повторяющихся записей.
+
+Планировщик запускается в lifespan каждого воркера, но работает только
+тот, кто удерживает аренду LEASE_NAME в таблице lease: остальные раз в
+recurring_interval секунд пробуют ее взять и спят. Аренда продлевается
+перед каждым пакетом и освобождается при остановке воркера; если воркер
+упал, ее перехватывают после recurring_lease_seconds. Даже при
+одновременном запуске повторения не задваиваются: записи создаются только
+для ключей повторений, которые вставил сам пакет.
+"""
+import asyncio
+import logging
+import os
+import socket
+from contextlib import suppress
+from datetime import datetime as dt
+from typing import Optional
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.crud.lease import lease_crud
+from app.crud.recurring import recurring_rule_crud
+
+LEASE_NAME = 'recurring'
+
+logger = logging.getLogger(__name__)
+
+
+class RecurringScheduler:
+
+    def __init__(self):
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}'
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self.task
+        self.task = None
+        async with AsyncSessionLocal() as session:
+            await lease_crud.release(LEASE_NAME, self.owner, session)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception('Ошибка занесения повторяющихся записей')
+            await asyncio.sleep(settings.recurring_interval)
+
+    async def tick(self) -> int:
+        """Если аренда у этого воркера, заносит все наступившие повторения
+        пакетами по recurring_batch_size. Возвращает число обработанных
+        повторений."""
+        processed = 0
+        async with AsyncSessionLocal() as session:
+            while await lease_crud.acquire(
+                LEASE_NAME, self.owner, settings.recurring_lease_seconds,
+                session
+            ):
+                count = await recurring_rule_crud.materialize_due(
+                    session, dt.now(), settings.recurring_batch_size
+                )
+                processed += count
+                if count < settings.recurring_batch_size:
+                    break
+        return processed
+
+
+recurring_scheduler = RecurringScheduler()
@@ -0,0 +1,130 @@
+"""Полнотекстовый поиск по описаниям записей учета.
+
+SQLite: для каждой таблицы учета FTS5-таблица {table}_fts с внешним
+содержимым (content={table}). Ее синхронизируют триггеры на INSERT,
+UPDATE и DELETE, поэтому индекс актуален и после пакетных операций, и
+после каскадного удаления записей категории. Кроме описания
+индексируется user_id: отбор по пользователю — тоже поиск по индексу, и
+время запроса зависит от числа совпавших записей пользователя, а не от
+размера таблицы.
+
+PostgreSQL: GIN-индекс по выражению to_tsvector от описания. Выражение
+индекса БД пересчитывает сама при каждом изменении строки.
+
+DDL создается миграцией, а при Base.metadata.create_all — обработчиками
+after_create из register_search_index.
+"""
+import re
+
+from sqlalchemy import DDL, Table, event
+
+# Конфигурация полнотекстового поиска PostgreSQL. Запрос должен
+# использовать ту же конфигурацию, что и индекс, иначе индекс не
+# применяется
+TS_CONFIG = 'simple'
+FTS_SUFFIX = '_fts'
+MAX_SEARCH_TERMS = 8
+WORD = re.compile(r'\w+')
+
+
+def fts_table_name(table_name: str) -> str:
+    return f'{table_name}{FTS_SUFFIX}'
+
+
+def is_search_table(name: str) -> bool:
+    """Таблица FTS5 или ее служебная таблица (_data, _idx и т.п.)."""
+    return FTS_SUFFIX in name
+
+
+def search_terms(text: str) -> list[str]:
+    """Слова поискового запроса без знаков препинания и операторов."""
+    return WORD.findall(text.lower())[:MAX_SEARCH_TERMS]
+
+
+def fts5_query(user_id: int, terms: list[str]) -> str:
+    """Запрос FTS5: записи пользователя, в описании которых есть слова,
+    начинающиеся с каждого из terms."""
+    words = ' '.join(f'"{term}"*' for term in terms)
+    return f'user_id : "{user_id}" AND description : ({words})'
+
+
+def tsquery(terms: list[str]) -> str:
+    """Запрос to_tsquery с тем же смыслом, что и fts5_query."""
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def sqlite_insert_new(fts: str) -> str:
+    return (
+        f'INSERT INTO {fts}(rowid, description, user_id) '
+        'VALUES (new.id, new.description, new.user_id);'
+    )
+
+
+def sqlite_insert_trigger_name(table_name: str) -> str:
+    return f'{fts_table_name(table_name)}_ai'
+
+
+def sqlite_insert_trigger_ddl(table_name: str) -> str:
+    return (
+        f'CREATE TRIGGER {sqlite_insert_trigger_name(table_name)} '
+        f'AFTER INSERT ON {table_name} '
+        f'BEGIN {sqlite_insert_new(fts_table_name(table_name))} END'
+    )
+
+
+def sqlite_backfill_sql(table_name: str) -> str:
+    """Добавляет в индекс строки с id больше :after. Для пакетной
+    загрузки: триггер на INSERT на время загрузки удаляется, и строки
+    индексируются одним выражением, а не по одной."""
+    return (
+        f'INSERT INTO {fts_table_name(table_name)}'
+        '(rowid, description, user_id) '
+        f'SELECT id, description, user_id FROM {table_name} '
+        'WHERE id > :after'
+    )
+
+
+def sqlite_search_ddl(table_name: str) -> list[str]:
+    fts = fts_table_name(table_name)
+    insert_new = sqlite_insert_new(fts)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, description, user_id) "
+        "VALUES ('delete', old.id, old.description, old.user_id);"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(description, user_id, "
+        f"content='{table_name}', content_rowid='id', prefix='2 3', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        sqlite_insert_trigger_ddl(table_name),
+        f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} '
+        f'BEGIN {delete_old} END',
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF description, user_id '
+        f'ON {table_name} BEGIN {delete_old} {insert_new} END',
+    ]
+
+
+def postgresql_search_ddl(table_name: str) -> list[str]:
+    return [
+        f'CREATE INDEX ix_{table_name}_description_fts ON {table_name} '
+        f"USING gin (to_tsvector('{TS_CONFIG}', "
+        "coalesce(description, '')))",
+    ]
+
+
+def register_search_index(table: Table) -> None:
+    """Создает поисковый индекс таблицы вместе с ней при create_all."""
+    for statement in sqlite_search_ddl(table.name):
+        event.listen(
+            table, 'after_create',
+            DDL(statement).execute_if(dialect='sqlite')
+        )
+    for statement in postgresql_search_ddl(table.name):
+        event.listen(
+            table, 'after_create',
+            DDL(statement).execute_if(dialect='postgresql')
+        )
+    event.listen(
+        table, 'before_drop',
+        DDL(f'DROP TABLE IF EXISTS {fts_table_name(table.name)}')
+        .execute_if(dialect='sqlite')
+    )
@@ -0,0 +1,51 @@
+"""Быстрая сериализация списков в JSON.
+
+Обычный путь FastAPI для response_model=list[...] проверяет каждый
+ORM-объект схемой (from_attributes) и затем кодирует результат. Для
+страниц записей учета это лишняя работа: строки приходят из БД уже в
+нужных типах. Обработчик читает строки с колонками схемы и отдает их
+через FastJSONResponse, минуя повторную проверку. response_model в
+декораторе остается, поэтому схема OpenAPI не меняется.
+
+Кодирует orjson, если он установлен, иначе pydantic_core.to_json.
+"""
+from typing import Any, Sequence
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return to_json(content)
+
+
+class FastJSONResponse(Response):
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def schema_fields(schema: type[BaseModel]) -> tuple[str, ...]:
+    """Поля схемы ответа в порядке ее объявления."""
+    return tuple(schema.model_fields)
+
+
+def rows_response(
+        rows: Sequence[Sequence], fields: Sequence[str], response: Response
+) -> FastJSONResponse:
+    """Собирает JSON-массив объектов из строк с колонками fields.
+    Колонки строки сверх fields (например, колонки курсора) не попадают в
+    ответ. Заголовки, уже выставленные обработчиком в response,
+    переносятся в ответ."""
+    return FastJSONResponse(
+        [dict(zip(fields, row)) for row in rows], headers=response.headers
+    )
@@ -0,0 +1,185 @@
+"""Суммы записей учета по дням, неделям или месяцам в поясе клиента.
+
+Даты записей наивные и хранятся в поясе settings.ledger_timezone. Чтобы
+сгруппировать их по интервалам клиента, к дате прибавляется разница
+смещений UTC пояса клиента и пояса хранения, и дата усекается до начала
+интервала: date_trunc на PostgreSQL, date() с модификаторами на SQLite.
+При переходах на летнее время разница меняется, поэтому диапазон
+делится на отрезки с постоянной разницей, и выражение для отрезка
+выбирается CASE.
+
+Сутки хранения, целиком попадающие в один интервал, берутся из дневных
+итогов. Записи читаются только за сутки, внутри которых проходит граница
+интервала: при нулевой разнице таких нет, для недель и месяцев их по
+одним на границу, для дней со сдвигом — все.
+"""
+from datetime import date, datetime as dt, timedelta
+from typing import Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Select, case, func, null, select
+
+from app.core.config import settings
+from app.core.periods import DAY, MONTH, WEEK, start_of_day
+
+STORAGE_TZ = ZoneInfo(settings.ledger_timezone)
+# Сколько суток с границей интервала читается по записям. Больше —
+# интервалы читаются по записям целиком, без дневных итогов
+MAX_PARTIAL_DAYS = 200
+# Длина диапазона по умолчанию, если не задано его начало
+DEFAULT_TREND_DAYS = {DAY: 30, WEEK: 7 * 12, MONTH: 365}
+
+# Модификаторы date() SQLite, усекающие дату до начала интервала.
+# 'weekday 0' переводит на ближайшее воскресенье не раньше даты, отступ
+# на 6 дней дает понедельник той же недели
+SQLITE_TRUNCATE = {
+    DAY: (),
+    WEEK: ('weekday 0', '-6 days'),
+    MONTH: ('start of month',),
+}
+
+
+def to_storage(moment: dt, tz: ZoneInfo) -> dt:
+    """Переводит наивный момент в поясе tz в наивный момент пояса
+    хранения."""
+    return moment.replace(tzinfo=tz).astimezone(STORAGE_TZ).replace(
+        tzinfo=None
+    )
+
+
+def to_local(moment: dt, tz: ZoneInfo) -> dt:
+    """Приводит момент к наивному времени пояса tz. Наивный момент
+    считается уже заданным в этом поясе."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(tz).replace(tzinfo=None)
+
+
+def shift_minutes(moment: dt, tz: ZoneInfo) -> int:
+    """Сколько минут прибавить к дате хранения moment, чтобы получить
+    время в поясе tz."""
+    aware = moment.replace(tzinfo=STORAGE_TZ)
+    difference = aware.astimezone(tz).utcoffset() - aware.utcoffset()
+    return int(difference.total_seconds() // 60)
+
+
+def shift_segments(
+        start: dt, end: dt, tz: ZoneInfo
+) -> list[tuple[dt, int]]:
+    """Делит диапазон [start, end) дат хранения на отрезки с постоянным
+    сдвигом. Возвращает пары (начало отрезка, сдвиг в минутах).
+
+    Сдвиг проверяется раз в сутки, момент перехода уточняется двоичным
+    поиском с точностью до секунды.
+    """
+    segments = [(start, shift_minutes(start, tz))]
+    moment = start
+    while moment < end:
+        following = min(moment + timedelta(days=1), end)
+        shift = shift_minutes(following, tz)
+        if shift != segments[-1][1]:
+            low, high = moment, following
+            while high - low > timedelta(seconds=1):
+                middle = low + (high - low) / 2
+                if shift_minutes(middle, tz) == segments[-1][1]:
+                    low = middle
+                else:
+                    high = middle
+            segments.append((high, shift))
+        moment = following
+    return segments
+
+
+def partial_days(boundaries: list[dt]) -> list[date]:
+    """Сутки хранения, внутри которых проходит одна из границ."""
+    return sorted({
+        boundary.date() for boundary in boundaries
+        if boundary != start_of_day(boundary)
+    })
+
+
+def bucket_start(
+        column, segments: list[tuple[dt, int]], bucket: str, dialect: str
+):
+    """Выражение: начало интервала bucket в поясе клиента, в который
+    попадает дата хранения column.
+
+    На SQLite сдвиг передается в date() модификатором вместе с
+    усечением: так на каждую строку приходится один вызов функции.
+    """
+    def truncated(minutes: int):
+        if dialect == 'postgresql':
+            moment = column
+            if minutes:
+                moment = column + timedelta(minutes=minutes)
+            return func.date_trunc(bucket, moment)
+        modifiers = SQLITE_TRUNCATE[bucket]
+        if minutes:
+            modifiers = (f'{minutes:+d} minutes', *modifiers)
+        return func.date(column, *modifiers)
+
+    if len(segments) == 1:
+        return truncated(segments[0][1])
+    return case(
+        *[
+            (column < following, truncated(shift))
+            for (_, shift), (following, _) in zip(segments, segments[1:])
+        ],
+        else_=truncated(segments[-1][1])
+    )
+
+
+def fill_gaps(
+        rows: Sequence, starts: list[dt], by_category: bool
+) -> list[dict]:
+    """Собирает интервалы из строк (начало, категория, сумма, количество).
+    Строки одного интервала и категории складываются. Интервалы без
+    записей заполняются нулями. С by_category в каждом интервале
+    перечислены все категории диапазона, тоже с нулями."""
+    totals: dict[dt, dict[Optional[int], tuple]] = {}
+    category_ids = set()
+    for start, category_id, total, count in rows:
+        if not isinstance(start, dt):
+            start = dt.fromisoformat(str(start))
+        values = totals.setdefault(start, {})
+        previous_total, previous_count = values.get(category_id, (0, 0))
+        values[category_id] = (
+            float(previous_total) + float(total), previous_count + count
+        )
+        category_ids.add(category_id)
+    buckets = []
+    for start in starts:
+        values = totals.get(start, {})
+        bucket = {
+            'start': start,
+            'total': sum(total for total, _ in values.values()),
+            'count': sum(count for _, count in values.values()),
+        }
+        if by_category:
+            bucket['categories'] = [
+                {
+                    'category_id': category_id,
+                    'total': values.get(category_id, (0, 0))[0],
+                    'count': values.get(category_id, (0, 0))[1],
+                }
+                for category_id in sorted(category_ids)
+            ]
+        buckets.append(bucket)
+    return buckets
+
+
+def aggregate_buckets(source: Select, by_category: bool) -> Select:
+    """Суммирует строки source (колонки bucket, category_id, amount,
+    count) по интервалам и, с by_category, по категориям. Группировка
+    идет во внешнем запросе по колонке подзапроса: PostgreSQL не признает
+    одинаковыми выражения с разными параметрами в SELECT и GROUP BY."""
+    rows = source.subquery('rows')
+    group = [rows.c.bucket]
+    if by_category:
+        group.append(rows.c.category_id)
+    return select(
+        rows.c.bucket,
+        rows.c.category_id if by_category else null(),
+        func.sum(rows.c.amount),
+        func.sum(rows.c.count),
+    ).group_by(*group)
@@ -1,16 +1,24 @@
-from typing import Annotated, Optional, Union
+from collections import OrderedDict
+from time import monotonic
+from typing import Annotated, Any, Optional, Union
 
 from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (
-    BaseUserManager, FastAPIUsers, InvalidPasswordException, IntegerIDMixin)
+    BaseUserManager, FastAPIUsers, InvalidPasswordException, IntegerIDMixin,
+    exceptions)
 from fastapi_users.authentication import (
     AuthenticationBackend, BearerTransport, JWTStrategy
 )
+from fastapi_users.password import PasswordHelper
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
 
 from app.core.config import settings
-from app.core.db import get_async_session
+from app.core.db import dialect_insert, get_async_session
+from app.core.password import get_password_hash, password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate
 
@@ -35,7 +43,159 @@ auth_backend = AuthenticationBackend(
 )
 
 
+class UserCache:
+    """Кэш проверенных пользователей по id из токена (sub).
+
+    Хранит значения колонок, а не ORM-объекты, чтобы не делить один объект
+    между сессиями. Записи живут ttl секунд: изменения, сделанные через
+    другой воркер, подхватываются не позже чем через ttl.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: OrderedDict[int, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+
+    def get(self, user_id: int) -> Optional[dict[str, Any]]:
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= monotonic():
+            del self.entries[user_id]
+            return None
+        self.entries.move_to_end(user_id)
+        return data
+
+    def set(self, user: User) -> None:
+        if self.ttl <= 0:
+            return
+        self.entries[user.id] = (monotonic() + self.ttl, {
+            column.key: getattr(user, column.key)
+            for column in User.__table__.columns
+        })
+        self.entries.move_to_end(user.id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self.entries.pop(user_id, None)
+
+
+user_cache = UserCache(
+    settings.user_cache_ttl, settings.user_cache_max_entries
+)
+
+
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
+    """Хеширование и проверка паролей при регистрации, входе и смене
+    пароля выполняются в пуле password_hasher, а не в цикле событий."""
+
+    def __init__(self, user_db):
+        super().__init__(user_db, PasswordHelper(get_password_hash()))
+
+    async def get(self, id: int) -> User:
+        """Возвращает пользователя из кэша без запроса к БД, если он там
+        есть. Пользователь присоединяется к сессии запроса как загруженный,
+        поэтому его можно изменять как обычно."""
+        data = user_cache.get(id)
+        if data is None:
+            user = await super().get(id)
+            user_cache.set(user)
+            return user
+        session = self.user_db.session
+        user = session.identity_map.get(identity_key(User, id))
+        if user is None:
+            user = User(**data)
+            make_transient_to_detached(user)
+            session.add(user)
+        return user
+
+    async def create(
+            self, user_create: UserCreate, safe: bool = False,
+            request: Optional[Request] = None
+    ) -> User:
+        """Как BaseUserManager.create, но пароль хешируется в пуле."""
+        await self.validate_password(user_create.password, user_create)
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop('password')
+        user_dict['hashed_password'] = await password_hasher.hash(password)
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def create_many(self, user_creates: list[UserCreate]) -> None:
+        """Создает пользователей одним INSERT, пропуская уже существующие
+        email. Для заполнения баз тестовыми данными: одинаковые пароли
+        хешируются один раз, on_after_register не вызывается."""
+        if not user_creates:
+            # executemany с пустым списком параметров отправил бы INSERT
+            # одной строки без значений
+            return
+        hashes = {}
+        for user_create in user_creates:
+            await self.validate_password(user_create.password, user_create)
+            if user_create.password not in hashes:
+                hashes[user_create.password] = await password_hasher.hash(
+                    user_create.password
+                )
+        rows = []
+        for user_create in user_creates:
+            user_dict = user_create.model_dump()
+            user_dict['hashed_password'] = hashes[user_dict.pop('password')]
+            rows.append(user_dict)
+        session = self.user_db.session
+        await session.execute(
+            dialect_insert(session, User).on_conflict_do_nothing(
+                index_elements=['email']
+            ),
+            rows
+        )
+        await session.commit()
+
+    async def authenticate(
+            self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        """Как BaseUserManager.authenticate, но пароль проверяется в пуле.
+        Если хеш построен с устаревшими параметрами, он пересчитывается."""
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хешируем впустую, чтобы время ответа не выдавало, есть ли
+            # такой email
+            await password_hasher.hash(credentials.password)
+            return None
+        verified, updated_hash = await password_hasher.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_hash is not None:
+            await self.user_db.update(user, {'hashed_password': updated_hash})
+            user_cache.invalidate(user.id)
+        return user
+
+    async def _update(self, user: User, update_dict: dict[str, Any]) -> User:
+        """Хеширует новый пароль в пуле и передает остальное в
+        BaseUserManager._update."""
+        update_dict = dict(update_dict)
+        password = update_dict.pop('password', None)
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict['hashed_password'] = await password_hasher.hash(
+                password
+            )
+        return await super()._update(user, update_dict)
+
     async def validate_password(
             self,
             password: str,
@@ -57,6 +217,28 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     ):
         print(f'Пользователь {user.email} зарегистрирован.')
 
+    async def on_after_update(
+            self, user: User, update_dict: dict[str, Any],
+            request: Optional[Request] = None
+    ):
+        # Сюда приходят и смена пароля, и деактивация
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_reset_password(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_delete(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
 
 async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
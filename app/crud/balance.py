@@ -0,0 +1,163 @@
+from datetime import datetime as dt
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    DateTime, bindparam, case, cast, delete, func, select)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import dialect_insert, is_postgresql
+from app.core.periods import MONTH, add_months, next_month, start_of_month
+from app.core.trends import bucket_start
+from app.crud.base import CRUDBase
+from app.crud.cache_version import cache_version_crud, ledger_version_name
+from app.models import BalanceSnapshot, DailyTotal, Expense, Income
+
+SNAPSHOT_KEY = ('user_id', 'month')
+SNAPSHOTS = BalanceSnapshot.__table__
+# Доход увеличивает баланс, расход уменьшает
+DAILY_NET = case(
+    (DailyTotal.kind == Income.__tablename__, DailyTotal.amount_sum),
+    else_=-DailyTotal.amount_sum
+)
+
+
+class CRUDBalance(CRUDBase):
+    """Баланс пользователя по месячным снимкам.
+
+    Баланс на момент — снимок на конец предыдущего месяца плюс записи
+    учета от начала месяца момента. Недостающие снимки достраиваются по
+    дневным итогам от последнего сохраненного. Изменение записи удаляет
+    снимки пользователя начиная с ее месяца в той же транзакции.
+    """
+
+    async def invalidate(
+            self, session: AsyncSession, changes: Iterable[tuple[dict, int]]
+    ) -> None:
+        """Удаляет снимки, которые меняют изменения записей учета (sign=1
+        — добавленная запись, sign=-1 — удаленная): у каждого
+        пользователя с первого месяца, сумма записей которого изменилась.
+        Один executemany DELETE на всех пользователей."""
+        amounts = {}
+        for row, sign in changes:
+            key = (row['user_id'], start_of_month(row['date']).date())
+            amounts[key] = (
+                amounts.get(key, 0) + sign * Decimal(str(row['amount']))
+            )
+        since = {}
+        for (user_id, month), amount in amounts.items():
+            # Перенос внутри месяца и правка описания снимки не меняют
+            if amount:
+                since[user_id] = min(month, since.get(user_id, month))
+        if not since:
+            return
+        await session.execute(
+            delete(SNAPSHOTS).where(
+                SNAPSHOTS.c.user_id == bindparam('owner_id'),
+                SNAPSHOTS.c.month >= bindparam('since')
+            ),
+            [{'owner_id': user_id, 'since': month}
+             for user_id, month in since.items()]
+        )
+
+    async def clear(
+            self, session: AsyncSession, user_ids: Optional[set] = None
+    ) -> None:
+        """Удаляет все снимки пользователей user_ids (без них — всех)."""
+        query = delete(BalanceSnapshot)
+        if user_ids is not None:
+            query = query.where(BalanceSnapshot.user_id.in_(user_ids))
+        await session.execute(query)
+
+    async def get_balance(
+            self, session: AsyncSession, user_id: int, moment: dt
+    ) -> Decimal:
+        """Баланс пользователя на момент moment (записи с датой до
+        moment). Одним SELECT читаются снимок предыдущего месяца и суммы
+        записей за месяц до moment; если снимка нет, он достраивается."""
+        month = start_of_month(moment)
+        closing = select(BalanceSnapshot.closing).where(
+            BalanceSnapshot.user_id == user_id,
+            BalanceSnapshot.month == add_months(month, -1).date()
+        ).scalar_subquery()
+        sums = [
+            select(func.coalesce(func.sum(model.amount), 0)).where(
+                model.user_id == user_id,
+                model.date >= month,
+                model.date < moment
+            ).scalar_subquery()
+            for model in (Income, Expense)
+        ]
+        closing, income, expense = (
+            await session.execute(select(closing, *sums))
+        ).one()
+        if closing is None:
+            closing = await self.build(session, user_id, month)
+        return closing + income - expense
+
+    async def build(
+            self, session: AsyncSession, user_id: int, month: dt
+    ) -> Decimal:
+        """Сохраняет снимки пользователя за месяцы от последнего
+        сохраненного до month (не включая) и возвращает баланс на начало
+        month.
+
+        Суммы месяцев считаются по дневным итогам одним запросом.
+        Транзакция начинается с блокировки версии записей пользователя:
+        изменение записи, начатое раньше, успеет удалить устаревшие
+        снимки, а начатое позже дождется сохранения новых и удалит их
+        сам.
+        """
+        await cache_version_crud.lock(ledger_version_name(user_id), session)
+        latest = (await session.execute(
+            select(BalanceSnapshot.month, BalanceSnapshot.closing).where(
+                BalanceSnapshot.user_id == user_id,
+                BalanceSnapshot.month < month.date()
+            ).order_by(BalanceSnapshot.month.desc()).limit(1)
+        )).first()
+        day = DailyTotal.day
+        if is_postgresql(session):
+            # date_trunc от date вернул бы timestamp with time zone
+            day = cast(day, DateTime)
+        days = select(
+            bucket_start(
+                day, [(dt.min, 0)], MONTH, session.get_bind().dialect.name
+            ).label('month'),
+            DAILY_NET.label('net'),
+        ).where(
+            DailyTotal.user_id == user_id, DailyTotal.day < month.date()
+        )
+        closing, current = Decimal(0), add_months(month, -1)
+        if latest is not None:
+            current = next_month(dt.fromisoformat(str(latest.month)))
+            closing = latest.closing
+            days = days.where(DailyTotal.day >= current.date())
+        days = days.subquery('days')
+        nets = {
+            dt.fromisoformat(str(start)): net
+            for start, net in await session.execute(
+                select(days.c.month, func.sum(days.c.net))
+                .group_by(days.c.month)
+            )
+        }
+        if latest is None:
+            current = min(nets, default=current)
+        snapshots = []
+        while current < month:
+            closing += nets.get(current, 0)
+            snapshots.append({
+                'user_id': user_id, 'month': current.date(),
+                'closing': closing,
+            })
+            current = next_month(current)
+        if snapshots:
+            await session.execute(
+                dialect_insert(session, BalanceSnapshot)
+                .on_conflict_do_nothing(index_elements=SNAPSHOT_KEY),
+                snapshots
+            )
+        await session.commit()
+        return closing
+
+
+balance_crud = CRUDBalance(BalanceSnapshot)
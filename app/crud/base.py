@@ -1,14 +1,25 @@
-from typing import Optional
+from datetime import datetime as dt
+from typing import AsyncIterator, Optional, Sequence
 
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from pydantic import BaseModel
+from sqlalchemy import (
+    Float, Numeric, Select, cast, delete, insert, select, tuple_, update)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache
+from app.core.db import is_postgresql
+from app.core.pagination import DEFAULT_PAGE_LIMIT
 from app.core.user import CurrentUserDep
 from app.models import User
 
+SPECIAL_FILTER_FIELDS = {'date_from', 'date_to', 'ids'}
+STREAM_BATCH_SIZE = 1000
+
 
 class CRUDBase:
+    # Поля, прежние значения которых нужны on_change при обновлении
+    tracked_fields: tuple[str, ...] = ()
+
     def __init__(self, model):
         self.model = model
 
@@ -30,44 +41,214 @@ class CRUDBase:
         db_objs = await session.execute(select(self.model))
         return db_objs.scalars().all()
 
+    def filter_by_user(
+            self, query: Select, user: User,
+            filters: Optional[BaseModel] = None
+    ) -> Select:
+        """Ограничивает запрос (SELECT, UPDATE или DELETE) записями
+        пользователя и фильтрами.
+
+        date_from включается в диапазон, date_to — нет, ids ограничивает
+        набор id. Остальные заданные поля сравниваются на равенство.
+        """
+        query = query.where(self.model.user_id == user.id)
+        if filters is None:
+            return query
+        if filters.date_from is not None:
+            query = query.where(self.model.date >= filters.date_from)
+        if filters.date_to is not None:
+            query = query.where(self.model.date < filters.date_to)
+        if getattr(filters, 'ids', None) is not None:
+            query = query.where(self.model.id.in_(filters.ids))
+        exact = filters.model_dump(
+            exclude_none=True, exclude=SPECIAL_FILTER_FIELDS
+        )
+        for field, value in exact.items():
+            query = query.where(getattr(self.model, field) == value)
+        return query
+
+    def row_columns(self, fields: Sequence[str]) -> list:
+        """Колонки модели для чтения строк без ORM-объектов. Numeric
+        приводятся к Float в самом запросе: схемы отдают суммы числами."""
+        columns = []
+        for field in fields:
+            column = getattr(self.model, field)
+            if isinstance(column.type, Numeric):
+                column = cast(column, Float).label(field)
+            columns.append(column)
+        return columns
+
+    async def get_page_by_user(
+            self, user: User, session: AsyncSession,
+            filters: Optional[BaseModel] = None,
+            limit: int = DEFAULT_PAGE_LIMIT,
+            after: Optional[tuple[dt, int]] = None,
+            fields: Optional[Sequence[str]] = None
+    ):
+        """Универсальный метод для постраничного получения записей
+        пользователя от новых к старым по ключу (date, id).
+
+        Если переданы fields, возвращает строки с этими колонками вместо
+        ORM-объектов.
+        """
+        query = self.filter_by_user(
+            select(self.model) if fields is None
+            else select(*self.row_columns(fields)),
+            user, filters
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(self.model.date, self.model.id) < tuple_(*after)
+            )
+        db_objs = await session.execute(
+            query.order_by(
+                self.model.date.desc(), self.model.id.desc()
+            ).limit(limit)
+        )
+        if fields is not None:
+            return db_objs.all()
+        return db_objs.scalars().all()
+
+    async def stream_by_user(
+            self, user: User, session: AsyncSession,
+            filters: Optional[BaseModel] = None,
+            batch_size: int = STREAM_BATCH_SIZE
+    ) -> AsyncIterator:
+        """Универсальный метод для потокового чтения записей пользователя
+        от старых к новым через серверный курсор, по batch_size строк."""
+        query = self.filter_by_user(select(self.model), user, filters)
+        db_objs = await session.stream_scalars(
+            query.order_by(self.model.date, self.model.id).execution_options(
+                yield_per=batch_size
+            )
+        )
+        async for db_obj in db_objs:
+            yield db_obj
+
+    def snapshot(self, db_obj) -> dict:
+        """Возвращает значения колонок записи на текущий момент."""
+        return {
+            column.key: getattr(db_obj, column.key)
+            for column in self.model.__table__.columns
+        }
+
+    async def on_change(
+            self, session: AsyncSession,
+            old: Optional[dict], new: Optional[dict]
+    ) -> None:
+        """Хук для поддержки производных данных в той же транзакции.
+
+        Вызывается до commit: old — значения до изменения (None при
+        создании), new — после (None при удалении). При обновлении old
+        содержит прежние значения полей tracked_fields, остальные поля в
+        нем такие же, как в new.
+        """
+
+    async def invalidate_cache(self, rows: list[Optional[dict]]) -> None:
+        """Удаляет кэшированные ответы пользователей, чьи записи
+        изменились. Вызывается после commit."""
+        user_ids = {row.get('user_id') for row in rows if row is not None}
+        for user_id in user_ids - {None}:
+            await response_cache.invalidate_user(user_id)
+
+    def where_own(self, query, obj_id: int, user: Optional[User] = None):
+        """Ограничивает запрос записью obj_id, а если передан user — еще и
+        его записями."""
+        query = query.where(self.model.id == obj_id)
+        if user is not None:
+            query = query.where(self.model.user_id == user.id)
+        return query
+
     async def create(
             self, obj_in, session: AsyncSession,
             user: Optional[CurrentUserDep] = None, commit: bool = True
     ):
-        """Универсальный метод для добавления записи в базу"""
+        """Универсальный метод для добавления записи в базу одним
+        INSERT ... RETURNING"""
         obj_in_data = obj_in.model_dump()
         if user is not None:
             obj_in_data['user_id'] = user.id
-        db_obj = self.model(**obj_in_data)
-        session.add(db_obj)
+        db_obj = await session.scalar(
+            insert(self.model).values(**obj_in_data).returning(self.model)
+        )
+        new = self.snapshot(db_obj)
+        await self.on_change(session, None, new)
         if commit:
             await session.commit()
-            await session.refresh(db_obj)
+            await self.invalidate_cache([new])
         return db_obj
 
     async def update(
-            self, db_obj, obj_in, session: AsyncSession, commit: bool = True,
-            user: Optional[User] = None
+            self, obj_id: int, obj_in, session: AsyncSession,
+            commit: bool = True, user: Optional[User] = None
     ):
-        """Универсальный метод для обновления записи по id"""
-        obj_data = jsonable_encoder(db_obj)
-        update_data = obj_in.model_dump(exclude_unset=True)
+        """Универсальный метод для обновления записи по id одним
+        UPDATE ... RETURNING. Если передан user, обновляется только его
+        запись. Возвращает None, если запись не найдена.
 
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        session.add(db_obj)
+        Если меняются поля tracked_fields, их прежние значения на
+        PostgreSQL возвращает тот же UPDATE (через FROM с подзапросом).
+        SQLite не умеет возвращать значения других таблиц в RETURNING,
+        поэтому там они читаются отдельным SELECT ... FOR UPDATE.
+        """
+        update_data = obj_in.model_dump(exclude_unset=True)
+        query = self.where_own(
+            update(self.model), obj_id, user
+        ).values(**update_data).execution_options(
+            synchronize_session=False, populate_existing=True
+        )
+        tracked = [
+            getattr(self.model, field) for field in self.tracked_fields
+            if field in update_data
+        ]
+        old_values = {}
+        if tracked and is_postgresql(session):
+            old = self.where_own(
+                select(self.model.id, *tracked), obj_id, user
+            ).with_for_update().subquery('old')
+            row = (await session.execute(
+                query.where(self.model.id == old.c.id).returning(
+                    self.model, *[old.c[column.key] for column in tracked]
+                )
+            )).first()
+            if row is not None:
+                old_values = dict(zip(
+                    [column.key for column in tracked], row[1:]
+                ))
+            db_obj = row[0] if row is not None else None
+        else:
+            if tracked:
+                row = (await session.execute(self.where_own(
+                    select(*tracked), obj_id, user
+                ).with_for_update())).first()
+                old_values = row._asdict() if row is not None else {}
+            db_obj = await session.scalar(query.returning(self.model))
+        if db_obj is None:
+            return None
+        new = self.snapshot(db_obj)
+        old = {**new, **old_values}
+        await self.on_change(session, old, new)
         if commit:
             await session.commit()
-            await session.refresh(db_obj)
-        else:
-            await session.flush()
+            await self.invalidate_cache([old, new])
         return db_obj
 
     async def remove(
-            self, db_obj, session: AsyncSession
+            self, obj_id: int, session: AsyncSession,
+            user: Optional[User] = None
     ):
-        """Универсальный метод для удаления записи по id"""
-        await session.delete(db_obj)
+        """Универсальный метод для удаления записи по id одним
+        DELETE ... RETURNING. Если передан user, удаляется только его
+        запись. Возвращает None, если запись не найдена."""
+        db_obj = await session.scalar(
+            self.where_own(delete(self.model), obj_id, user)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        if db_obj is None:
+            return None
+        old = self.snapshot(db_obj)
+        await self.on_change(session, old, None)
         await session.commit()
+        await self.invalidate_cache([old])
         return db_obj
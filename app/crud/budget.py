@@ -0,0 +1,205 @@
+from collections import defaultdict
+from datetime import datetime as dt
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    DateTime, and_, case, cast, delete, func, insert, literal, select)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import dialect_insert, is_postgresql
+from app.core.periods import DAY, MONTH, WEEK, next_bucket, start_of_bucket
+from app.core.trends import bucket_start
+from app.crud.base import CRUDBase
+from app.models import Budget, BudgetSpending, DailyTotal, Expense, User
+
+BUDGET_PERIODS = (DAY, WEEK, MONTH)
+SPENDING_KEY = ('budget_id', 'period_start')
+
+
+def period_start_case(moment: dt):
+    """Выражение: начало периода бюджета, в который попадает moment."""
+    return case(
+        {
+            period: start_of_bucket(moment, period).date()
+            for period in BUDGET_PERIODS
+        },
+        value=Budget.period
+    )
+
+
+class CRUDBudget(CRUDBase):
+    """Бюджеты расходов и суммы по их периодам.
+
+    Суммы заполняются из дневных итогов при создании бюджета и дальше
+    меняются на величину изменения расхода в той же транзакции, поэтому
+    потраченное за период читается одной строкой по ключу, без
+    суммирования расходов.
+    """
+
+    async def on_change(
+            self, session: AsyncSession,
+            old: Optional[dict], new: Optional[dict]
+    ) -> None:
+        if old is None:
+            await self.seed_spending(session, new)
+
+    async def seed_spending(self, session: AsyncSession, budget: dict) -> None:
+        """Заполняет суммы нового бюджета по всем периодам, в которых у
+        категории есть расходы."""
+        day = DailyTotal.day
+        if is_postgresql(session):
+            # date_trunc от date вернул бы timestamp with time zone
+            day = cast(day, DateTime)
+        days = select(
+            bucket_start(
+                day, [(dt.min, 0)], budget['period'],
+                session.get_bind().dialect.name
+            ).label('period_start'),
+            DailyTotal.amount_sum,
+        ).where(
+            DailyTotal.user_id == budget['user_id'],
+            DailyTotal.kind == Expense.__tablename__,
+            DailyTotal.category_id == budget['category_id'],
+        ).subquery('days')
+        await session.execute(
+            insert(BudgetSpending).from_select(
+                ['budget_id', 'period_start', 'spent'],
+                select(
+                    literal(budget['id']),
+                    days.c.period_start,
+                    func.sum(days.c.amount_sum),
+                ).group_by(days.c.period_start)
+            )
+        )
+
+    async def apply_deltas(
+            self, session: AsyncSession, changes: Iterable[tuple[dict, int]]
+    ) -> None:
+        """Прибавляет (sign=1) или вычитает (sign=-1) расходы из сумм
+        бюджетов их категорий: один SELECT бюджетов и, если они есть, один
+        executemany UPSERT на все затронутые периоды."""
+        amounts = defaultdict(Decimal)
+        for row, sign in changes:
+            key = (row['user_id'], row['category_id'], row['date'])
+            amounts[key] += sign * Decimal(str(row['amount']))
+        # Изменение, не затронувшее категорию, дату и сумму, взаимно
+        # уничтожается, и бюджеты не читаются
+        amounts = {key: amount for key, amount in amounts.items() if amount}
+        if not amounts:
+            return
+        budgets = defaultdict(list)
+        for budget_id, user_id, category_id, period in await session.execute(
+            select(
+                Budget.id, Budget.user_id, Budget.category_id, Budget.period
+            ).where(
+                Budget.user_id.in_({key[0] for key in amounts}),
+                Budget.category_id.in_({key[1] for key in amounts}),
+            )
+        ):
+            budgets[user_id, category_id].append((budget_id, period))
+        deltas = defaultdict(Decimal)
+        for (user_id, category_id, moment), amount in amounts.items():
+            for budget_id, period in budgets[user_id, category_id]:
+                start = start_of_bucket(moment, period).date()
+                deltas[budget_id, start] += amount
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        query = dialect_insert(session, BudgetSpending)
+        await session.execute(
+            query.on_conflict_do_update(
+                index_elements=SPENDING_KEY,
+                set_={'spent': BudgetSpending.spent + query.excluded.spent}
+            ),
+            [
+                {**dict(zip(SPENDING_KEY, key)), 'spent': delta}
+                for key, delta in deltas.items()
+            ]
+        )
+
+    async def apply_change(
+            self, session: AsyncSession,
+            old: Optional[dict], new: Optional[dict]
+    ) -> None:
+        """Переносит изменение расхода в суммы бюджетов, включая перенос
+        между категориями и периодами при обновлении."""
+        changes = [(old, -1), (new, 1)]
+        await self.apply_deltas(
+            session, [(row, sign) for row, sign in changes if row]
+        )
+
+    async def get_statuses(
+            self, session: AsyncSession, user_id: int, moment: dt,
+            category_id: Optional[int] = None
+    ) -> list[dict]:
+        """Использование бюджетов пользователя (или только бюджетов
+        категории category_id) за периоды, в которые попадает moment."""
+        query = select(
+            Budget, func.coalesce(BudgetSpending.spent, 0)
+        ).outerjoin(BudgetSpending, and_(
+            BudgetSpending.budget_id == Budget.id,
+            BudgetSpending.period_start == period_start_case(moment),
+        )).where(Budget.user_id == user_id).order_by(Budget.id)
+        if category_id is not None:
+            query = query.where(Budget.category_id == category_id)
+        statuses = []
+        for budget, spent in await session.execute(query):
+            limit, spent = float(budget.limit), float(spent)
+            start = start_of_bucket(moment, budget.period)
+            statuses.append({
+                'budget_id': budget.id,
+                'category_id': budget.category_id,
+                'period': budget.period,
+                'start': start,
+                'end': next_bucket(start, budget.period),
+                'limit': limit,
+                'spent': spent,
+                'remaining': limit - spent,
+                'utilisation': spent / limit,
+                'over_budget': spent > limit,
+            })
+        return statuses
+
+    async def remove(
+            self, obj_id: int, session: AsyncSession,
+            user: Optional[User] = None
+    ):
+        """Удаляет бюджет вместе с его суммами по периодам."""
+        await session.execute(
+            delete(BudgetSpending).where(BudgetSpending.budget_id.in_(
+                self.where_own(select(Budget.id), obj_id, user)
+            ))
+        )
+        return await super().remove(obj_id, session, user)
+
+    async def remove_category(
+            self, session: AsyncSession, category_id: int
+    ) -> None:
+        """Удаляет бюджеты удаляемой категории расходов и их суммы."""
+        budget_ids = select(Budget.id).where(
+            Budget.category_id == category_id
+        )
+        await session.execute(
+            delete(BudgetSpending).where(
+                BudgetSpending.budget_id.in_(budget_ids)
+            )
+        )
+        await session.execute(
+            delete(Budget).where(Budget.category_id == category_id)
+        )
+
+    async def get_by_key(
+            self, session: AsyncSession, user_id: int, category_id: int,
+            period: str
+    ) -> Optional[Budget]:
+        return await session.scalar(
+            select(Budget).where(
+                Budget.user_id == user_id,
+                Budget.category_id == category_id,
+                Budget.period == period,
+            )
+        )
+
+
+budget_crud = CRUDBudget(Budget)
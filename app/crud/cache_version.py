@@ -0,0 +1,71 @@
+from typing import Iterable
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import dialect_insert
+from app.crud.base import CRUDBase
+from app.models import CacheVersion
+
+
+def ledger_version_name(user_id: int) -> str:
+    """Имя версии записей учета пользователя в таблице cache_version."""
+    return f'ledger:{user_id}'
+
+
+class CRUDCacheVersion(CRUDBase):
+
+    async def get_version(self, name: str, session: AsyncSession) -> int:
+        version = await session.execute(
+            select(CacheVersion.version).where(CacheVersion.name == name)
+        )
+        return version.scalars().first() or 0
+
+    async def bump(
+            self, name: str, session: AsyncSession, commit: bool = True
+    ) -> int:
+        """Увеличивает версию одним UPSERT и возвращает новое значение."""
+        query = dialect_insert(session, CacheVersion).values(
+            name=name, version=1
+        )
+        version = await session.execute(
+            query.on_conflict_do_update(
+                index_elements=['name'],
+                set_={'version': CacheVersion.version + 1}
+            ).returning(CacheVersion.version)
+        )
+        version = version.scalar_one()
+        if commit:
+            await session.commit()
+        return version
+
+    async def bump_many(
+            self, names: Iterable[str], session: AsyncSession
+    ) -> None:
+        """Увеличивает несколько версий одним executemany UPSERT в
+        текущей транзакции."""
+        names = sorted(set(names))
+        if not names:
+            return
+        query = dialect_insert(session, CacheVersion)
+        await session.execute(
+            query.on_conflict_do_update(
+                index_elements=['name'],
+                set_={'version': CacheVersion.version + 1}
+            ),
+            [{'name': name, 'version': 1} for name in names]
+        )
+
+    async def lock(self, name: str, session: AsyncSession) -> None:
+        """Блокирует строку версии до конца транзакции, не меняя ее:
+        изменения, которые увеличивают эту версию, ждут конца транзакции.
+        На SQLite выражение открывает пишущую транзакцию, и до ее конца
+        другие записи в базу ждут."""
+        await session.execute(
+            update(CacheVersion).where(CacheVersion.name == name).values(
+                version=CacheVersion.version
+            ).execution_options(synchronize_session=False)
+        )
+
+
+cache_version_crud = CRUDCacheVersion(CacheVersion)
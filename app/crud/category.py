@@ -1,14 +1,72 @@
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache
+from app.crud.balance import balance_crud
 from app.crud.base import CRUDBase
-from app.models import ExpenseCategory, IncomeCategory
+from app.crud.budget import budget_crud
+from app.crud.cache_version import cache_version_crud
+from app.crud.daily_total import daily_total_crud
+from app.crud.ledger import ledger_version_name
+from app.crud.recurring import recurring_rule_crud
+from app.models import ExpenseCategory, IncomeCategory, Expense, Income
 
 
 class CRUDCategory(CRUDBase):
 
+    def __init__(self, model, ledger_model):
+        super().__init__(model)
+        self.ledger_model = ledger_model
+        self.ledger_kind = ledger_model.__tablename__
+        # Имя версии кэша категорий (CategoryRegistry) в cache_version
+        self.version_name = model.__tablename__
+
+    async def on_change(
+            self, session: AsyncSession,
+            old: Optional[dict], new: Optional[dict]
+    ) -> None:
+        """Увеличивает версию кэша категорий в транзакции изменения, чтобы
+        другие воркеры не увидели новую версию без изменения или
+        изменение без новой версии. Вместе с записями удаленной категории
+        удаляются и их дневные итоги."""
+        await cache_version_crud.bump(
+            self.version_name, session, commit=False
+        )
+        if new is None:
+            await daily_total_crud.remove_category(
+                session, self.ledger_kind, old['id']
+            )
+
+    async def remove(self, obj_id: int, session: AsyncSession, user=None):
+        """Удаляет категорию вместе с ее записями учета, бюджетами и
+        правилами повторяющихся записей. Записи удаляются одним DELETE ...
+        RETURNING, снимки баланса их владельцев удаляются, версии записей
+        и кэш ответов обновляются."""
+        user_ids = set(await session.scalars(
+            delete(self.ledger_model)
+            .where(self.ledger_model.category_id == obj_id)
+            .returning(self.ledger_model.user_id)
+            .execution_options(synchronize_session=False)
+        ))
+        for user_id in user_ids:
+            await cache_version_crud.bump(
+                ledger_version_name(user_id), session, commit=False
+            )
+        if user_ids:
+            await balance_crud.clear(session, user_ids)
+        if self.ledger_kind == Expense.__tablename__:
+            await budget_crud.remove_category(session, obj_id)
+        await recurring_rule_crud.remove_category(
+            session, self.ledger_kind, obj_id
+        )
+        category = await super().remove(obj_id, session)
+        if category is not None:
+            for user_id in user_ids:
+                await response_cache.invalidate_user(user_id)
+        return category
+
     @staticmethod
     async def get_category_id_by_name(
         category_name: str,
@@ -23,5 +81,5 @@ class CRUDCategory(CRUDBase):
         return db_category_id.scalars().first()
 
 
-expense_category_crud = CRUDCategory(ExpenseCategory)
-income_category_crud = CRUDCategory(IncomeCategory)
+expense_category_crud = CRUDCategory(ExpenseCategory, Expense)
+income_category_crud = CRUDCategory(IncomeCategory, Income)
@@ -0,0 +1,199 @@
+from collections import defaultdict
+from datetime import date, datetime as dt
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    DateTime, and_, case, cast, delete, func, insert, literal, select)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import dialect_insert, is_postgresql
+from app.core.periods import ALL_TIME
+from app.core.trends import aggregate_buckets, bucket_start
+from app.crud.base import CRUDBase
+from app.models import DailyTotal, User
+
+ROLLUP_KEY = ('user_id', 'kind', 'category_id', 'day')
+
+
+class CRUDDailyTotal(CRUDBase):
+
+    async def apply_deltas(
+            self, session: AsyncSession, kind: str,
+            changes: Iterable[tuple[dict, int]]
+    ) -> None:
+        """Прибавляет (sign=1) или вычитает (sign=-1) записи учета из
+        дневных итогов одним executemany UPSERT на все затронутые ключи.
+        Выражение не зависит от числа ключей и компилируется один раз."""
+        deltas = defaultdict(lambda: [Decimal(0), 0])
+        for row, sign in changes:
+            key = (row['user_id'], kind, row['category_id'],
+                   row['date'].date())
+            deltas[key][0] += sign * Decimal(str(row['amount']))
+            deltas[key][1] += sign
+        # Изменение, не затронувшее ключ и сумму, взаимно уничтожается
+        deltas = {
+            key: delta for key, delta in deltas.items() if any(delta)
+        }
+        if not deltas:
+            return
+        query = dialect_insert(session, DailyTotal)
+        await session.execute(
+            query.on_conflict_do_update(
+                index_elements=ROLLUP_KEY,
+                set_={
+                    'amount_sum': DailyTotal.amount_sum
+                    + query.excluded.amount_sum,
+                    'count': DailyTotal.count + query.excluded.count,
+                }
+            ),
+            [
+                {**dict(zip(ROLLUP_KEY, key)),
+                 'amount_sum': amount, 'count': count}
+                for key, (amount, count) in deltas.items()
+            ]
+        )
+        if any(count < 0 for _, count in deltas.values()):
+            await session.execute(
+                delete(DailyTotal).where(
+                    DailyTotal.user_id.in_({key[0] for key in deltas}),
+                    DailyTotal.kind == kind,
+                    DailyTotal.count <= 0
+                )
+            )
+
+    async def apply_change(
+            self, session: AsyncSession, kind: str,
+            old: Optional[dict], new: Optional[dict]
+    ) -> None:
+        """Переносит изменение записи учета в дневные итоги, включая
+        перенос между категориями и днями при обновлении."""
+        changes = [(old, -1), (new, 1)]
+        await self.apply_deltas(
+            session, kind, [(row, sign) for row, sign in changes if row]
+        )
+
+    async def remove_category(
+            self, session: AsyncSession, kind: str, category_id: int
+    ) -> None:
+        """Удаляет дневные итоги удаленной категории."""
+        await session.execute(
+            delete(DailyTotal).where(
+                DailyTotal.kind == kind,
+                DailyTotal.category_id == category_id
+            )
+        )
+
+    async def rebuild(
+            self, session: AsyncSession, kind: str, ledger_model,
+            commit: bool = True
+    ) -> None:
+        """Пересчитывает дневные итоги вида kind по исходным записям."""
+        await session.execute(
+            delete(DailyTotal).where(DailyTotal.kind == kind)
+        )
+        day = func.date(ledger_model.date)
+        await session.execute(
+            insert(DailyTotal).from_select(
+                ['user_id', 'kind', 'category_id', 'day',
+                 'amount_sum', 'count'],
+                select(
+                    ledger_model.user_id,
+                    literal(kind),
+                    ledger_model.category_id,
+                    day,
+                    func.sum(ledger_model.amount),
+                    func.count(ledger_model.id),
+                ).group_by(
+                    ledger_model.user_id, ledger_model.category_id, day
+                )
+            )
+        )
+        if commit:
+            await session.commit()
+
+    async def get_period_totals(
+            self, user: User, session: AsyncSession, kind: str,
+            periods: dict[str, tuple[dt, dt]]
+    ) -> dict[str, dict]:
+        """Считает суммы и количество записей пользователя по категориям
+        для каждого периода и за все время по дневным итогам.
+
+        Границы периодов должны совпадать с началом дня.
+        """
+        columns = [
+            DailyTotal.category_id,
+            func.coalesce(func.sum(DailyTotal.count), 0),
+            func.coalesce(func.sum(DailyTotal.amount_sum), 0),
+        ]
+        for start, end in periods.values():
+            in_period = and_(
+                DailyTotal.day >= start.date(), DailyTotal.day < end.date()
+            )
+            columns += [
+                func.coalesce(
+                    func.sum(case((in_period, DailyTotal.count))), 0
+                ),
+                func.coalesce(
+                    func.sum(case((in_period, DailyTotal.amount_sum))), 0
+                ),
+            ]
+        rows = await session.execute(
+            select(*columns).where(
+                DailyTotal.user_id == user.id, DailyTotal.kind == kind
+            ).group_by(DailyTotal.category_id).order_by(
+                DailyTotal.category_id
+            )
+        )
+        bounds = {**periods, ALL_TIME: (None, None)}
+        totals = {
+            name: {'start': start, 'end': end, 'total': 0, 'count': 0,
+                   'categories': []}
+            for name, (start, end) in bounds.items()
+        }
+        names = [ALL_TIME, *periods]
+        for category_id, *values in rows:
+            for index, name in enumerate(names):
+                count, total = values[2 * index], values[2 * index + 1]
+                if not count:
+                    continue
+                totals[name]['total'] += total
+                totals[name]['count'] += count
+                totals[name]['categories'].append(
+                    {'category_id': category_id, 'total': total,
+                     'count': count}
+                )
+        return totals
+
+    async def get_trend(
+            self, user: User, session: AsyncSession, kind: str,
+            first_day: date, end_day: date, excluded_days: list[date],
+            bucket: str, segments: list[tuple[dt, int]], by_category: bool
+    ) -> list:
+        """То же, что CRUDLedger.get_trend, по дневным итогам суток из
+        [first_day, end_day) кроме excluded_days. Каждые сутки должны
+        целиком попадать в один интервал: он определяется по их
+        началу."""
+        dialect = session.get_bind().dialect.name
+        day = DailyTotal.day
+        if is_postgresql(session):
+            # date_trunc от date вернул бы timestamp with time zone
+            day = cast(day, DateTime)
+        source = select(
+            bucket_start(day, segments, bucket, dialect).label('bucket'),
+            DailyTotal.category_id,
+            DailyTotal.amount_sum.label('amount'),
+            DailyTotal.count,
+        ).where(
+            DailyTotal.user_id == user.id,
+            DailyTotal.kind == kind,
+            DailyTotal.day >= first_day,
+            DailyTotal.day < end_day,
+        )
+        if excluded_days:
+            source = source.where(DailyTotal.day.notin_(excluded_days))
+        rows = await session.execute(aggregate_buckets(source, by_category))
+        return rows.all()
+
+
+daily_total_crud = CRUDDailyTotal(DailyTotal)
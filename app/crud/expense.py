@@ -1,20 +1,46 @@
-from sqlalchemy import select
+from datetime import datetime as dt
+from typing import Optional, Sequence
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.base import CRUDBase
+from app.core.pagination import DEFAULT_PAGE_LIMIT
+from app.crud.budget import budget_crud
+from app.crud.ledger import CRUDLedger
 from app.models import Expense, User
+from app.schemas.expense import ExpenseFilter
+
 
+class CRUDExpense(CRUDLedger):
+    """Расходы. Кроме дневных итогов поддерживает суммы бюджетов."""
 
-class CRUDExpense(CRUDBase):
+    async def on_change(
+            self, session: AsyncSession,
+            old: Optional[dict], new: Optional[dict]
+    ) -> None:
+        await super().on_change(session, old, new)
+        await budget_crud.apply_change(session, old, new)
+
+    async def on_bulk_change(
+            self, session: AsyncSession,
+            old: list[dict], new: list[dict]
+    ) -> None:
+        await super().on_bulk_change(session, old, new)
+        await budget_crud.apply_deltas(
+            session, [(row, -1) for row in old] + [(row, 1) for row in new]
+        )
 
-    @staticmethod
-    async def get_all_expense_by_user(user: User, session: AsyncSession):
-        expenses = await session.execute(
-            select(Expense).where(
-                Expense.user_id == user.id
-            )
+    async def get_all_expense_by_user(
+            self, user: User, session: AsyncSession,
+            filters: Optional[ExpenseFilter] = None,
+            limit: int = DEFAULT_PAGE_LIMIT,
+            after: Optional[tuple[dt, int]] = None,
+            fields: Optional[Sequence[str]] = None
+    ):
+        expenses = await self.get_page_by_user(
+            user, session, filters=filters, limit=limit, after=after,
+            fields=fields
         )
-        return expenses.scalars().all()
+        return expenses
 
 
 expense_crud = CRUDExpense(Expense)
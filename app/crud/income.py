@@ -1,20 +1,28 @@
-from sqlalchemy import select
+from datetime import datetime as dt
+from typing import Optional, Sequence
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.base import CRUDBase
+from app.core.pagination import DEFAULT_PAGE_LIMIT
+from app.crud.ledger import CRUDLedger
 from app.models import Income, User
+from app.schemas.income import IncomeFilter
 
 
-class CRUDIncome(CRUDBase):
+class CRUDIncome(CRUDLedger):
 
-    @staticmethod
-    async def get_all_income_by_user(user: User, session: AsyncSession):
-        income = await session.execute(
-            select(Income).where(
-                Income.user_id == user.id
-            )
+    async def get_all_income_by_user(
+            self, user: User, session: AsyncSession,
+            filters: Optional[IncomeFilter] = None,
+            limit: int = DEFAULT_PAGE_LIMIT,
+            after: Optional[tuple[dt, int]] = None,
+            fields: Optional[Sequence[str]] = None
+    ):
+        income = await self.get_page_by_user(
+            user, session, filters=filters, limit=limit, after=after,
+            fields=fields
         )
-        return income.scalars().all()
+        return income
 
 
 income_crud = CRUDIncome(Income)
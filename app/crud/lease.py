@@ -0,0 +1,47 @@
+from datetime import datetime as dt, timedelta
+
+from sqlalchemy import delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import dialect_insert
+from app.crud.base import CRUDBase
+from app.models import Lease
+
+
+class CRUDLease(CRUDBase):
+
+    async def acquire(
+            self, name: str, owner: str, seconds: float,
+            session: AsyncSession
+    ) -> bool:
+        """Берет или продлевает аренду name на seconds секунд одним UPSERT.
+        Чужая аренда перехватывается, только если ее срок истек. Возвращает,
+        удерживает ли owner аренду."""
+        now = dt.now()
+        query = dialect_insert(session, Lease).values(
+            name=name, owner=owner, expires_at=now + timedelta(seconds=seconds)
+        )
+        holder = await session.scalar(
+            query.on_conflict_do_update(
+                index_elements=['name'],
+                set_={
+                    'owner': query.excluded.owner,
+                    'expires_at': query.excluded.expires_at,
+                },
+                where=or_(Lease.owner == owner, Lease.expires_at < now)
+            ).returning(Lease.owner)
+        )
+        await session.commit()
+        return holder == owner
+
+    async def release(
+            self, name: str, owner: str, session: AsyncSession
+    ) -> None:
+        """Освобождает аренду, если ее удерживает owner."""
+        await session.execute(
+            delete(Lease).where(Lease.name == name, Lease.owner == owner)
+        )
+        await session.commit()
+
+
+lease_crud = CRUDLease(Lease)
@@ -0,0 +1,290 @@
+from datetime import date, datetime as dt, time, timedelta
+from decimal import Decimal
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    Select, and_, column, delete, func, insert, literal, literal_column,
+    or_, select, table, update)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import is_postgresql
+from app.core.search import TS_CONFIG, fts5_query, fts_table_name, tsquery
+from app.core.periods import next_bucket
+from app.core.trends import (
+    MAX_PARTIAL_DAYS, aggregate_buckets, bucket_start, partial_days,
+    shift_segments, to_storage)
+from app.crud.balance import balance_crud
+from app.crud.base import CRUDBase
+from app.crud.cache_version import cache_version_crud, ledger_version_name
+from app.crud.daily_total import daily_total_crud
+from app.models import User
+
+ROLLUP_FIELDS = ('user_id', 'category_id', 'date', 'amount')
+SEARCH_FIELDS = ('id', 'amount', 'description', 'category_id', 'date')
+
+
+class CRUDLedger(CRUDBase):
+    """Базовый класс для записей учета (расходов и доходов).
+
+    Поддерживает дневные итоги, снимки баланса и версию записей
+    пользователя в той же транзакции, что и само изменение.
+    """
+    tracked_fields = ROLLUP_FIELDS
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.kind = model.__tablename__
+
+    async def on_change(
+            self, session: AsyncSession,
+            old: Optional[dict], new: Optional[dict]
+    ) -> None:
+        await daily_total_crud.apply_change(session, self.kind, old, new)
+        changes = [(old, -1), (new, 1)]
+        await balance_crud.invalidate(
+            session, [(row, sign) for row, sign in changes if row]
+        )
+        await self.bump_version(session, (new or old)['user_id'])
+
+    async def on_bulk_change(
+            self, session: AsyncSession,
+            old: list[dict], new: list[dict]
+    ) -> None:
+        """Хук как on_change для пакетных изменений: old — значения
+        затронутых записей до изменения, new — после."""
+        changes = [(row, -1) for row in old] + [(row, 1) for row in new]
+        await daily_total_crud.apply_deltas(session, self.kind, changes)
+        await balance_crud.invalidate(session, changes)
+        await cache_version_crud.bump_many(
+            [ledger_version_name(row['user_id']) for row in old + new],
+            session
+        )
+
+    async def bump_version(self, session: AsyncSession, user_id: int) -> None:
+        """Увеличивает версию записей учета пользователя, по которой
+        строятся ETag списков."""
+        await cache_version_crud.bump(
+            ledger_version_name(user_id), session, commit=False
+        )
+
+    async def copy_rows(self, session: AsyncSession, rows: list[dict]) -> None:
+        """Вставляет строки через COPY драйвера asyncpg в текущей
+        транзакции сессии."""
+        columns = list(rows[0])
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            self.model.__tablename__,
+            records=[tuple(row[column] for column in columns)
+                     for row in rows],
+            columns=columns
+        )
+
+    async def insert_rows(
+            self, session: AsyncSession, rows: list[dict]
+    ) -> list[dict]:
+        """Вставляет пакет проверенных записей (с user_id, записи могут
+        принадлежать разным пользователям) в текущей транзакции: COPY на
+        PostgreSQL, на остальных — executemany, который SQLAlchemy
+        собирает в многострочные INSERT ... VALUES. Возвращает
+        вставленные строки; commit и сброс кэша — на вызывающем."""
+        now = dt.now()
+        rows = [
+            {**row, 'amount': Decimal(str(row['amount'])), 'created_at': now}
+            for row in rows
+        ]
+        if is_postgresql(session):
+            await self.copy_rows(session, rows)
+        else:
+            await session.execute(insert(self.model.__table__), rows)
+        await self.on_bulk_change(session, [], rows)
+        return rows
+
+    async def bulk_create(
+            self, rows: list[dict], session: AsyncSession, user: User
+    ) -> int:
+        """Вставляет пакет проверенных записей пользователя одной
+        транзакцией."""
+        if not rows:
+            return 0
+        rows = await self.insert_rows(
+            session, [{**row, 'user_id': user.id} for row in rows]
+        )
+        await session.commit()
+        await self.invalidate_cache(rows)
+        return len(rows)
+
+    async def bulk_update(
+            self, filters: BaseModel, patch: dict, session: AsyncSession,
+            user: User
+    ) -> list[int]:
+        """Обновляет записи пользователя по фильтру одним UPDATE ...
+        RETURNING. Принадлежность проверяется в условии WHERE.
+
+        Старые значения полей дневных итогов читаются одним запросом,
+        только если патч их меняет.
+        """
+        old = []
+        if set(patch) & set(ROLLUP_FIELDS):
+            rows = await session.execute(self.filter_by_user(
+                select(*self.rollup_columns()), user, filters
+            ).with_for_update())
+            old = [row._asdict() for row in rows]
+        if 'amount' in patch:
+            patch = {**patch, 'amount': Decimal(str(patch['amount']))}
+        rows = await session.execute(
+            self.filter_by_user(update(self.model), user, filters)
+            .values(**patch)
+            .returning(self.model.id, *self.rollup_columns())
+            .execution_options(synchronize_session=False)
+        )
+        new = [row._asdict() for row in rows]
+        if old:
+            await self.on_bulk_change(session, old, new)
+        elif new:
+            await self.bump_version(session, user.id)
+        await session.commit()
+        await self.invalidate_cache(new)
+        return [row['id'] for row in new]
+
+    async def bulk_remove(
+            self, filters: BaseModel, session: AsyncSession, user: User
+    ) -> list[int]:
+        """Удаляет записи пользователя по фильтру одним DELETE ...
+        RETURNING. Принадлежность проверяется в условии WHERE."""
+        rows = await session.execute(
+            self.filter_by_user(delete(self.model), user, filters)
+            .returning(self.model.id, *self.rollup_columns())
+            .execution_options(synchronize_session=False)
+        )
+        old = [row._asdict() for row in rows]
+        await self.on_bulk_change(session, old, [])
+        await session.commit()
+        await self.invalidate_cache(old)
+        return [row['id'] for row in old]
+
+    def rollup_columns(self) -> list:
+        return [getattr(self.model, field) for field in ROLLUP_FIELDS]
+
+    def search_query(
+            self, user: User, terms: list[str], session: AsyncSession
+    ) -> Select:
+        """SELECT записей пользователя, в описании которых есть слова,
+        начинающиеся с terms. score — релевантность, больше — лучше.
+
+        На SQLite запрос начинается с FTS5-таблицы, на PostgreSQL условие
+        @@ совпадает с выражением GIN-индекса (см. app.core.search).
+        """
+        columns = [
+            literal(self.kind).label('kind'),
+            *self.row_columns(SEARCH_FIELDS),
+        ]
+        if is_postgresql(session):
+            # Константы, а не параметры: иначе выражение не совпадет с
+            # выражением индекса в подготовленном запросе
+            config = literal_column(f"'{TS_CONFIG}'")
+            vector = func.to_tsvector(
+                config,
+                func.coalesce(self.model.description, literal_column("''"))
+            )
+            query = func.to_tsquery(config, tsquery(terms))
+            return select(
+                *columns, func.ts_rank(vector, query).label('score')
+            ).where(
+                self.model.user_id == user.id, vector.op('@@')(query)
+            )
+        fts_name = fts_table_name(self.kind)
+        fts = table(fts_name, column('rowid'))
+        # bm25 отрицателен, чем меньше — тем релевантнее; колонка
+        # user_id в оценке не участвует
+        hits = select(
+            fts.c.rowid,
+            (-func.bm25(literal_column(fts_name), 1.0, 0.0)).label('score')
+        ).where(
+            literal_column(fts_name).op('MATCH')(fts5_query(user.id, terms))
+        ).subquery('hits')
+        # Отбор по пользователю уже есть в запросе FTS5. Условие по
+        # user_id таблицы учета заставило бы SQLite начать с индекса
+        # пользователя и выполнять поиск FTS5 для каждой его записи
+        return select(*columns, hits.c.score).join(
+            hits, hits.c.rowid == self.model.id
+        )
+
+    async def get_trend(
+            self, user: User, session: AsyncSession, start: dt, end: dt,
+            bucket: str, segments: list[tuple[dt, int]], by_category: bool,
+            days: Optional[list[date]] = None
+    ) -> list:
+        """Суммы записей пользователя с датами из [start, end) по
+        интервалам bucket в поясе клиента (см. app.core.trends).
+        Если переданы days, читаются только записи этих суток. Возвращает
+        строки (начало интервала, категория или None, сумма,
+        количество)."""
+        dialect = session.get_bind().dialect.name
+        source = select(
+            bucket_start(
+                self.model.date, segments, bucket, dialect
+            ).label('bucket'),
+            self.model.category_id,
+            self.model.amount,
+            literal(1).label('count'),
+        )
+        ranges = [(start, end)]
+        if days:
+            ranges = [
+                (max(start, moment), min(end, moment + timedelta(days=1)))
+                for moment in (dt.combine(day, time()) for day in days)
+            ]
+        # Отдельное условие на каждые сутки с user_id в каждом: только
+        # так SQLite ищет каждые сутки по индексу (user_id, date, id), а
+        # не проверяет все условия на каждой строке диапазона
+        source = source.where(or_(*(
+            and_(
+                self.model.user_id == user.id,
+                self.model.date >= range_start,
+                self.model.date < range_end,
+            )
+            for range_start, range_end in ranges
+        )))
+        rows = await session.execute(aggregate_buckets(source, by_category))
+        return rows.all()
+
+    async def get_bucket_totals(
+            self, user: User, session: AsyncSession, starts: list[dt],
+            bucket: str, zone: ZoneInfo, by_category: bool
+    ) -> list:
+        """Строки get_trend для интервалов bucket пояса zone, которые
+        начинаются в starts. Целые сутки хранения берутся из дневных
+        итогов, записи читаются только за сутки с границей интервала
+        (или все, если таких суток больше MAX_PARTIAL_DAYS)."""
+        boundaries = [
+            to_storage(moment, zone)
+            for moment in (*starts, next_bucket(starts[-1], bucket))
+        ]
+        storage_start, storage_end = boundaries[0], boundaries[-1]
+        segments = shift_segments(storage_start, storage_end, zone)
+        partial = partial_days(boundaries)
+        first_day = storage_start.date()
+        if first_day in partial:
+            first_day += timedelta(days=1)
+        end_day = storage_end.date()
+        whole_days = (end_day - first_day).days - sum(
+            first_day <= day < end_day for day in partial
+        )
+        if whole_days <= 0 or len(partial) > MAX_PARTIAL_DAYS:
+            return await self.get_trend(
+                user, session, storage_start, storage_end, bucket,
+                segments, by_category
+            )
+        rows = await daily_total_crud.get_trend(
+            user, session, self.kind, first_day, end_day, partial, bucket,
+            segments, by_category
+        )
+        if partial:
+            rows += await self.get_trend(
+                user, session, storage_start, storage_end, bucket,
+                segments, by_category, days=partial
+            )
+        return rows
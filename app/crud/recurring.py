@@ -0,0 +1,153 @@
+from collections import defaultdict
+from datetime import datetime as dt
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import dialect_insert
+from app.core.periods import add_periods
+from app.crud.base import CRUDBase
+from app.crud.expense import expense_crud
+from app.crud.income import income_crud
+from app.models import Expense, RecurringOccurrence, RecurringRule, User
+
+OCCURRENCE_KEY = ('rule_id', 'sequence')
+# Поля записи учета, которых нет в правиле
+LEDGER_DEFAULTS = {Expense.__tablename__: {'is_paid': True}}
+
+
+def occurrence_at(rule: RecurringRule, sequence: int) -> Optional[dt]:
+    """Дата повторения номер sequence или None, если повторения к этому
+    моменту закончились. Считается от start_at, поэтому 31-е число в
+    коротком месяце не сдвигает следующие месяцы."""
+    moment = add_periods(rule.start_at, rule.period, sequence * rule.interval)
+    if rule.end_at is not None and moment >= rule.end_at:
+        return None
+    return moment
+
+
+class CRUDRecurringRule(CRUDBase):
+    """Правила повторяющихся записей и их занесение пакетами."""
+
+    def __init__(self, model, ledger_cruds):
+        super().__init__(model)
+        self.ledger_cruds = {crud.kind: crud for crud in ledger_cruds}
+
+    async def get_by_user(
+            self, user: User, session: AsyncSession
+    ) -> list[RecurringRule]:
+        rules = await session.scalars(
+            select(RecurringRule).where(
+                RecurringRule.user_id == user.id
+            ).order_by(RecurringRule.id)
+        )
+        return rules.all()
+
+    async def materialize_due(
+            self, session: AsyncSession, now: dt, batch_size: int
+    ) -> int:
+        """Заносит наступившие (не позже now) повторения всех правил,
+        не больше batch_size за вызов, одной транзакцией.
+
+        Выражения не зависят от числа правил: SELECT правил, один INSERT
+        ключей повторений с ON CONFLICT DO NOTHING, пакетная вставка
+        записей каждого вида и executemany UPDATE правил. Записи
+        создаются только для ключей, которые вставил этот вызов, поэтому
+        повторный или параллельный запуск не создает дублей. Правило,
+        простоявшее несколько периодов, догоняет их все. Возвращает число
+        обработанных повторений: меньше batch_size — наступивших больше
+        нет.
+        """
+        rules = (await session.scalars(
+            select(RecurringRule).where(
+                RecurringRule.next_at <= now
+            ).order_by(RecurringRule.next_at, RecurringRule.id)
+            .limit(batch_size)
+        )).all()
+        occurrences, advanced = [], []
+        for rule in rules:
+            sequence, moment = rule.sequence, rule.next_at
+            while (moment is not None and moment <= now
+                   and len(occurrences) < batch_size):
+                occurrences.append({
+                    'rule_id': rule.id, 'sequence': sequence,
+                    'occurs_at': moment,
+                })
+                sequence += 1
+                moment = occurrence_at(rule, sequence)
+            if sequence != rule.sequence:
+                advanced.append(
+                    {'id': rule.id, 'sequence': sequence, 'next_at': moment}
+                )
+        if not occurrences:
+            return 0
+        created = await session.execute(
+            dialect_insert(session, RecurringOccurrence)
+            .on_conflict_do_nothing(index_elements=OCCURRENCE_KEY)
+            .returning(
+                RecurringOccurrence.rule_id, RecurringOccurrence.occurs_at
+            ),
+            occurrences
+        )
+        rules_by_id = {rule.id: rule for rule in rules}
+        rows = defaultdict(list)
+        for rule_id, occurs_at in created:
+            rule = rules_by_id[rule_id]
+            rows[rule.kind].append({
+                **LEDGER_DEFAULTS.get(rule.kind, {}),
+                'user_id': rule.user_id,
+                'category_id': rule.category_id,
+                'amount': rule.amount,
+                'description': rule.description,
+                'date': occurs_at,
+            })
+        inserted = []
+        for kind, kind_rows in rows.items():
+            inserted += await self.ledger_cruds[kind].insert_rows(
+                session, kind_rows
+            )
+        await session.execute(update(RecurringRule), advanced)
+        await session.commit()
+        await self.invalidate_cache(inserted)
+        return len(occurrences)
+
+    async def remove(
+            self, obj_id: int, session: AsyncSession,
+            user: Optional[User] = None
+    ):
+        """Удаляет правило вместе с ключами его повторений. Занесенные
+        записи учета остаются."""
+        await session.execute(
+            delete(RecurringOccurrence).where(
+                RecurringOccurrence.rule_id.in_(
+                    self.where_own(select(RecurringRule.id), obj_id, user)
+                )
+            )
+        )
+        return await super().remove(obj_id, session, user)
+
+    async def remove_category(
+            self, session: AsyncSession, kind: str, category_id: int
+    ) -> None:
+        """Удаляет правила удаляемой категории и ключи их повторений."""
+        rule_ids = select(RecurringRule.id).where(
+            RecurringRule.kind == kind,
+            RecurringRule.category_id == category_id
+        )
+        await session.execute(
+            delete(RecurringOccurrence).where(
+                RecurringOccurrence.rule_id.in_(rule_ids)
+            )
+        )
+        await session.execute(
+            delete(RecurringRule).where(
+                RecurringRule.kind == kind,
+                RecurringRule.category_id == category_id
+            )
+        )
+
+
+recurring_rule_crud = CRUDRecurringRule(
+    RecurringRule, (expense_crud, income_crud)
+)
@@ -3,9 +3,17 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.endpoints import metrics_router
 from app.api.routers import main_router
+from app.core.category_registry import load_category_registries
 from app.core.config import settings
+from app.core.db import (
+    AsyncSessionLocal, stick_to_primary_after_write)
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.core.init_db import create_first_superuser
+from app.core.metrics import MetricsMiddleware
+from app.core.password import password_hasher
+from app.core.scheduler import recurring_scheduler
 
 origins = [
     'http://localhost:8088',
@@ -18,7 +26,13 @@ origins = [
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_first_superuser()
+    async with AsyncSessionLocal() as session:
+        await load_category_registries(session)
+    if settings.recurring_scheduler_enabled:
+        recurring_scheduler.start()
     yield
+    await recurring_scheduler.stop()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -26,11 +40,17 @@ app = FastAPI(
     description=settings.description,
     lifespan=lifespan
 )
+app.middleware('http')(stick_to_primary_after_write)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=[NEXT_CURSOR_HEADER, 'ETag'],
 )
 app.include_router(main_router, prefix='/api')
+if settings.metrics_enabled:
+    # Последний добавленный middleware — внешний: замер включает остальные
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
@@ -2,3 +2,9 @@ from .category import ExpenseCategory, IncomeCategory
 from .expense import Expense
 from .user import User
 from .income import Income
+from .daily_total import DailyTotal
+from .cache_version import CacheVersion
+from .budget import Budget, BudgetSpending
+from .lease import Lease
+from .recurring import RecurringOccurrence, RecurringRule
+from .balance import BalanceSnapshot
@@ -0,0 +1,35 @@
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer, Numeric, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import GeneralFieldBase
+
+
+class BalanceSnapshot(GeneralFieldBase):
+    """Баланс пользователя (доходы минус расходы) на конец месяца,
+    который начинается в month.
+
+    Снимки достраиваются при запросе баланса от последнего сохраненного
+    и удаляются с месяца каждой измененной записи учета, поэтому баланс
+    на любой момент — один снимок плюс записи не больше чем за месяц.
+    """
+    __tablename__ = 'balance_snapshot'
+    __table_args__ = (
+        UniqueConstraint(
+            'user_id', 'month', name='uq_balance_snapshot_user_id_month'
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('user.id'), nullable=False
+    )
+    month: Mapped[date] = mapped_column(
+        Date, nullable=False, comment='Начало месяца'
+    )
+    closing: Mapped[float] = mapped_column(
+        Numeric(14, 2), nullable=False, comment='Баланс на конец месяца'
+    )
+
+    def __repr__(self) -> str:
+        return f'{self.user_id} {self.month}: {self.closing}'
@@ -0,0 +1,69 @@
+from datetime import date
+
+from sqlalchemy import (
+    Date, ForeignKey, Integer, Numeric, String, UniqueConstraint)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import GeneralFieldBase
+
+MAX_LENGTH_PERIOD = 16
+
+
+class Budget(GeneralFieldBase):
+    """Лимит расходов пользователя по категории за день, неделю или
+    месяц."""
+    __tablename__ = 'budget'
+    __table_args__ = (
+        UniqueConstraint(
+            'user_id', 'category_id', 'period',
+            name='uq_budget_user_id_category_id_period'
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('user.id'), nullable=False
+    )
+    category_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('expense_category.id'), nullable=False,
+        comment='ID категории расходов'
+    )
+    period: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_PERIOD), nullable=False,
+        comment='Период: day, week или month'
+    )
+    limit: Mapped[float] = mapped_column(
+        Numeric(14, 2), nullable=False, comment='Лимит за период'
+    )
+
+    def __repr__(self) -> str:
+        return f'{self.category_id} {self.period}: {self.limit}'
+
+
+class BudgetSpending(GeneralFieldBase):
+    """Сумма расходов категории бюджета за период, который начинается в
+    period_start.
+
+    Строки поддерживаются инкрементально при каждом изменении расхода,
+    поэтому потраченное за период читается по ключу, без суммирования.
+    """
+    __tablename__ = 'budget_spending'
+    __table_args__ = (
+        UniqueConstraint(
+            'budget_id', 'period_start',
+            name='uq_budget_spending_budget_id_period_start'
+        ),
+    )
+
+    budget_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('budget.id'), nullable=False
+    )
+    period_start: Mapped[date] = mapped_column(
+        Date, nullable=False, comment='Начало периода'
+    )
+    spent: Mapped[float] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0,
+        comment='Потрачено за период'
+    )
+
+    def __repr__(self) -> str:
+        return f'{self.budget_id} {self.period_start}: {self.spent}'
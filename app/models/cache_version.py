@@ -0,0 +1,22 @@
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import GeneralFieldBase
+
+MAX_LENGTH_CACHE_NAME = 64
+
+
+class CacheVersion(GeneralFieldBase):
+    """Счетчик версии кэшируемых данных, общий для всех воркеров."""
+    __tablename__ = 'cache_version'
+
+    name: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_CACHE_NAME), nullable=False, unique=True,
+        comment='Имя кэша'
+    )
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment='Версия данных'
+    )
+
+    def __repr__(self) -> str:
+        return f'{self.name} v{self.version}'
@@ -0,0 +1,45 @@
+from datetime import date
+
+from sqlalchemy import (
+    Date, ForeignKey, Integer, Numeric, String, UniqueConstraint)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import GeneralFieldBase
+
+MAX_LENGTH_KIND = 16
+
+
+class DailyTotal(GeneralFieldBase):
+    """Сумма и количество записей пользователя за день по категории.
+
+    kind — имя таблицы учета ('expense' или 'income'). Строки
+    поддерживаются инкрементально при каждом изменении записи.
+    """
+    __tablename__ = 'daily_totals'
+    __table_args__ = (
+        UniqueConstraint(
+            'user_id', 'kind', 'category_id', 'day',
+            name='uq_daily_totals_user_id_kind_category_id_day'
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('user.id'), nullable=False
+    )
+    kind: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_KIND), nullable=False, comment='Вид записи'
+    )
+    category_id: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment='ID категории'
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False, comment='День')
+    amount_sum: Mapped[float] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0, comment='Сумма за день'
+    )
+    count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment='Количество записей'
+    )
+
+    def __repr__(self) -> str:
+        return (f'{self.kind} {self.day} {self.category_id}: '
+                f'{self.amount_sum} ({self.count})')
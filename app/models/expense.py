@@ -1,16 +1,21 @@
 from datetime import datetime as dt
 from typing import Optional
 
-from sqlalchemy import DateTime, String, Integer, ForeignKey, Numeric
+from sqlalchemy import (
+    DateTime, String, Integer, ForeignKey, Index, Numeric)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import GeneralFieldBase
+from app.core.search import register_search_index
 
 MAX_LENGTH_DESCRIPTION = 500
 
 
 class Expense(GeneralFieldBase):
     __tablename__ = 'expense'
+    __table_args__ = (
+        Index('ix_expense_user_id_date_id', 'user_id', 'date', 'id'),
+    )
     amount: Mapped[float] = mapped_column(
         Numeric(10, 2), nullable=False, comment='Сумма расхода'
     )
@@ -36,3 +41,6 @@ class Expense(GeneralFieldBase):
 
     def __repr__(self) -> str:
         return f'{self.id}, amount={self.amount}, date={self.date}'
+
+
+register_search_index(Expense.__table__)
@@ -1,15 +1,20 @@
 from datetime import datetime as dt
 from typing import Optional
 
-from sqlalchemy import DateTime, String, Integer, ForeignKey, Numeric
+from sqlalchemy import (
+    DateTime, String, Integer, ForeignKey, Index, Numeric)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import GeneralFieldBase
+from app.core.search import register_search_index
 from app.models.expense import MAX_LENGTH_DESCRIPTION
 
 
 class Income(GeneralFieldBase):
     __tablename__ = 'income'
+    __table_args__ = (
+        Index('ix_income_user_id_date_id', 'user_id', 'date', 'id'),
+    )
 
     amount: Mapped[float] = mapped_column(
         Numeric(10, 2), nullable=False, comment='Сумма дохода'
@@ -34,3 +39,6 @@ class Income(GeneralFieldBase):
 
     def __repr__(self) -> str:
         return f'{self.id}, amount={self.amount}, date={self.date}'
+
+
+register_search_index(Income.__table__)
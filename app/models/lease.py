@@ -0,0 +1,30 @@
+from datetime import datetime as dt
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import GeneralFieldBase
+
+MAX_LENGTH_LEASE_NAME = 64
+MAX_LENGTH_LEASE_OWNER = 128
+
+
+class Lease(GeneralFieldBase):
+    """Аренда фоновой задачи: пока expires_at не прошел, задачу выполняет
+    только воркер owner."""
+    __tablename__ = 'lease'
+
+    name: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_LEASE_NAME), nullable=False, unique=True,
+        comment='Имя задачи'
+    )
+    owner: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_LEASE_OWNER), nullable=False,
+        comment='Воркер, удерживающий аренду'
+    )
+    expires_at: Mapped[dt] = mapped_column(
+        DateTime, nullable=False, comment='Срок аренды'
+    )
+
+    def __repr__(self) -> str:
+        return f'{self.name}: {self.owner} ({self.expires_at})'
@@ -0,0 +1,98 @@
+from datetime import datetime as dt
+from typing import Optional
+
+from sqlalchemy import (
+    DateTime, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import GeneralFieldBase
+from app.models.daily_total import MAX_LENGTH_KIND
+from app.models.expense import MAX_LENGTH_DESCRIPTION
+
+MAX_LENGTH_PERIOD = 16
+
+
+def first_occurrence(context) -> dt:
+    """Первое повторение нового правила — его start_at."""
+    return context.get_current_parameters()['start_at']
+
+
+class RecurringRule(GeneralFieldBase):
+    """Повторяющийся расход или доход: сумма и категория, которые
+    заносятся каждые interval дней, недель или месяцев начиная с start_at.
+
+    sequence — номер следующего повторения, next_at — его дата (NULL,
+    когда повторения закончились).
+    """
+    __tablename__ = 'recurring_rule'
+    __table_args__ = (
+        Index('ix_recurring_rule_next_at', 'next_at'),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('user.id'), nullable=False
+    )
+    kind: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_KIND), nullable=False,
+        comment='Вид записи: expense или income'
+    )
+    category_id: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment='ID категории'
+    )
+    amount: Mapped[float] = mapped_column(
+        Numeric(10, 2), nullable=False, comment='Сумма записи'
+    )
+    description: Mapped[Optional[str]] = mapped_column(
+        String(MAX_LENGTH_DESCRIPTION), comment='Описание записи'
+    )
+    period: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_PERIOD), nullable=False,
+        comment='Период: day, week или month'
+    )
+    interval: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1,
+        comment='Через сколько периодов повторять'
+    )
+    start_at: Mapped[dt] = mapped_column(
+        DateTime, nullable=False, comment='Дата первого повторения'
+    )
+    end_at: Mapped[Optional[dt]] = mapped_column(
+        DateTime, comment='Повторения до этой даты (не включая)'
+    )
+    sequence: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0,
+        comment='Номер следующего повторения'
+    )
+    next_at: Mapped[Optional[dt]] = mapped_column(
+        DateTime, default=first_occurrence,
+        comment='Дата следующего повторения'
+    )
+
+    def __repr__(self) -> str:
+        return (f'{self.kind} {self.amount} every {self.interval} '
+                f'{self.period}')
+
+
+class RecurringOccurrence(GeneralFieldBase):
+    """Занесенное повторение правила. Ключ (rule_id, sequence) не дает
+    занести одно повторение дважды."""
+    __tablename__ = 'recurring_occurrence'
+    __table_args__ = (
+        UniqueConstraint(
+            'rule_id', 'sequence',
+            name='uq_recurring_occurrence_rule_id_sequence'
+        ),
+    )
+
+    rule_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('recurring_rule.id'), nullable=False
+    )
+    sequence: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment='Номер повторения'
+    )
+    occurs_at: Mapped[dt] = mapped_column(
+        DateTime, nullable=False, comment='Дата повторения'
+    )
+
+    def __repr__(self) -> str:
+        return f'{self.rule_id} #{self.sequence} {self.occurs_at}'
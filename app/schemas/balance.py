@@ -0,0 +1,31 @@
+from datetime import datetime as dt
+
+from pydantic import BaseModel, Field
+
+from app.schemas.trends import TrendBucketSize
+
+
+class Balance(BaseModel):
+    """Баланс (доходы минус расходы) по записям с датой до at."""
+    at: dt
+    tz: str
+    balance: float
+
+
+class BalancePoint(BaseModel):
+    """Доходы и расходы интервала, который начинается в start, и баланс
+    на его конец."""
+    start: dt
+    income: float = 0
+    expense: float = 0
+    balance: float
+
+
+class BalanceSeries(BaseModel):
+    """Баланс по интервалам диапазона [start, end) пояса tz."""
+    bucket: TrendBucketSize
+    tz: str
+    start: dt
+    end: dt
+    opening: float = Field(description='Баланс на начало диапазона')
+    points: list[BalancePoint]
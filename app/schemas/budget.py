@@ -0,0 +1,44 @@
+from datetime import datetime as dt
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+BudgetPeriod = Literal['day', 'week', 'month']
+MIN_BUDGET_LIMIT = 0
+
+
+class BudgetCreate(BaseModel):
+    category_id: int
+    period: BudgetPeriod = 'month'
+    limit: float = Field(
+        gt=MIN_BUDGET_LIMIT, description='Лимит расходов за период'
+    )
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class BudgetUpdate(BaseModel):
+    """Меняется только лимит: категория и период задают сам бюджет."""
+    limit: float = Field(gt=MIN_BUDGET_LIMIT)
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class BudgetDB(BudgetCreate):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BudgetStatus(BaseModel):
+    """Использование бюджета за период [start, end)."""
+    budget_id: int
+    category_id: int
+    period: BudgetPeriod
+    start: dt
+    end: dt
+    limit: float
+    spent: float
+    remaining: float
+    utilisation: float = Field(description='Доля потраченного лимита')
+    over_budget: bool
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class BulkRowError(BaseModel):
+    row: int = Field(description='Номер строки, начиная с 1')
+    errors: list[str]
+
+
+class BulkResult(BaseModel):
+    created: int
+    errors: list[BulkRowError]
+
+
+class BulkAffected(BaseModel):
+    ids: list[int] = Field(description='ID затронутых записей')
@@ -1,13 +1,22 @@
 from datetime import datetime as dt
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from app.models.expense import MAX_LENGTH_DESCRIPTION
+from app.schemas.budget import BudgetStatus
 
 MIN_LENGTH_AMOUNT = 0
 
 
+def reject_null(value):
+    """Валидатор полей патча, которые нельзя очистить: отсутствующее поле
+    не меняется, а явный null отклоняется."""
+    if value is None:
+        raise ValueError('Поле не может быть null')
+    return value
+
+
 class ExpenseBase(BaseModel):
     amount: float = Field(gt=MIN_LENGTH_AMOUNT, description="Сумма расхода")
     description: Optional[str] = Field(None, max_length=MAX_LENGTH_DESCRIPTION)
@@ -32,8 +41,52 @@ class ExpenseUpdate(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
 
+class ExpenseFilter(BaseModel):
+    """Фильтры списка расходов пользователя."""
+    date_from: Optional[dt] = None
+    date_to: Optional[dt] = None
+    category_id: Optional[int] = None
+    is_paid: Optional[bool] = None
+
+
+class ExpenseBulkFilter(ExpenseFilter):
+    """Фильтр пакетного изменения: список id и/или поля фильтра списка."""
+    ids: Optional[list[int]] = None
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class ExpenseBulkPatch(BaseModel):
+    amount: Optional[float] = Field(None, gt=MIN_LENGTH_AMOUNT)
+    description: Optional[str] = Field(
+        None, max_length=MAX_LENGTH_DESCRIPTION
+    )
+    category_id: Optional[int] = None
+    date: Optional[dt] = None
+    is_paid: Optional[bool] = None
+
+    model_config = ConfigDict(extra='forbid')
+
+    check_not_null = field_validator(
+        'amount', 'category_id', 'date', 'is_paid'
+    )(reject_null)
+
+
+class ExpenseBulkUpdate(BaseModel):
+    filter: ExpenseBulkFilter
+    patch: ExpenseBulkPatch
+
+    model_config = ConfigDict(extra='forbid')
+
+
 class ExpenseDB(ExpenseBase):
     id: int
     created_at: dt
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ExpenseWithBudgets(ExpenseDB):
+    """Расход и состояние бюджетов его категории за периоды, в которые он
+    попадает."""
+    budgets: list[BudgetStatus] = Field(default_factory=list)
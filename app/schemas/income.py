@@ -1,10 +1,10 @@
 from datetime import datetime as dt
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from app.models.income import MAX_LENGTH_DESCRIPTION
-from app.schemas.expense import MIN_LENGTH_AMOUNT
+from app.schemas.expense import MIN_LENGTH_AMOUNT, reject_null
 
 
 class IncomeBase(BaseModel):
@@ -29,6 +29,42 @@ class IncomeUpdate(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
 
+class IncomeFilter(BaseModel):
+    """Фильтры списка доходов пользователя."""
+    date_from: Optional[dt] = None
+    date_to: Optional[dt] = None
+    category_id: Optional[int] = None
+
+
+class IncomeBulkFilter(IncomeFilter):
+    """Фильтр пакетного изменения: список id и/или поля фильтра списка."""
+    ids: Optional[list[int]] = None
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class IncomeBulkPatch(BaseModel):
+    amount: Optional[float] = Field(None, gt=MIN_LENGTH_AMOUNT)
+    description: Optional[str] = Field(
+        None, max_length=MAX_LENGTH_DESCRIPTION
+    )
+    category_id: Optional[int] = None
+    date: Optional[dt] = None
+
+    model_config = ConfigDict(extra='forbid')
+
+    check_not_null = field_validator(
+        'amount', 'category_id', 'date'
+    )(reject_null)
+
+
+class IncomeBulkUpdate(BaseModel):
+    filter: IncomeBulkFilter
+    patch: IncomeBulkPatch
+
+    model_config = ConfigDict(extra='forbid')
+
+
 class IncomeDB(IncomeBase):
     id: int
     created_at: dt
@@ -0,0 +1,52 @@
+from datetime import datetime as dt
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.models.expense import MAX_LENGTH_DESCRIPTION
+
+RecurringKind = Literal['expense', 'income']
+RecurringPeriod = Literal['day', 'week', 'month']
+MIN_LENGTH_AMOUNT = 0
+MAX_RECURRING_INTERVAL = 1000
+
+
+class RecurringRuleCreate(BaseModel):
+    kind: RecurringKind = 'expense'
+    category_id: int
+    amount: float = Field(gt=MIN_LENGTH_AMOUNT, description='Сумма записи')
+    description: Optional[str] = Field(None, max_length=MAX_LENGTH_DESCRIPTION)
+    period: RecurringPeriod = 'month'
+    interval: int = Field(
+        1, ge=1, le=MAX_RECURRING_INTERVAL,
+        description='Через сколько периодов повторять'
+    )
+    start_at: dt = Field(
+        default_factory=dt.now, description='Дата первого повторения'
+    )
+    end_at: Optional[dt] = Field(
+        None, description='Повторять до этой даты (не включая)'
+    )
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class RecurringRuleUpdate(BaseModel):
+    """Меняются сумма и описание следующих повторений. Расписание,
+    вид и категория задают само правило."""
+    amount: Optional[float] = Field(None, gt=MIN_LENGTH_AMOUNT)
+    description: Optional[str] = Field(
+        None, max_length=MAX_LENGTH_DESCRIPTION
+    )
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class RecurringRuleDB(RecurringRuleCreate):
+    id: int
+    sequence: int = Field(description='Номер следующего повторения')
+    next_at: Optional[dt] = Field(
+        description='Дата следующего повторения, null — повторений больше нет'
+    )
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,19 @@
+from datetime import datetime as dt
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+SearchKind = Literal['expense', 'income']
+
+
+class SearchResult(BaseModel):
+    """Найденная запись учета. score — релевантность, больше — лучше."""
+    kind: SearchKind
+    id: int
+    amount: float
+    description: Optional[str]
+    category_id: int
+    date: dt
+    score: float
+
+    model_config = ConfigDict(from_attributes=True)
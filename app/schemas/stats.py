@@ -0,0 +1,31 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    backend: Optional[str]
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class HistogramBucket(BaseModel):
+    le: float
+    count: int
+
+
+class Histogram(BaseModel):
+    buckets: list[HistogramBucket]
+    sum: float
+    count: int
+
+
+class PoolStats(BaseModel):
+    pool: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    timeouts: Optional[int] = None
+    wait_seconds: Optional[Histogram] = None
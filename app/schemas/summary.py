@@ -0,0 +1,32 @@
+from datetime import datetime as dt
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class CategoryTotal(BaseModel):
+    category_id: int
+    total: float
+    count: int
+
+
+class PeriodSummary(BaseModel):
+    """Итоги за период [start, end). Для всего времени границ нет."""
+    start: Optional[dt] = None
+    end: Optional[dt] = None
+    total: float = 0
+    count: int = 0
+    categories: list[CategoryTotal] = Field(default_factory=list)
+
+
+class LedgerSummary(BaseModel):
+    day: PeriodSummary
+    week: PeriodSummary
+    month: PeriodSummary
+    all: PeriodSummary
+
+
+class Summary(BaseModel):
+    at: dt
+    expense: LedgerSummary
+    income: LedgerSummary
@@ -0,0 +1,28 @@
+from datetime import datetime as dt
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.summary import CategoryTotal
+
+TrendKind = Literal['expense', 'income']
+TrendBucketSize = Literal['day', 'week', 'month']
+
+
+class TrendBucket(BaseModel):
+    """Итоги за интервал, который начинается в start. categories
+    заполняется, если запрошена разбивка по категориям."""
+    start: dt
+    total: float = 0
+    count: int = 0
+    categories: Optional[list[CategoryTotal]] = None
+
+
+class Trend(BaseModel):
+    """Итоги по интервалам в диапазоне [start, end) пояса tz."""
+    kind: TrendKind
+    bucket: TrendBucketSize
+    tz: str
+    start: dt
+    end: dt
+    buckets: list[TrendBucket]
@@ -0,0 +1,171 @@
+"""Время запроса баланса на момент в зависимости от числа записей
+пользователя.
+
+Для каждого объема заполняет временную базу SQLite расходами и доходами
+одного пользователя за YEARS лет и пересчитывает дневные итоги. Первый
+GET /api/balance сохраняет месячные снимки, следующие запрашивают баланс
+на случайные моменты диапазона. Для сравнения выполняется запрос,
+которым наивный расчет суммировал бы обе таблицы за все время до
+момента. Результат — JSON с временем первого запроса и p50 остальных и
+наивного расчета в миллисекундах для каждого объема.
+
+Запуск из корня репозитория (нужен httpx):
+
+    python -m benchmarks.balance --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+from datetime import datetime as dt, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'balance.db')
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{DB_PATH}'
+os.environ['CACHE_BACKEND'] = 'none'
+
+import httpx  # noqa: E402
+from sqlalchemy import delete, func, insert, select, text  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.crud.balance import balance_crud  # noqa: E402
+from app.crud.daily_total import daily_total_crud  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import (  # noqa: E402
+    Expense, ExpenseCategory, Income, IncomeCategory)
+
+SIZES = (10_000, 100_000, 1_000_000)
+BATCH_SIZE = 50_000
+YEARS = 5
+END = dt.now().replace(microsecond=0)
+START = END - timedelta(days=365 * YEARS)
+SPAN_SECONDS = int((END - START).total_seconds())
+
+
+async def reseed(rows: int) -> None:
+    """Заполняет диапазон rows записями: каждая десятая — доход."""
+    async with AsyncSessionLocal() as session:
+        await balance_crud.clear(session)
+        for model in (Expense, Income):
+            await session.execute(delete(model))
+        for offset in range(0, rows, BATCH_SIZE):
+            numbers = range(offset, min(offset + BATCH_SIZE, rows))
+            for model, selected in (
+                    (Income, [n for n in numbers if n % 10 == 0]),
+                    (Expense, [n for n in numbers if n % 10])
+            ):
+                await session.execute(insert(model), [
+                    {
+                        'amount': 1 + number % 100, 'category_id': 1,
+                        'user_id': 1, 'created_at': START,
+                        'date': START + timedelta(
+                            seconds=number * SPAN_SECONDS // rows
+                        ),
+                        **({'is_paid': True} if model is Expense else {}),
+                    }
+                    for number in selected
+                ])
+        for model in (Expense, Income):
+            await daily_total_crud.rebuild(
+                session, model.__tablename__, model, commit=False
+            )
+        await session.commit()
+
+
+async def naive_balance(session, moment: dt) -> float:
+    income, expense = [
+        await session.scalar(
+            select(func.coalesce(func.sum(model.amount), 0)).where(
+                model.user_id == 1, model.date < moment
+            )
+        )
+        for model in (Income, Expense)
+    ]
+    return float(income - expense)
+
+
+async def main(args) -> dict:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        # Поисковый индекс для замера не нужен и замедляет заполнение
+        for trigger in ('expense_fts_ai', 'expense_fts_ad',
+                        'income_fts_ai', 'income_fts_ad'):
+            await connection.execute(text(f'DROP TRIGGER {trigger}'))
+    await create_user(
+        'bench@example.com', 'bench-password', is_superuser=True
+    )
+    async with AsyncSessionLocal() as session:
+        session.add_all([
+            ExpenseCategory(name='Продукты'), IncomeCategory(name='Зарплата')
+        ])
+        await session.commit()
+    rnd = random.Random(0)
+    report = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://benchmark',
+        timeout=None
+    ) as client:
+        response = await client.post(
+            '/api/auth/jwt/login',
+            data={'username': 'bench@example.com',
+                  'password': 'bench-password'}
+        )
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        for size in SIZES[:args.sizes]:
+            await reseed(size)
+            started = perf_counter()
+            response = await client.get(
+                '/api/balance', headers=headers,
+                params={'at': END.isoformat()}
+            )
+            first = perf_counter() - started
+            response.raise_for_status()
+            balance, naive = [], []
+            for _ in range(args.repeat):
+                moment = START + timedelta(
+                    seconds=rnd.randrange(SPAN_SECONDS)
+                )
+                started = perf_counter()
+                response = await client.get(
+                    '/api/balance', headers=headers,
+                    params={'at': moment.isoformat()}
+                )
+                balance.append(perf_counter() - started)
+                async with AsyncSessionLocal() as session:
+                    started = perf_counter()
+                    expected = await naive_balance(session, moment)
+                    naive.append(perf_counter() - started)
+                assert response.json()['balance'] == expected, (
+                    response.json(), expected
+                )
+            report[size] = {
+                'first_ms': round(first * 1000, 2),
+                'balance_p50_ms': round(
+                    statistics.median(balance) * 1000, 2
+                ),
+                'naive_sum_p50_ms': round(
+                    statistics.median(naive) * 1000, 2
+                ),
+            }
+    await engine.dispose()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument(
+        '--sizes', type=int, default=len(SIZES),
+        help='Сколько первых объемов из SIZES замерить'
+    )
+    report = asyncio.run(main(parser.parse_args()))
+    json.dump(report, sys.stdout, indent=2)
+    print()
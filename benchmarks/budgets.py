@@ -0,0 +1,151 @@
+"""Время создания расхода с бюджетом категории в зависимости от числа
+расходов за месяц.
+
+Для каждого объема заполняет временную базу SQLite расходами одного
+пользователя в одной категории за текущий месяц, пересчитывает дневные
+итоги и создает месячный бюджет категории. Затем создает расходы через
+POST /api/expense (ответ содержит состояние бюджета) и для сравнения
+выполняет запрос, которым наивная проверка пересчитывала бы потраченное
+за месяц: SUM по расходам категории. Результат — JSON с p50 создания
+расхода и наивного пересчета в миллисекундах для каждого объема.
+
+Запуск из корня репозитория (нужен httpx):
+
+    python -m benchmarks.budgets --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+from datetime import datetime as dt, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'budgets.db')
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{DB_PATH}'
+os.environ['CACHE_BACKEND'] = 'none'
+
+import httpx  # noqa: E402
+from sqlalchemy import delete, func, insert, select, text  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.core.periods import MONTH, next_bucket, start_of_bucket  # noqa: E402
+from app.crud.daily_total import daily_total_crud  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Budget, BudgetSpending, Expense  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+BATCH_SIZE = 50_000
+MONTH_START = start_of_bucket(dt.now(), MONTH)
+MONTH_SECONDS = int(
+    (next_bucket(MONTH_START, MONTH) - MONTH_START).total_seconds()
+)
+
+
+async def reseed(rows: int) -> None:
+    """Заполняет месяц rows расходами категории 1 и пересоздает
+    бюджет."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(BudgetSpending))
+        await session.execute(delete(Budget))
+        await session.execute(delete(Expense))
+        for offset in range(0, rows, BATCH_SIZE):
+            await session.execute(insert(Expense), [
+                {
+                    'amount': 1, 'category_id': 1, 'user_id': 1,
+                    'is_paid': True, 'created_at': MONTH_START,
+                    'date': MONTH_START + timedelta(
+                        seconds=number * MONTH_SECONDS // rows
+                    ),
+                }
+                for number in range(offset, min(offset + BATCH_SIZE, rows))
+            ])
+        await daily_total_crud.rebuild(
+            session, Expense.__tablename__, Expense, commit=False
+        )
+        await session.commit()
+
+
+async def naive_spent(session) -> float:
+    return await session.scalar(
+        select(func.sum(Expense.amount)).where(
+            Expense.user_id == 1, Expense.category_id == 1,
+            Expense.date >= MONTH_START,
+            Expense.date < next_bucket(MONTH_START, MONTH),
+        )
+    )
+
+
+async def main(args) -> dict:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        # Поисковый индекс для замера не нужен и замедляет заполнение
+        for trigger in ('expense_fts_ai', 'expense_fts_ad'):
+            await connection.execute(text(f'DROP TRIGGER {trigger}'))
+    await create_user(
+        'bench@example.com', 'bench-password', is_superuser=True
+    )
+    report = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://benchmark',
+        timeout=None
+    ) as client:
+        response = await client.post(
+            '/api/auth/jwt/login',
+            data={'username': 'bench@example.com',
+                  'password': 'bench-password'}
+        )
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        await client.post(
+            '/api/category/expense', json={'name': 'Продукты'},
+            headers=headers
+        )
+        for size in SIZES[:args.sizes]:
+            await reseed(size)
+            response = await client.post('/api/budget', headers=headers, json={
+                'category_id': 1, 'period': MONTH, 'limit': size
+            })
+            response.raise_for_status()
+            create, naive = [], []
+            for _ in range(args.repeat):
+                started = perf_counter()
+                response = await client.post(
+                    '/api/expense', headers=headers, json={
+                        'amount': 1, 'category_id': 1,
+                        'date': (MONTH_START + timedelta(hours=1)).isoformat()
+                    }
+                )
+                create.append(perf_counter() - started)
+                response.raise_for_status()
+                async with AsyncSessionLocal() as session:
+                    started = perf_counter()
+                    spent = await naive_spent(session)
+                    naive.append(perf_counter() - started)
+                budget, = response.json()['budgets']
+                assert budget['spent'] == float(spent), (budget, spent)
+            report[size] = {
+                'create_p50_ms': round(statistics.median(create) * 1000, 2),
+                'naive_sum_p50_ms': round(
+                    statistics.median(naive) * 1000, 2
+                ),
+            }
+    await engine.dispose()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument(
+        '--sizes', type=int, default=len(SIZES),
+        help='Сколько первых объемов из SIZES замерить'
+    )
+    report = asyncio.run(main(parser.parse_args()))
+    json.dump(report, sys.stdout, indent=2)
+    print()
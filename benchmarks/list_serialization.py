@@ -0,0 +1,136 @@
+"""Пропускная способность списка расходов: ORM и схема против строк.
+
+Заполняет временную базу SQLite расходами одного пользователя и поднимает
+минимальное приложение FastAPI с двумя обработчиками одного списка:
+обычным (ORM-объекты, response_model=list[ExpenseDB]) и быстрым (строки с
+колонками схемы и rows_response). Размер страницы не ограничен
+MAX_PAGE_LIMIT, чтобы сравнить 1k, 10k и 100k строк. Клиент запрашивает
+страницы последовательно через httpx.ASGITransport. Результат — JSON с
+запросами в секунду и p50 по каждому размеру и способу.
+
+Запуск из корня репозитория (нужен httpx):
+
+    python -m benchmarks.list_serialization --duration 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+from datetime import datetime as dt, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'list_serialization.db')
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{DB_PATH}'
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Response  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.core.serialization import (  # noqa: E402
+    rows_response, schema_fields)
+from app.crud.expense import expense_crud  # noqa: E402
+from app.models import Expense, ExpenseCategory, User  # noqa: E402
+from app.schemas.expense import ExpenseDB  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+EXPENSE_FIELDS = schema_fields(ExpenseDB)
+
+app = FastAPI()
+
+
+async def get_user(session) -> User:
+    return await session.scalar(select(User))
+
+
+@app.get('/orm', response_model=list[ExpenseDB])
+async def orm_list(limit: int):
+    async with AsyncSessionLocal() as session:
+        user = await get_user(session)
+        return await expense_crud.get_page_by_user(
+            user, session, limit=limit
+        )
+
+
+@app.get('/fast', response_model=list[ExpenseDB])
+async def fast_list(limit: int, response: Response):
+    async with AsyncSessionLocal() as session:
+        user = await get_user(session)
+        rows = await expense_crud.get_page_by_user(
+            user, session, limit=limit, fields=EXPENSE_FIELDS
+        )
+    return rows_response(rows, EXPENSE_FIELDS, response)
+
+
+async def seed(rows: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    await create_user('bench@example.com', 'bench-password')
+    start = dt(2020, 1, 1)
+    async with AsyncSessionLocal() as session:
+        user = await get_user(session)
+        session.add(ExpenseCategory(name='Продукты'))
+        await session.flush()
+        await session.execute(insert(Expense), [
+            {
+                'amount': i % 1000 + 0.5, 'description': f'Покупка {i}',
+                'category_id': 1, 'user_id': user.id, 'is_paid': i % 2 == 0,
+                'date': start + timedelta(minutes=i), 'created_at': start,
+            }
+            for i in range(rows)
+        ])
+        await session.commit()
+
+
+async def measure(client, path: str, size: int, duration: float) -> dict:
+    latencies = []
+    deadline = perf_counter() + duration
+    while perf_counter() < deadline or len(latencies) < 3:
+        started = perf_counter()
+        response = await client.get(path, params={'limit': size})
+        latencies.append(perf_counter() - started)
+        assert len(response.json()) == size
+    return {
+        'rps': round(len(latencies) / sum(latencies), 2),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+    }
+
+
+async def main(args) -> dict:
+    await seed(max(SIZES))
+    report = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://benchmark',
+        timeout=None
+    ) as client:
+        for size in SIZES:
+            orm = await client.get('/orm', params={'limit': size})
+            fast = await client.get('/fast', params={'limit': size})
+            assert orm.content == fast.content, (
+                'Ответы обработчиков различаются'
+            )
+        for size in SIZES:
+            report[size] = {
+                path.strip('/'): await measure(
+                    client, path, size, args.duration
+                )
+                for path in ('/orm', '/fast')
+            }
+            report[size]['speedup'] = round(
+                report[size]['fast']['rps'] / report[size]['orm']['rps'], 2
+            )
+    await engine.dispose()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--duration', type=float, default=5)
+    report = asyncio.run(main(parser.parse_args()))
+    json.dump(report, sys.stdout, indent=2)
+    print()
@@ -0,0 +1,127 @@
+"""Задержка посторонних запросов во время серии входов.
+
+Поднимает приложение в процессе (httpx.ASGITransport) на временной базе
+SQLite. Один клиент непрерывно запрашивает список категорий, остальные
+параллельно входят через /api/auth/jwt/login. Замер повторяется с
+хешированием в цикле событий (workers=0), в пуле с обычным приоритетом и в
+пуле с приоритетом, пониженным на --nice. Размер пула ограничивается так
+же, как в приложении (pool_size). Результат — JSON с p50/p99 задержки
+списка категорий без нагрузки и во время входов.
+
+Запуск из корня репозитория (нужен httpx):
+
+    python -m benchmarks.login_storm --duration 5 --logins 16 --workers 2 \
+        --executor thread --nice 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'login_storm.db')
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{DB_PATH}'
+
+import httpx  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.core.password import password_hasher  # noqa: E402
+from app.main import app  # noqa: E402
+
+EMAIL = 'storm@example.com'
+PASSWORD = 'storm-password'
+
+
+def percentiles(latencies: list[float]) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+    }
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event) -> list:
+    latencies = []
+    while not stop.is_set():
+        started = perf_counter()
+        response = await client.get('/api/category/expense')
+        response.raise_for_status()
+        latencies.append(perf_counter() - started)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def login_loop(client: httpx.AsyncClient, stop: asyncio.Event) -> int:
+    logins = 0
+    while not stop.is_set():
+        response = await client.post(
+            '/api/auth/jwt/login',
+            data={'username': EMAIL, 'password': PASSWORD}
+        )
+        response.raise_for_status()
+        logins += 1
+    return logins
+
+
+async def phase(client, duration: float, logins: int) -> dict:
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(client, stop))
+    login_tasks = [
+        asyncio.create_task(login_loop(client, stop)) for _ in range(logins)
+    ]
+    await asyncio.sleep(duration)
+    stop.set()
+    result = percentiles(await probe_task)
+    result['logins'] = sum(await asyncio.gather(*login_tasks))
+    return result
+
+
+async def main(args) -> dict:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    await create_user(EMAIL, PASSWORD)
+    transport = httpx.ASGITransport(app=app)
+    report = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://benchmark'
+    ) as client:
+        modes = {
+            'inline': (0, 0),
+            f'{args.executor}_{args.workers}': (args.workers, 0),
+            f'{args.executor}_{args.workers}_nice_{args.nice}': (
+                args.workers, args.nice
+            ),
+        }
+        for mode, (workers, nice) in modes.items():
+            password_hasher.shutdown()
+            password_hasher.__init__(args.executor, workers, nice)
+            report[mode] = {
+                'idle': await phase(client, args.duration, 0),
+                'login_storm': await phase(
+                    client, args.duration, args.logins
+                ),
+            }
+    password_hasher.shutdown()
+    await engine.dispose()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--logins', type=int, default=16,
+                        help='число параллельных клиентов, входящих в цикле')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='размер пула хеширования')
+    parser.add_argument('--executor', choices=('thread', 'process'),
+                        default='thread', help='тип пула хеширования')
+    parser.add_argument('--nice', type=int, default=10,
+                        help='понижение приоритета исполнителей пула')
+    json.dump(asyncio.run(main(parser.parse_args())), sys.stdout, indent=2)
+    print()
@@ -0,0 +1,129 @@
+"""Занесение повторяющихся записей после простоя.
+
+Заполняет временную базу SQLite правилами (по умолчанию 10 тыс. правил
+100 пользователей, ежемесячные расходы и доходы, первое повторение год
+назад) и запускает один проход планировщика: он догоняет все
+наступившие повторения пакетами по recurring_batch_size. Затем
+откатывает правила к первому повторению и запускает проход снова:
+ключи повторений уже есть, поэтому новых записей быть не должно.
+Результат — JSON со временем, числом записей и SQL-выражений каждого
+прохода.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.recurring --rules 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime as dt
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'recurring.db')
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{DB_PATH}'
+os.environ['CACHE_BACKEND'] = 'none'
+
+from sqlalchemy import event, func, insert, select, update  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine, read_engine  # noqa: E402
+from app.core.periods import MONTH, add_months  # noqa: E402
+from app.core.scheduler import RecurringScheduler  # noqa: E402
+from app.models import (  # noqa: E402
+    Expense, ExpenseCategory, Income, IncomeCategory, RecurringRule, User)
+
+USERS = 100
+MONTHS_BEHIND = 12
+
+
+async def seed(rules: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    start = add_months(dt.now().replace(microsecond=0), -MONTHS_BEHIND)
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(User), [
+            {'email': f'user{number}@example.com', 'hashed_password': '-',
+             'is_active': True, 'is_superuser': False, 'is_verified': False}
+            for number in range(USERS)
+        ])
+        session.add_all([
+            ExpenseCategory(name='Квартплата'), IncomeCategory(name='Зарплата')
+        ])
+        await session.flush()
+        await session.execute(insert(RecurringRule), [
+            {
+                'user_id': number % USERS + 1,
+                'kind': 'income' if number % 10 == 0 else 'expense',
+                'category_id': 1, 'amount': 100 + number % 1000,
+                'description': f'Правило {number}', 'period': MONTH,
+                'interval': 1, 'start_at': start, 'next_at': start,
+                'sequence': 0,
+            }
+            for number in range(rules)
+        ])
+        await session.commit()
+
+
+async def rewind() -> None:
+    """Возвращает правила к первому повторению, как будто их проход
+    прервался до обновления правил."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(RecurringRule).values(
+                sequence=0, next_at=RecurringRule.start_at
+            )
+        )
+        await session.commit()
+
+
+async def count_rows() -> int:
+    async with AsyncSessionLocal() as session:
+        return sum([
+            await session.scalar(select(func.count()).select_from(model))
+            for model in (Expense, Income)
+        ])
+
+
+async def run_pass(scheduler: RecurringScheduler, statements: list) -> dict:
+    statements.clear()
+    rows = await count_rows()
+    started = perf_counter()
+    processed = await scheduler.tick()
+    seconds = perf_counter() - started
+    return {
+        'occurrences': processed,
+        'created_rows': await count_rows() - rows,
+        'seconds': round(seconds, 2),
+        'statements': len(statements),
+    }
+
+
+async def main(args) -> dict:
+    await seed(args.rules)
+    statements = []
+
+    def count(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    for counted_engine in {engine, read_engine}:
+        event.listen(
+            counted_engine.sync_engine, 'before_cursor_execute', count
+        )
+    scheduler = RecurringScheduler()
+    report = {'rules': args.rules}
+    report['catch_up'] = await run_pass(scheduler, statements)
+    await rewind()
+    report['repeat'] = await run_pass(scheduler, statements)
+    await engine.dispose()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rules', type=int, default=10_000)
+    report = asyncio.run(main(parser.parse_args()))
+    json.dump(report, sys.stdout, indent=2)
+    print()
@@ -0,0 +1,148 @@
+"""Смешанная нагрузка чтения и записи на файловую SQLite.
+
+Поднимает приложение в процессе (httpx.ASGITransport) на временной базе и
+запускает параллельных клиентов. Каждый в цикле читает страницу расходов
+или создает расход (доля записей задается --write-ratio). Замер
+выполняется в отдельном процессе для каждого режима: без настройки SQLite
+(sqlite_wal_mode=false) и в режиме WAL с разделением на пишущее соединение
+и пул чтения. Результат — JSON с пропускной способностью, p50/p99 и числом
+ошибок по режимам.
+
+Запуск из корня репозитория (нужен httpx):
+
+    python -m benchmarks.sqlite_mixed --duration 10 --clients 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+MODES = {'rollback_journal': 'false', 'wal_split': 'true'}
+
+
+def summarize(latencies: list[float], duration: float) -> dict:
+    if len(latencies) < 2:
+        return {'requests': len(latencies)}
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app.core.base import Base
+    from app.core.db import engine
+    from app.core.init_db import create_user
+    from app.main import app
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    email, password = 'bench@example.com', 'bench-password'
+    await create_user(email, password, is_superuser=True)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://benchmark', timeout=60
+    ) as client:
+        response = await client.post(
+            '/api/auth/jwt/login',
+            data={'username': email, 'password': password}
+        )
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        await client.post(
+            '/api/category/expense', json={'name': 'Продукты'},
+            headers=headers
+        )
+        await client.post('/api/expense/bulk', headers=headers, json=[
+            {'amount': i % 100 + 1, 'category_id': 1}
+            for i in range(args.seed_rows)
+        ])
+        latencies = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        deadline = perf_counter() + args.duration
+        randomizer = random.Random(0)
+
+        async def worker():
+            while perf_counter() < deadline:
+                kind = (
+                    'write' if randomizer.random() < args.write_ratio
+                    else 'read'
+                )
+                started = perf_counter()
+                try:
+                    if kind == 'write':
+                        response = await client.post(
+                            '/api/expense', headers=headers,
+                            json={'amount': 10, 'category_id': 1}
+                        )
+                    else:
+                        response = await client.get(
+                            '/api/expense?limit=50', headers=headers
+                        )
+                    ok = response.status_code == 200
+                except Exception:
+                    ok = False
+                if ok:
+                    latencies[kind].append(perf_counter() - started)
+                else:
+                    errors[kind] += 1
+
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.clients)))
+        elapsed = perf_counter() - started
+    await engine.dispose()
+    return {
+        'total_rps': round(
+            sum(map(len, latencies.values())) / elapsed, 1
+        ),
+        **{kind: {**summarize(values, elapsed), 'errors': errors[kind]}
+           for kind, values in latencies.items()},
+    }
+
+
+def main(args) -> dict:
+    report = {}
+    for mode, wal in MODES.items():
+        directory = tempfile.mkdtemp()
+        env = {
+            **os.environ,
+            'DATABASE_URL': (
+                f'sqlite+aiosqlite:///{directory}/sqlite_mixed.db'
+            ),
+            'SQLITE_WAL_MODE': wal,
+        }
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite_mixed', '--child',
+             *sys.argv[1:]],
+            env=env, check=True, capture_output=True, text=True
+        ).stdout
+        report[mode] = json.loads(output.splitlines()[-1])
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--seed-rows', type=int, default=10_000)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(run(args))))
+    else:
+        json.dump(main(args), sys.stdout, indent=2)
+        print()
@@ -0,0 +1,134 @@
+"""Время ответа /api/trends на большом объеме записей.
+
+Заполняет временную базу SQLite расходами одного пользователя за два года
+(по умолчанию 2 млн записей), пересчитывает дневные итоги и запрашивает
+тренд за весь диапазон по дням, неделям и месяцам, с разбивкой по
+категориям и без. Пояс UTC совпадает с поясом хранения, и суммы берутся
+только из дневных итогов; для Europe/Moscow записи читаются за сутки с
+границами интервалов (для дней — все записи). Кэш ответов отключен.
+Результат — JSON с p50 и максимумом в миллисекундах для каждого
+варианта.
+
+Запуск из корня репозитория (нужен httpx):
+
+    python -m benchmarks.trends --rows 2000000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+from datetime import datetime as dt, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'trends.db')
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{DB_PATH}'
+os.environ['CACHE_BACKEND'] = 'none'
+os.environ['LEDGER_TIMEZONE'] = 'UTC'
+
+import httpx  # noqa: E402
+from sqlalchemy import insert, text  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.crud.daily_total import daily_total_crud  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Expense, ExpenseCategory  # noqa: E402
+
+START = dt(2024, 1, 1)
+DAYS = 730
+CATEGORIES = 10
+BATCH_SIZE = 50_000
+
+
+async def seed(rows: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        # Поисковый индекс для замера не нужен и замедляет заполнение
+        await connection.execute(text('DROP TRIGGER expense_fts_ai'))
+    await create_user('bench@example.com', 'bench-password')
+    randomizer = random.Random(0)
+    seconds = DAYS * 24 * 3600
+    async with AsyncSessionLocal() as session:
+        session.add_all(
+            ExpenseCategory(name=f'Категория {number}')
+            for number in range(CATEGORIES)
+        )
+        await session.flush()
+        for offset in range(0, rows, BATCH_SIZE):
+            await session.execute(insert(Expense), [
+                {
+                    'amount': randomizer.randint(100, 100_000) / 100,
+                    'category_id': randomizer.randint(1, CATEGORIES),
+                    'user_id': 1, 'is_paid': True, 'created_at': START,
+                    'date': START + timedelta(
+                        seconds=randomizer.randrange(seconds)
+                    ),
+                }
+                for _ in range(min(BATCH_SIZE, rows - offset))
+            ])
+        await daily_total_crud.rebuild(
+            session, Expense.__tablename__, Expense, commit=False
+        )
+        await session.commit()
+
+
+async def main(args) -> dict:
+    started = perf_counter()
+    await seed(args.rows)
+    report = {'rows': args.rows, 'seed_seconds': round(
+        perf_counter() - started, 1
+    )}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://benchmark',
+        timeout=None
+    ) as client:
+        response = await client.post(
+            '/api/auth/jwt/login',
+            data={'username': 'bench@example.com',
+                  'password': 'bench-password'}
+        )
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        end = START + timedelta(days=DAYS)
+        for tz in ('UTC', 'Europe/Moscow'):
+            for bucket in ('day', 'week', 'month'):
+                for by_category in (False, True):
+                    latencies = []
+                    for _ in range(args.repeat):
+                        request_started = perf_counter()
+                        response = await client.get(
+                            '/api/trends', headers=headers, params={
+                                'bucket': bucket, 'tz': tz,
+                                'by_category': by_category,
+                                'from': START.isoformat(),
+                                'to': end.isoformat(),
+                            }
+                        )
+                        latencies.append(perf_counter() - request_started)
+                        response.raise_for_status()
+                    name = f'{tz}/{bucket}' + (
+                        '/by_category' if by_category else ''
+                    )
+                    report[name] = {
+                        'p50_ms': round(
+                            statistics.median(latencies) * 1000, 1
+                        ),
+                        'max_ms': round(max(latencies) * 1000, 1),
+                    }
+    await engine.dispose()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    report = asyncio.run(main(parser.parse_args()))
+    json.dump(report, sys.stdout, indent=2)
+    print()
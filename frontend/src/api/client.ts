@@ -1,24 +1,117 @@
 import axios from "axios"
+import type { AxiosResponse, InternalAxiosRequestConfig } from "axios"
 
 export const api = axios.create({
   baseURL: "/api",
+  // 304 — данные не изменились, ответ берется из etagCache
+  validateStatus: (status) =>
+    (status >= 200 && status < 300) || status === 304,
 })
 
+// Кэш GET-ответов с ETag: повторный запрос уходит с If-None-Match,
+// и сервер отвечает 304 без тела, если данные не менялись
+type CachedResponse = {
+  etag: string
+  data: unknown
+  headers: AxiosResponse["headers"]
+}
+
+const ETAG_CACHE_SIZE = 100
+const etagCache = new Map<string, CachedResponse>()
+
+const cacheKey = (config: InternalAxiosRequestConfig) => api.getUri(config)
+
+const isGet = (config: InternalAxiosRequestConfig) =>
+  (config.method ?? "get").toLowerCase() === "get"
+
+// Заголовок с курсором следующей страницы списков расходов и доходов
+export const NEXT_CURSOR_HEADER = "x-next-cursor"
+export const PAGE_LIMIT = 500
+
+export type Page<T> = {
+  items: T[]
+  nextCursor: string | null
+}
+
+export const getPage = async <T>(
+  url: string,
+  params: Record<string, string | number | boolean | undefined> = {}
+): Promise<Page<T>> => {
+  const res = await api.get(url, {
+    params: { ...params, limit: params.limit ?? PAGE_LIMIT },
+  })
+  return {
+    items: res.data,
+    nextCursor: res.headers[NEXT_CURSOR_HEADER] ?? null,
+  }
+}
+
+// Проходит все страницы списка по курсору
+export const getAllPages = async <T>(
+  url: string,
+  params: Record<string, string | number | boolean | undefined> = {}
+): Promise<T[]> => {
+  const items: T[] = []
+  let cursor: string | undefined
+  do {
+    const page = await getPage<T>(url, { ...params, cursor })
+    items.push(...page.items)
+    cursor = page.nextCursor ?? undefined
+  } while (cursor)
+  return items
+}
+
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem("token")
   if (token) {
     config.headers.Authorization = `Bearer ${token}`
   }
+  if (isGet(config)) {
+    const cached = etagCache.get(cacheKey(config))
+    if (cached) {
+      config.headers["If-None-Match"] = cached.etag
+    }
+  }
   return config
 })
 
+api.interceptors.response.use((response) => {
+  if (!isGet(response.config)) {
+    return response
+  }
+  const key = cacheKey(response.config)
+  if (response.status === 304) {
+    const cached = etagCache.get(key)
+    if (cached) {
+      return {
+        ...response,
+        status: 200,
+        data: cached.data,
+        headers: { ...cached.headers, ...response.headers },
+      }
+    }
+    return response
+  }
+  const etag = response.headers.etag
+  if (etag) {
+    // Map хранит порядок вставки: первым удаляется самый старый ответ
+    etagCache.delete(key)
+    etagCache.set(key, { etag, data: response.data, headers: response.headers })
+    if (etagCache.size > ETAG_CACHE_SIZE) {
+      etagCache.delete(etagCache.keys().next().value as string)
+    }
+  }
+  return response
+})
+
 // Добавим интерцептор для обработки ошибок
 api.interceptors.response.use(
   (response) => response,
   (error) => {
     if (error.response?.status === 401) {
-      // Неавторизован - очищаем токен и перенаправляем на логин
+      // Неавторизован - очищаем токен и кэш и перенаправляем на логин
       localStorage.removeItem("token")
+      etagCache.clear()
       window.location.href = "/login"
     }
     return Promise.reject(error)
@@ -1,4 +1,4 @@
-import { api } from "./client"
+import { api, getAllPages, getPage } from "./client"
 
 export type Expense = {
   id: number
@@ -8,12 +8,23 @@ export type Expense = {
   created_at?: string
 }
 
-/* GET */
-export const getExpenses = async (): Promise<Expense[]> => {
-  const res = await api.get("/expense")
-  return res.data
+export type ExpenseFilters = {
+  date_from?: string
+  date_to?: string
+  category_id?: number
+  is_paid?: boolean
 }
 
+/* GET */
+export const getExpenses = async (filters: ExpenseFilters = {}): Promise<Expense[]> =>
+  getAllPages<Expense>("/expense", filters)
+
+export const getExpensesPage = async (
+  filters: ExpenseFilters = {},
+  cursor?: string,
+  limit?: number
+) => getPage<Expense>("/expense", { ...filters, cursor, limit })
+
 /* POST */
 export const createExpense = async (data: {
   amount: number
@@ -1,4 +1,4 @@
-import { api } from "./client"
+import { api, getAllPages, getPage } from "./client"
 
 export type Income = {
   id: number
@@ -8,12 +8,22 @@ export type Income = {
   created_at?: string
 }
 
-/* GET */
-export const getIncome = async (): Promise<Income[]> => {
-  const res = await api.get("/income")
-  return res.data
+export type IncomeFilters = {
+  date_from?: string
+  date_to?: string
+  category_id?: number
 }
 
+/* GET */
+export const getIncome = async (filters: IncomeFilters = {}): Promise<Income[]> =>
+  getAllPages<Income>("/income", filters)
+
+export const getIncomePage = async (
+  filters: IncomeFilters = {},
+  cursor?: string,
+  limit?: number
+) => getPage<Income>("/income", { ...filters, cursor, limit })
+
 /* POST */
 export const createIncome = async (data: {
   amount: number
@@ -0,0 +1,64 @@
+import { api } from "./client"
+
+export type CategoryTotal = {
+  category_id: number
+  total: number
+  count: number
+}
+
+export type PeriodSummary = {
+  start: string | null
+  end: string | null
+  total: number
+  count: number
+  categories: CategoryTotal[]
+}
+
+export type LedgerSummary = {
+  day: PeriodSummary
+  week: PeriodSummary
+  month: PeriodSummary
+  all: PeriodSummary
+}
+
+export type Summary = {
+  at: string
+  expense: LedgerSummary
+  income: LedgerSummary
+}
+
+export const EMPTY_PERIOD: PeriodSummary = {
+  start: null,
+  end: null,
+  total: 0,
+  count: 0,
+  categories: [],
+}
+
+export const EMPTY_LEDGER_SUMMARY: LedgerSummary = {
+  day: EMPTY_PERIOD,
+  week: EMPTY_PERIOD,
+  month: EMPTY_PERIOD,
+  all: EMPTY_PERIOD,
+}
+
+// Локальное время клиента без часового пояса: периоды считаются
+// по часам пользователя, как и даты расходов и доходов
+const localNow = () => {
+  const now = new Date()
+  return new Date(now.getTime() - now.getTimezoneOffset() * 60000)
+    .toISOString()
+    .slice(0, 19)
+}
+
+/* GET */
+export const getSummary = async (): Promise<Summary> => {
+  const res = await api.get("/summary", { params: { at: localNow() } })
+  return res.data
+}
+
+// Фильтр списка записей за период из сводки
+export const periodFilters = (period: PeriodSummary) => ({
+  date_from: period.start ?? undefined,
+  date_to: period.end ?? undefined,
+})
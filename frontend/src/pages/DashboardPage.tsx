@@ -19,8 +19,11 @@ import { authStore } from "../store/auth"
 import { useNavigate } from "react-router-dom"
 
 import { useEffect, useState } from "react"
-import { getExpenses } from "@/api/expense"
-import { getIncome } from "@/api/income"
+import { getExpensesPage } from "@/api/expense"
+import { getIncomePage } from "@/api/income"
+import { getSummary } from "@/api/summary"
+
+const RECENT_LIMIT = 5
 
 type Tx = {
   id: number
@@ -52,13 +55,14 @@ export default function DashboardPage() {
     try {
       setLoading(true)
 
-      const [income, expenses] = await Promise.all([
-        getIncome(),
-        getExpenses()
+      const [summary, income, expenses] = await Promise.all([
+        getSummary(),
+        getIncomePage({}, undefined, RECENT_LIMIT),
+        getExpensesPage({}, undefined, RECENT_LIMIT)
       ])
 
-      const incomeSum = income.reduce((acc, i) => acc + i.amount, 0)
-      const expenseSum = expenses.reduce((acc, e) => acc + e.amount, 0)
+      const incomeSum = summary.income.all.total
+      const expenseSum = summary.expense.all.total
 
       setIncomeTotal(incomeSum)
       setExpenseTotal(expenseSum)
@@ -66,8 +70,8 @@ export default function DashboardPage() {
 
       // последние операции (объединяем и сортируем)
       const merged: Tx[] = [
-        ...income.map(i => ({ ...i, type: "income" as const })),
-        ...expenses.map(e => ({ ...e, type: "expense" as const }))
+        ...income.items.map(i => ({ ...i, type: "income" as const })),
+        ...expenses.items.map(e => ({ ...e, type: "expense" as const }))
       ]
 
       merged.sort((a, b) =>
@@ -75,7 +79,7 @@ export default function DashboardPage() {
         new Date(a.created_at || "").getTime()
       )
 
-      setRecent(merged.slice(0, 5))
+      setRecent(merged.slice(0, RECENT_LIMIT))
     } catch (e) {
       console.error("Dashboard load error", e)
     } finally {
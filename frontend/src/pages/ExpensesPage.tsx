@@ -4,6 +4,12 @@ import { getExpenses, createExpense, deleteExpense } from "../api/expense"
 import type { Expense } from "../api/expense"
 import { getExpenseCategories } from "../api/category"
 import type { Category } from "../api/category"
+import {
+  EMPTY_LEDGER_SUMMARY,
+  getSummary,
+  periodFilters,
+} from "../api/summary"
+import type { LedgerSummary } from "../api/summary"
 import { Link } from "react-router-dom"
 import ThemeToggle from "@/components/ThemeToggle"
 
@@ -50,7 +56,9 @@ type PeriodType = 'week' | 'month' | 'all' | null
 
 export default function ExpensesPage() {
   const navigate = useNavigate()
+  // Расходы за сегодня; итоги за периоды приходят из сводки
   const [expenses, setExpenses] = useState<Expense[]>([])
+  const [summary, setSummary] = useState<LedgerSummary>(EMPTY_LEDGER_SUMMARY)
   const [categories, setCategories] = useState<Category[]>([])
   const [amount, setAmount] = useState("")
   const [description, setDescription] = useState("")
@@ -102,26 +110,13 @@ export default function ExpensesPage() {
   }, [isTimerActive, deleteTimer])
 
   const loadExpenses = async () => {
-    const data = await getExpenses()
-    setExpenses(data)
+    const { expense } = await getSummary()
+    setSummary(expense)
+    setExpenses(await getExpenses(periodFilters(expense.day)))
     
     // Если sheet открыт, обновляем данные в нем
     if (isSheetOpen && selectedPeriod) {
-      updatePeriodExpenses(data, selectedPeriod)
-    }
-  }
-
-  const updatePeriodExpenses = (expensesData: Expense[], period: PeriodType) => {
-    switch(period) {
-      case 'week':
-        setPeriodExpenses(expensesData.filter(e => isThisWeek(e.created_at)))
-        break
-      case 'month':
-        setPeriodExpenses(expensesData.filter(e => isThisMonth(e.created_at)))
-        break
-      case 'all':
-        setPeriodExpenses(expensesData)
-        break
+      setPeriodExpenses(await getPeriodExpenses(selectedPeriod, expense))
     }
   }
 
@@ -188,87 +183,35 @@ export default function ExpensesPage() {
     closeDeleteDialog()
   }
 
-  const isToday = (dateStr?: string) => {
-    if (!dateStr) return false
-    const d = new Date(dateStr)
-    const now = new Date()
-    return (
-      d.getDate() === now.getDate() &&
-      d.getMonth() === now.getMonth() &&
-      d.getFullYear() === now.getFullYear()
-    )
-  }
-
-  const isThisWeek = (dateStr?: string) => {
-    if (!dateStr) return false
-    const d = new Date(dateStr)
-    const now = new Date()
-    const weekAgo = new Date(now)
-    weekAgo.setDate(now.getDate() - 7)
-    weekAgo.setHours(0, 0, 0, 0)
-    
-    return d >= weekAgo && d <= now
-  }
-
-  const isThisMonth = (dateStr?: string) => {
-    if (!dateStr) return false
-    const d = new Date(dateStr)
-    const now = new Date()
-    return (
-      d.getMonth() === now.getMonth() &&
-      d.getFullYear() === now.getFullYear()
-    )
-  }
-
-  const getPeriodExpenses = (period: PeriodType): Expense[] => {
-    switch(period) {
-      case 'week':
-        return expenses.filter(e => isThisWeek(e.created_at))
-      case 'month':
-        return expenses.filter(e => isThisMonth(e.created_at))
-      case 'all':
-        return expenses
-      default:
-        return []
-    }
+  const getPeriodExpenses = async (
+    period: PeriodType,
+    ledger: LedgerSummary = summary
+  ): Promise<Expense[]> => {
+    if (!period) return []
+    return getExpenses(periodFilters(ledger[period]))
   }
 
-  const handlePeriodClick = (period: PeriodType) => {
+  const handlePeriodClick = async (period: PeriodType) => {
     if (!period) return
     setSelectedPeriod(period)
-    setPeriodExpenses(getPeriodExpenses(period))
+    setPeriodExpenses(await getPeriodExpenses(period))
     setIsSheetOpen(true)
   }
 
-  const totalAll = expenses.reduce((s, e) => s + Number(e.amount), 0)
-
-  const totalToday = expenses
-    .filter((e) => isToday(e.created_at))
-    .reduce((s, e) => s + Number(e.amount), 0)
-
-  const totalWeek = expenses
-    .filter((e) => isThisWeek(e.created_at))
-    .reduce((s, e) => s + Number(e.amount), 0)
+  const categoryTotal = (period: 'day' | 'week' | 'month' | 'all', id: number) =>
+    summary[period].categories.find((c) => c.category_id === id)?.total ?? 0
 
-  const totalMonth = expenses
-    .filter((e) => isThisMonth(e.created_at))
-    .reduce((s, e) => s + Number(e.amount), 0)
-
-  const todayExpenses = expenses.filter((e) =>
-    isToday(e.created_at)
-  )
+  const totalAll = summary.all.total
+  const totalToday = summary.day.total
+  const totalWeek = summary.week.total
+  const totalMonth = summary.month.total
 
   const groupedTodayExpenses = categories.map((cat) => {
-    const items = todayExpenses.filter(
+    const items = expenses.filter(
       (e) => e.category_id === cat.id
     )
 
-    const total = items.reduce(
-      (sum, e) => sum + Number(e.amount),
-      0
-    )
-
-    return { category: cat, items, total }
+    return { category: cat, items, total: categoryTotal('day', cat.id) }
   })
 
   const getPeriodTitle = (period: PeriodType): string => {
@@ -285,10 +228,7 @@ export default function ExpensesPage() {
       (e) => e.category_id === cat.id
     )
 
-    const total = items.reduce(
-      (sum, e) => sum + Number(e.amount),
-      0
-    )
+    const total = selectedPeriod ? categoryTotal(selectedPeriod, cat.id) : 0
 
     return { category: cat, items, total }
   }).filter(group => group.items.length > 0)
@@ -604,7 +544,7 @@ export default function ExpensesPage() {
                 {getPeriodTitle(selectedPeriod)}
               </SheetTitle>
               <SheetDescription>
-                Всего: ₽{periodExpenses.reduce((sum, e) => sum + Number(e.amount), 0).toFixed(2)}
+                Всего: ₽{(selectedPeriod ? summary[selectedPeriod].total : 0).toFixed(2)}
               </SheetDescription>
             </SheetHeader>
 
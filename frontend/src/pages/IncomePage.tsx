@@ -4,6 +4,12 @@ import { getIncome, createIncome, deleteIncome } from "../api/income"
 import type { Income } from "../api/income"
 import { getIncomeCategories } from "../api/category"
 import type { Category } from "../api/category"
+import {
+  EMPTY_LEDGER_SUMMARY,
+  getSummary,
+  periodFilters,
+} from "../api/summary"
+import type { LedgerSummary } from "../api/summary"
 
 import { Link, useNavigate } from "react-router-dom"
 import ThemeToggle from "@/components/ThemeToggle"
@@ -52,7 +58,9 @@ type PeriodType = "week" | "month" | "all" | null
 export default function IncomePage() {
   const navigate = useNavigate()
 
+  // Доходы за сегодня; итоги за периоды приходят из сводки
   const [income, setIncome] = useState<Income[]>([])
+  const [summary, setSummary] = useState<LedgerSummary>(EMPTY_LEDGER_SUMMARY)
   const [categories, setCategories] = useState<Category[]>([])
 
   const [amount, setAmount] = useState("")
@@ -68,7 +76,6 @@ export default function IncomePage() {
   const [isDeleteButtonEnabled, setIsDeleteButtonEnabled] = useState(false)
 
   const [selectedPeriod, setSelectedPeriod] = useState<PeriodType>(null)
-  const [periodIncome, setPeriodIncome] = useState<Income[]>([])
   const [isSheetOpen, setIsSheetOpen] = useState(false)
 
   const handleLogout = () => {
@@ -101,12 +108,9 @@ export default function IncomePage() {
   }, [isTimerActive, deleteTimer])
 
   const loadIncome = async () => {
-    const data = await getIncome()
-    setIncome(data)
-
-    if (isSheetOpen && selectedPeriod) {
-      setPeriodIncome(getPeriodIncome(selectedPeriod, data))
-    }
+    const { income: ledger } = await getSummary()
+    setSummary(ledger)
+    setIncome(await getIncome(periodFilters(ledger.day)))
   }
 
   const loadCategories = async () => {
@@ -159,77 +163,25 @@ export default function IncomePage() {
     setIsDeleteButtonEnabled(false)
   }
 
-  // ===== DATE HELPERS =====
-
-  const isToday = (date?: string) => {
-    if (!date) return false
-    const d = new Date(date)
-    const now = new Date()
-    return (
-      d.getDate() === now.getDate() &&
-      d.getMonth() === now.getMonth() &&
-      d.getFullYear() === now.getFullYear()
-    )
-  }
-
-  const isWeek = (date?: string) => {
-    if (!date) return false
-    const d = new Date(date)
-    const now = new Date()
-    const weekAgo = new Date(now)
-    weekAgo.setDate(now.getDate() - 7)
-    return d >= weekAgo && d <= now
-  }
-
-  const isMonth = (date?: string) => {
-    if (!date) return false
-    const d = new Date(date)
-    const now = new Date()
-    return (
-      d.getMonth() === now.getMonth() &&
-      d.getFullYear() === now.getFullYear()
-    )
-  }
-
   // ===== PERIOD =====
 
-  const getPeriodIncome = (period: PeriodType, data = income) => {
-    switch (period) {
-      case "week":
-        return data.filter((i) => isWeek(i.created_at))
-      case "month":
-        return data.filter((i) => isMonth(i.created_at))
-      case "all":
-        return data
-      default:
-        return []
-    }
-  }
-
   const handlePeriodClick = (period: PeriodType) => {
     if (!period) return
     setSelectedPeriod(period)
-    setPeriodIncome(getPeriodIncome(period))
     setIsSheetOpen(true)
   }
 
   // ===== TOTALS =====
 
-  const totalAll = income.reduce((s, i) => s + Number(i.amount), 0)
-  const totalToday = income.filter(i => isToday(i.created_at))
-    .reduce((s, i) => s + Number(i.amount), 0)
-
-  const totalWeek = income.filter(i => isWeek(i.created_at))
-    .reduce((s, i) => s + Number(i.amount), 0)
-
-  const totalMonth = income.filter(i => isMonth(i.created_at))
-    .reduce((s, i) => s + Number(i.amount), 0)
-
-  const todayIncome = income.filter(i => isToday(i.created_at))
+  const totalAll = summary.all.total
+  const totalToday = summary.day.total
+  const totalWeek = summary.week.total
+  const totalMonth = summary.month.total
 
   const groupedTodayIncome = categories.map(cat => {
-    const items = todayIncome.filter(i => i.category_id === cat.id)
-    const total = items.reduce((s, i) => s + Number(i.amount), 0)
+    const items = income.filter(i => i.category_id === cat.id)
+    const total = summary.day.categories
+      .find(c => c.category_id === cat.id)?.total ?? 0
     return { category: cat, items, total }
   })
 
@@ -466,7 +418,7 @@ export default function IncomePage() {
             <SheetHeader>
               <SheetTitle>Доходы</SheetTitle>
               <SheetDescription>
-                ₽{periodIncome.reduce((s, i) => s + Number(i.amount), 0).toFixed(2)}
+                ₽{(selectedPeriod ? summary[selectedPeriod].total : 0).toFixed(2)}
               </SheetDescription>
             </SheetHeader>
           </SheetContent>
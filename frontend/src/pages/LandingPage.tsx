@@ -23,11 +23,8 @@ import ThemeToggle from "@/components/ThemeToggle"
 import { authStore } from "../store/auth"
 import { useEffect, useState } from "react"
 
-import { getExpenses } from "../api/expense"
-import type { Expense } from "../api/expense"
 
-import { getIncome } from "../api/income"
-import type { Income } from "../api/income"
+import { getSummary } from "../api/summary"
 
 interface Stats {
   income: number
@@ -47,9 +44,6 @@ export default function LandingPage() {
   const [isAuthenticated, setIsAuthenticated] = useState(false)
   const [isSuperuser, setIsSuperuser] = useState(false) // ✅ ДОБАВИЛ
 
-  const [, setExpenses] = useState<Expense[]>([])
-const [, setIncomes] = useState<Income[]>([])
-
   const [stats, setStats] = useState<Stats>({
     income: 0,
     expenses: 0,
@@ -84,15 +78,18 @@ const [, setIncomes] = useState<Income[]>([])
 
   const loadData = async () => {
     try {
-      const [expensesData, incomeData] = await Promise.all([
-        getExpenses(),
-        getIncome(),
-      ])
-
-      setExpenses(expensesData)
-      setIncomes(incomeData)
-
-      calculateStats(expensesData, incomeData)
+      const { expense, income } = await getSummary()
+
+      setStats({
+        income: income.all.total,
+        expenses: expense.all.total,
+        incomeToday: income.day.total,
+        expensesToday: expense.day.total,
+        incomeWeek: income.week.total,
+        expensesWeek: expense.week.total,
+        incomeMonth: income.month.total,
+        expensesMonth: expense.month.total,
+      })
     } catch (error) {
       console.error("Error loading finance data:", error)
     }
@@ -109,103 +106,6 @@ const [, setIncomes] = useState<Income[]>([])
       incomeMonth: 0,
       expensesMonth: 0,
     })
-    setExpenses([])
-    setIncomes([])
-  }
-
-  const calculateStats = (
-    expensesData: Expense[],
-    incomeData: Income[]
-  ) => {
-    const now = new Date()
-
-    const today = new Date()
-    today.setHours(0, 0, 0, 0)
-
-    const weekAgo = new Date()
-    weekAgo.setDate(now.getDate() - 7)
-    weekAgo.setHours(0, 0, 0, 0)
-
-    const todayExpenses = expensesData.filter(e => {
-      const date = new Date(e.created_at!)
-      return date >= today
-    })
-
-    const weekExpenses = expensesData.filter(e => {
-      const date = new Date(e.created_at!)
-      return date >= weekAgo
-    })
-
-    const monthExpenses = expensesData.filter(e => {
-      const date = new Date(e.created_at!)
-      return (
-        date.getMonth() === now.getMonth() &&
-        date.getFullYear() === now.getFullYear()
-      )
-    })
-
-    const totalExpenses = expensesData.reduce(
-      (sum, e) => sum + Number(e.amount),
-      0
-    )
-    const totalExpensesToday = todayExpenses.reduce(
-      (sum, e) => sum + Number(e.amount),
-      0
-    )
-    const totalExpensesWeek = weekExpenses.reduce(
-      (sum, e) => sum + Number(e.amount),
-      0
-    )
-    const totalExpensesMonth = monthExpenses.reduce(
-      (sum, e) => sum + Number(e.amount),
-      0
-    )
-
-    const todayIncome = incomeData.filter(i => {
-      const date = new Date(i.created_at!)
-      return date >= today
-    })
-
-    const weekIncome = incomeData.filter(i => {
-      const date = new Date(i.created_at!)
-      return date >= weekAgo
-    })
-
-    const monthIncome = incomeData.filter(i => {
-      const date = new Date(i.created_at!)
-      return (
-        date.getMonth() === now.getMonth() &&
-        date.getFullYear() === now.getFullYear()
-      )
-    })
-
-    const totalIncome = incomeData.reduce(
-      (sum, i) => sum + Number(i.amount),
-      0
-    )
-    const totalIncomeToday = todayIncome.reduce(
-      (sum, i) => sum + Number(i.amount),
-      0
-    )
-    const totalIncomeWeek = weekIncome.reduce(
-      (sum, i) => sum + Number(i.amount),
-      0
-    )
-    const totalIncomeMonth = monthIncome.reduce(
-      (sum, i) => sum + Number(i.amount),
-      0
-    )
-
-    setStats({
-      income: totalIncome,
-      expenses: totalExpenses,
-      incomeToday: totalIncomeToday,
-      expensesToday: totalExpensesToday,
-      incomeWeek: totalIncomeWeek,
-      expensesWeek: totalExpensesWeek,
-      incomeMonth: totalIncomeMonth,
-      expensesMonth: totalExpensesMonth,
-    })
   }
 
   const handleLogout = () => {
@@ -0,0 +1,69 @@
+"""Общие фикстуры: приложение на временной базе SQLite и клиент httpx.
+
+Переменные окружения задаются до импорта app, потому что настройки и
+движки создаются при импорте. Каждый тест получает пустую базу,
+суперпользователя с токеном и по две категории расходов и доходов.
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'tests.db')
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{DB_PATH}'
+os.environ['RECURRING_SCHEDULER_ENABLED'] = 'false'
+os.environ['CACHE_BACKEND'] = 'none'
+# Дешевый argon2: тесты входят в систему на каждом тесте
+os.environ['PASSWORD_ARGON2_TIME_COST'] = '1'
+os.environ['PASSWORD_ARGON2_MEMORY_COST'] = '1024'
+os.environ['PASSWORD_ARGON2_PARALLELISM'] = '1'
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.category_registry import load_category_registries  # noqa
+from app.core.db import AsyncSessionLocal, get_engines  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.core.user import user_cache  # noqa: E402
+from app.main import app  # noqa: E402
+
+EMAIL, PASSWORD = 'test@example.com', 'test-password'
+CATEGORY_NAMES = {
+    'expense': ('Продукты', 'Транспорт'),
+    'income': ('Зарплата', 'Подработка'),
+}
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+async def client():
+    engines = get_engines()
+    async with engines['primary'].begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    user_cache.entries.clear()
+    async with AsyncSessionLocal() as session:
+        await load_category_registries(session)
+    await create_user(EMAIL, PASSWORD, is_superuser=True)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        response = await client.post(
+            '/api/auth/jwt/login',
+            data={'username': EMAIL, 'password': PASSWORD}
+        )
+        client.headers['Authorization'] = (
+            f'Bearer {response.json()["access_token"]}'
+        )
+        for kind, names in CATEGORY_NAMES.items():
+            for name in names:
+                response = await client.post(
+                    f'/api/category/{kind}', json={'name': name}
+                )
+                assert response.status_code == 200, response.text
+        yield client
+    for engine in engines.values():
+        await engine.dispose()
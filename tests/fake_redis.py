@@ -0,0 +1,145 @@
+"""Сервер RESP в процессе теста для проверки RedisCacheBackend.
+
+Поддерживает только команды, которые отправляет кэш: AUTH, SELECT, GET,
+SET ... PX, SADD, PEXPIRE, SMEMBERS и DEL. Запросы разбираются и ответы
+кодируются здесь же, независимо от кода app.core.cache.
+"""
+import asyncio
+from time import monotonic
+from typing import Optional
+
+
+class FakeRedis:
+
+    def __init__(
+            self, password: Optional[str] = None,
+            username: str = 'default'
+    ):
+        self.username = username
+        self.password = password
+        self.values: dict[bytes, bytes] = {}
+        self.sets: dict[bytes, set[bytes]] = {}
+        self.expires: dict[bytes, float] = {}
+        self.commands: list[list[bytes]] = []
+        self.connections = 0
+        self.writers: set[asyncio.StreamWriter] = set()
+        self.server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f'redis://{host}:{port}/0'
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(
+            self.handle, '127.0.0.1', 0
+        )
+
+    async def stop(self) -> None:
+        self.drop_connections()
+        self.server.close()
+        await self.server.wait_closed()
+
+    def drop_connections(self) -> None:
+        """Закрывает соединения клиентов, как при перезапуске сервера."""
+        for writer in self.writers:
+            writer.close()
+        self.writers.clear()
+
+    async def handle(
+            self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self.writers.add(writer)
+        authenticated = self.password is None
+        try:
+            while True:
+                command = await read_command(reader)
+                self.commands.append(command)
+                name = command[0].upper()
+                if name == b'AUTH':
+                    authenticated = self.check_auth(command[1:])
+                    reply = b'+OK\r\n' if authenticated else (
+                        b'-WRONGPASS invalid username-password pair\r\n'
+                    )
+                elif not authenticated:
+                    reply = b'-NOAUTH Authentication required.\r\n'
+                else:
+                    reply = self.execute(name, command[1:])
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    def check_auth(self, args: list[bytes]) -> bool:
+        if len(args) == 1:
+            args = [b'default', *args]
+        return args == [self.username.encode(), self.password.encode()]
+
+    def expire(self, key: bytes) -> None:
+        if self.expires.get(key, float('inf')) <= monotonic():
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+            del self.expires[key]
+
+    def execute(self, name: bytes, args: list[bytes]) -> bytes:
+        for key in args:
+            self.expire(key)
+        if name == b'SELECT':
+            return b'+OK\r\n'
+        if name == b'GET':
+            return encode(self.values.get(args[0]))
+        if name == b'SET':
+            key, value, *options = args
+            self.values[key] = value
+            self.expires.pop(key, None)
+            if options and options[0].upper() == b'PX':
+                self.expires[key] = monotonic() + int(options[1]) / 1000
+            return b'+OK\r\n'
+        if name == b'SADD':
+            members = self.sets.setdefault(args[0], set())
+            added = len(set(args[1:]) - members)
+            members.update(args[1:])
+            return b':%d\r\n' % added
+        if name == b'PEXPIRE':
+            if args[0] not in self.values and args[0] not in self.sets:
+                return b':0\r\n'
+            self.expires[args[0]] = monotonic() + int(args[1]) / 1000
+            return b':1\r\n'
+        if name == b'SMEMBERS':
+            return encode(sorted(self.sets.get(args[0], ())))
+        if name == b'DEL':
+            deleted = 0
+            for key in args:
+                found = key in self.values or key in self.sets
+                self.values.pop(key, None)
+                self.sets.pop(key, None)
+                self.expires.pop(key, None)
+                deleted += found
+            return b':%d\r\n' % deleted
+        return b"-ERR unknown command '%s'\r\n" % name
+
+
+async def read_command(reader: asyncio.StreamReader) -> list[bytes]:
+    """Читает команду — массив bulk-строк RESP."""
+    header = await reader.readuntil(b'\r\n')
+    assert header.startswith(b'*'), header
+    command = []
+    for _ in range(int(header[1:-2])):
+        length = await reader.readuntil(b'\r\n')
+        assert length.startswith(b'$'), length
+        command.append(
+            (await reader.readexactly(int(length[1:-2]) + 2))[:-2]
+        )
+    return command
+
+
+def encode(value) -> bytes:
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(map(encode, value))
+    return b'$%d\r\n%s\r\n' % (len(value), value)
@@ -0,0 +1,82 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+EXPENSE = {
+    'amount': 10, 'category_id': 1, 'date': '2026-01-01T10:00:00',
+    'description': 'Обед', 'is_paid': False,
+}
+INCOME = {
+    'amount': 100, 'category_id': 1, 'date': '2026-01-01T10:00:00',
+    'description': 'Зарплата',
+}
+
+
+async def create(client, kind: str, body: dict) -> int:
+    response = await client.post(f'/api/{kind}', json=body)
+    assert response.status_code == 200, response.text
+    return response.json()['id']
+
+
+async def test_bulk_update_expense(client):
+    expense_id = await create(client, 'expense', EXPENSE)
+    response = await client.patch('/api/expense/bulk', json={
+        'filter': {'ids': [expense_id]},
+        'patch': {'amount': 25, 'category_id': 2, 'is_paid': True},
+    })
+    assert response.status_code == 200, response.text
+    assert response.json() == {'ids': [expense_id]}
+    expense = (await client.get('/api/expense')).json()[0]
+    assert (expense['amount'], expense['category_id'], expense['is_paid']) \
+        == (25, 2, True)
+
+
+@pytest.mark.parametrize('field', ['amount', 'category_id', 'date', 'is_paid'])
+async def test_bulk_update_expense_rejects_null(client, field):
+    expense_id = await create(client, 'expense', EXPENSE)
+    response = await client.patch('/api/expense/bulk', json={
+        'filter': {'ids': [expense_id]}, 'patch': {field: None},
+    })
+    assert response.status_code == 422, response.text
+    assert response.json()['detail'][0]['loc'][-1] == field
+
+
+async def test_bulk_update_expense_clears_description(client):
+    expense_id = await create(client, 'expense', EXPENSE)
+    response = await client.patch('/api/expense/bulk', json={
+        'filter': {'ids': [expense_id]}, 'patch': {'description': None},
+    })
+    assert response.status_code == 200, response.text
+    assert (await client.get('/api/expense')).json()[0]['description'] \
+        is None
+
+
+@pytest.mark.parametrize('field', ['amount', 'category_id', 'date'])
+async def test_bulk_update_income_rejects_null(client, field):
+    income_id = await create(client, 'income', INCOME)
+    response = await client.patch('/api/income/bulk', json={
+        'filter': {'ids': [income_id]}, 'patch': {field: None},
+    })
+    assert response.status_code == 422, response.text
+    assert response.json()['detail'][0]['loc'][-1] == field
+
+
+async def test_bulk_update_income_clears_description(client):
+    income_id = await create(client, 'income', INCOME)
+    response = await client.patch('/api/income/bulk', json={
+        'filter': {'ids': [income_id]}, 'patch': {'description': None},
+    })
+    assert response.status_code == 200, response.text
+    assert (await client.get('/api/income')).json()[0]['description'] \
+        is None
+
+
+async def test_bulk_delete_expense(client):
+    first = await create(client, 'expense', EXPENSE)
+    await create(client, 'expense', {**EXPENSE, 'category_id': 2})
+    response = await client.request(
+        'DELETE', '/api/expense/bulk', json={'category_id': 1}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == {'ids': [first]}
+    assert len((await client.get('/api/expense')).json()) == 1
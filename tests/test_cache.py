@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import RedisCacheBackend
+from tests.fake_redis import FakeRedis
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def redis():
+    server = FakeRedis()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def backend(redis):
+    backend = RedisCacheBackend(redis.url)
+    yield backend
+    await backend.close()
+
+
+async def test_get_set(backend):
+    assert await backend.get('missing') is None
+    await backend.set('key', b'\x00value\r\n', 60, 'user:1')
+    assert await backend.get('key') == b'\x00value\r\n'
+
+
+async def test_set_is_pipelined(redis, backend):
+    await backend.set('key', b'value', 60, 'user:1')
+    assert [command[0] for command in redis.commands] == [
+        b'SET', b'SADD', b'PEXPIRE'
+    ]
+    assert redis.commands[0] == [
+        b'SET', b'cache:key', b'value', b'PX', b'60000'
+    ]
+
+
+async def test_ttl(backend):
+    await backend.set('key', b'value', 0.05, 'user:1')
+    await asyncio.sleep(0.1)
+    assert await backend.get('key') is None
+
+
+async def test_invalidate_removes_only_tag_keys(backend):
+    await backend.set('first', b'1', 60, 'user:1')
+    await backend.set('second', b'2', 60, 'user:1')
+    await backend.set('other', b'3', 60, 'user:2')
+    await backend.invalidate('user:1')
+    assert await backend.get('first') is None
+    assert await backend.get('second') is None
+    assert await backend.get('other') == b'3'
+    await backend.invalidate('user:3')
+
+
+async def test_dropped_connection_is_a_miss_and_reconnects(redis, backend):
+    await backend.set('key', b'value', 60, 'user:1')
+    redis.drop_connections()
+    # Разрыв обнаруживается на первой команде: промах без исключения
+    assert await backend.get('key') is None
+    assert backend.writer is None
+    assert await backend.get('key') == b'value'
+    assert redis.connections == 2
+
+
+async def test_server_down_is_a_miss(redis, backend):
+    await redis.stop()
+    assert await backend.get('key') is None
+    await backend.set('key', b'value', 60, 'user:1')
+    await backend.invalidate('user:1')
+
+
+async def test_acl_user_auth():
+    redis = FakeRedis(username='cache', password='p@ss')
+    await redis.start()
+    host_port = redis.url.split('//')[1]
+    backend = RedisCacheBackend(f'redis://cache:p%40ss@{host_port}')
+    try:
+        await backend.set('key', b'value', 60, 'user:1')
+        assert await backend.get('key') == b'value'
+        assert redis.commands[0] == [b'AUTH', b'cache', b'p@ss']
+    finally:
+        await backend.close()
+        await redis.stop()
+
+
+async def test_default_user_auth():
+    redis = FakeRedis(password='secret')
+    await redis.start()
+    host_port = redis.url.split('//')[1]
+    backend = RedisCacheBackend(f'redis://:secret@{host_port}')
+    wrong = RedisCacheBackend(f'redis://:wrong@{host_port}')
+    try:
+        await backend.set('key', b'value', 60, 'user:1')
+        assert await backend.get('key') == b'value'
+        assert redis.commands[0] == [b'AUTH', b'secret']
+        assert await wrong.get('key') is None
+    finally:
+        await backend.close()
+        await wrong.close()
+        await redis.stop()
@@ -0,0 +1,120 @@
+"""Кэш категорий при изменениях категорий через другой воркер.
+
+Другой воркер имитируется изменением БД в отдельной сессии без
+обращения к кэшу текущего процесса; кэш при этом считается только что
+сверенным, поэтому плановая сверка версии не наступает.
+"""
+from time import monotonic
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.category_registry import expense_category_registry
+from app.core.db import AsyncSessionLocal
+from app.crud.cache_version import cache_version_crud
+from app.crud.category import expense_category_crud
+from app.models import DailyTotal, Expense
+from app.schemas.category import CategoryCreate
+
+pytestmark = pytest.mark.anyio
+
+EXPENSE = {
+    'amount': 10, 'date': '2026-01-01T10:00:00', 'description': 'Обед',
+    'is_paid': False,
+}
+
+
+async def count(model) -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+async def create_elsewhere(name: str) -> int:
+    async with AsyncSessionLocal() as session:
+        category = await expense_category_crud.create(
+            CategoryCreate(name=name), session
+        )
+    expense_category_registry.checked_at = monotonic()
+    return category.id
+
+
+async def delete_elsewhere(category_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await expense_category_crud.remove(category_id, session)
+    expense_category_registry.checked_at = monotonic()
+
+
+async def test_new_category_is_accepted_before_scheduled_check(client):
+    category_id = await create_elsewhere('Кафе')
+    response = await client.post(
+        '/api/expense', json={**EXPENSE, 'category_id': category_id}
+    )
+    assert response.status_code == 200, response.text
+    response = await client.post(
+        '/api/expense/bulk', json=[{**EXPENSE, 'category_id': category_id}]
+    )
+    assert response.json() == {'created': 1, 'errors': []}
+
+
+async def test_deleted_category_is_rejected_on_create(client):
+    await delete_elsewhere(2)
+    assert 2 in await expense_category_registry.get_ids(None)
+    response = await client.post(
+        '/api/expense', json={**EXPENSE, 'category_id': 2}
+    )
+    assert response.status_code == 404, response.text
+    assert await count(Expense) == 0
+    assert await count(DailyTotal) == 0
+    assert 2 not in expense_category_registry.categories
+
+
+async def test_deleted_category_is_rejected_on_update(client):
+    response = await client.post(
+        '/api/expense', json={**EXPENSE, 'category_id': 1}
+    )
+    expense_id = response.json()['id']
+    await delete_elsewhere(2)
+    response = await client.patch(
+        '/api/expense/bulk',
+        json={'filter': {'ids': [expense_id]}, 'patch': {'category_id': 2}}
+    )
+    assert response.status_code == 404, response.text
+    response = await client.patch(
+        f'/api/expense/{expense_id}',
+        json={**EXPENSE, 'category_id': 2}
+    )
+    assert response.status_code == 404, response.text
+    expense = (await client.get('/api/expense')).json()[0]
+    assert expense['category_id'] == 1
+
+
+async def test_deleted_category_is_reported_in_bulk_import(client):
+    await delete_elsewhere(2)
+    response = await client.post('/api/expense/bulk', json=[
+        {**EXPENSE, 'category_id': 2},
+        {**EXPENSE, 'category_id': 1},
+        {**EXPENSE, 'amount': -1, 'category_id': 1},
+    ])
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result['created'] == 1
+    assert [error['row'] for error in result['errors']] == [1, 3]
+    assert await count(Expense) == 1
+
+
+async def test_category_change_bumps_version_in_same_transaction(client):
+    async with AsyncSessionLocal() as session:
+        version = await cache_version_crud.get_version(
+            expense_category_registry.name, session
+        )
+        await expense_category_crud.create(
+            CategoryCreate(name='Кафе'), session, commit=False
+        )
+        await session.rollback()
+        assert await cache_version_crud.get_version(
+            expense_category_registry.name, session
+        ) == version
+        await expense_category_crud.remove(1, session)
+        assert await cache_version_crud.get_version(
+            expense_category_registry.name, session
+        ) == version + 1
@@ -0,0 +1,124 @@
+"""Дневные итоги после изменений записей совпадают с пересчетом
+SUM ... GROUP BY по самим записям."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.db import AsyncSessionLocal
+from app.models import DailyTotal, Expense, Income
+
+pytestmark = pytest.mark.anyio
+
+
+def row(amount, category_id: int, day: int, **extra) -> dict:
+    return {
+        'amount': amount, 'category_id': category_id,
+        'date': f'2026-01-{day:02d}T10:30:00', 'description': None, **extra,
+    }
+
+
+async def rollup() -> set:
+    async with AsyncSessionLocal() as session:
+        rows = await session.execute(select(
+            DailyTotal.user_id, DailyTotal.kind, DailyTotal.category_id,
+            DailyTotal.day, DailyTotal.amount_sum, DailyTotal.count
+        ))
+        return {
+            (user_id, kind, category_id, str(day), Decimal(amount), count)
+            for user_id, kind, category_id, day, amount, count in rows
+        }
+
+
+async def recomputed() -> set:
+    totals = set()
+    async with AsyncSessionLocal() as session:
+        for model in (Expense, Income):
+            day = func.date(model.date)
+            rows = await session.execute(
+                select(
+                    model.user_id, model.category_id, day,
+                    func.sum(model.amount), func.count()
+                ).group_by(model.user_id, model.category_id, day)
+            )
+            totals |= {
+                (user_id, model.__tablename__, category_id, str(day),
+                 Decimal(str(amount)).quantize(Decimal('0.01')), count)
+                for user_id, category_id, day, amount, count in rows
+            }
+    return totals
+
+
+async def check(client) -> None:
+    assert await rollup() == await recomputed()
+
+
+async def test_rollup_matches_ledger_after_changes(client):
+    ids = []
+    for amount, category_id, day in (
+            (10.1, 1, 1), (0.2, 1, 1), (5, 2, 1), (7.35, 1, 2), (3, 2, 3)):
+        response = await client.post('/api/expense', json=row(
+            amount, category_id, day, is_paid=True
+        ))
+        assert response.status_code == 200, response.text
+        ids.append(response.json()['id'])
+    await check(client)
+
+    # Сумма, дата (перенос между днями) и категория по отдельности и вместе
+    for patch in (
+            row(11.5, 1, 1, is_paid=True),
+            row(11.5, 1, 4, is_paid=True),
+            row(11.5, 2, 4, is_paid=True),
+            row(2.25, 1, 2, is_paid=False),
+    ):
+        response = await client.patch(f'/api/expense/{ids[0]}', json=patch)
+        assert response.status_code == 200, response.text
+        await check(client)
+    response = await client.patch(f'/api/expense/{ids[1]}', json={
+        **row(0.2, 1, 1, is_paid=True), 'description': 'без изменения итога'
+    })
+    assert response.status_code == 200, response.text
+    await check(client)
+
+    assert (await client.delete(f'/api/expense/{ids[2]}')).status_code == 200
+    await check(client)
+
+    response = await client.post('/api/expense/bulk', json=[
+        row(1.1, 1, day, is_paid=True) for day in (1, 2, 2, 5)
+    ])
+    assert response.json()['created'] == 4
+    await check(client)
+    for patch in ({'date': '2026-01-06T12:00:00'}, {'category_id': 2},
+                  {'amount': 4.4}, {'is_paid': False}):
+        response = await client.patch('/api/expense/bulk', json={
+            'filter': {'date_from': '2026-01-02T00:00:00'}, 'patch': patch
+        })
+        assert response.status_code == 200, response.text
+        await check(client)
+    response = await client.request(
+        'DELETE', '/api/expense/bulk', json={'category_id': 2}
+    )
+    assert response.status_code == 200, response.text
+    await check(client)
+
+
+async def test_income_rollup_and_category_removal(client):
+    for amount, category_id, day in ((100, 1, 1), (50.5, 2, 1), (20, 1, 2)):
+        response = await client.post(
+            '/api/income', json=row(amount, category_id, day)
+        )
+        assert response.status_code == 200, response.text
+    await client.post('/api/expense', json=row(9.99, 1, 1, is_paid=True))
+    response = await client.patch(
+        '/api/income/1', json=row(80, 2, 2)
+    )
+    assert response.status_code == 200, response.text
+    await check(client)
+    response = await client.patch('/api/income/bulk', json={
+        'filter': {'category_id': 2}, 'patch': {'date': '2026-01-03T09:00:00'}
+    })
+    assert response.status_code == 200, response.text
+    await check(client)
+    assert (await client.delete('/api/category/income/2')).status_code == 200
+    await check(client)
+    assert await rollup()
@@ -0,0 +1,46 @@
+import re
+
+import pytest
+
+from app.core.metrics import request_metrics
+
+pytestmark = pytest.mark.anyio
+
+EXPENSE = {
+    'amount': 10, 'category_id': 1, 'date': '2026-01-01T10:00:00',
+    'description': 'Обед', 'is_paid': False,
+}
+ROUTE = 'method="PATCH",route="/api/expense/{expense_id}"'
+
+
+def metric(text: str, name: str, labels: str = '') -> float:
+    series = f'{name}{{{labels}}}' if labels else name
+    match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.M)
+    assert match is not None, f'{series} нет в метриках'
+    return float(match.group(1))
+
+
+async def test_metrics_use_route_templates_and_count_statements(client):
+    request_metrics.__init__()
+    expense_id = (await client.post('/api/expense', json=EXPENSE)).json()['id']
+    response = await client.patch(
+        f'/api/expense/{expense_id}', json={**EXPENSE, 'amount': 20}
+    )
+    assert response.status_code == 200, response.text
+    await client.get('/api/no-such-route')
+    response = await client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    text = response.text
+    assert metric(
+        text, 'http_requests_total', f'{ROUTE},status="200"'
+    ) == 1
+    assert metric(text, 'http_request_db_statements_count', ROUTE) == 1
+    assert metric(text, 'http_request_db_statements_sum', ROUTE) > 0
+    assert metric(text, 'http_request_duration_seconds_count', ROUTE) == 1
+    assert f'route="/api/expense/{expense_id}"' not in text
+    assert metric(
+        text, 'http_requests_total',
+        'method="GET",route="<unmatched>",status="404"'
+    ) == 1
+    assert metric(text, 'db_statements_total') > 0
@@ -0,0 +1,37 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+EXPENSE = {
+    'amount': 10, 'category_id': 1, 'date': '2026-01-01T10:00:00',
+    'description': 'Обед', 'is_paid': False,
+}
+
+
+async def login_other_user(client) -> dict:
+    credentials = {'email': 'other@example.com', 'password': 'other-password'}
+    response = await client.post('/api/auth/register', json=credentials)
+    assert response.status_code == 201, response.text
+    response = await client.post('/api/auth/jwt/login', data={
+        'username': credentials['email'],
+        'password': credentials['password'],
+    })
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+async def test_foreign_and_missing_expense(client):
+    expense_id = (await client.post('/api/expense', json=EXPENSE)).json()['id']
+    headers = await login_other_user(client)
+    response = await client.patch(
+        f'/api/expense/{expense_id}', json=EXPENSE, headers=headers
+    )
+    assert response.status_code == 403, response.text
+    response = await client.delete(
+        f'/api/expense/{expense_id}', headers=headers
+    )
+    assert response.status_code == 403, response.text
+    response = await client.delete('/api/expense/999')
+    assert response.status_code == 404
+    assert response.json()['detail'] == (
+        'Расход с идентификатором 999 не найден!'
+    )
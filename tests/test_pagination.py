@@ -0,0 +1,89 @@
+import base64
+from datetime import datetime as dt
+
+import pytest
+
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+EXPENSE = {
+    'amount': 10, 'category_id': 1, 'description': None, 'is_paid': False,
+}
+# По три записи на каждую дату: на границах страниц ключ date совпадает
+DATES = [f'2026-01-0{day}T10:00:00' for day in (1, 2, 3, 4)]
+
+
+async def seed(client) -> list[int]:
+    ids = []
+    for date in DATES:
+        for _ in range(3):
+            response = await client.post(
+                '/api/expense', json={**EXPENSE, 'date': date}
+            )
+            ids.append(response.json()['id'])
+    return ids
+
+
+async def walk(client, limit: int, **params) -> list[int]:
+    seen, cursor, pages = [], None, 0
+    while True:
+        query = {'limit': limit, **params}
+        if cursor is not None:
+            query['cursor'] = cursor
+        response = await client.get('/api/expense', params=query)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page) <= limit
+        seen += [expense['id'] for expense in page]
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return seen
+        assert pages <= len(DATES) * 3
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4, 5, 12, 100])
+async def test_pages_have_no_duplicates_or_gaps(client, limit):
+    ids = await seed(client)
+    # От новых к старым по (date, id): id растут вместе с датой
+    assert await walk(client, limit) == ids[::-1]
+
+
+async def test_pages_with_sparse_fields_and_filter(client):
+    ids = await seed(client)
+    assert await walk(
+        client, 2, fields='id', date_from='2026-01-02T00:00:00'
+    ) == ids[:2:-1]
+
+
+def encode(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    '%%%',
+    'é',
+    encode('2026-01-01T10:00:00'),
+    encode('2026-01-01T10:00:00|abc'),
+    encode('yesterday|1'),
+    encode('2026-01-01T10:00:00|1|2'),
+    encode('2026-01-01T10:00:00+03:00|1'),
+    encode('2026-01-01T10:00:00|99999999999999999999999'),
+    encode('2026-01-01T10:00:00|-1'),
+    base64.urlsafe_b64encode(b'\xff\xfe|1').decode(),
+])
+async def test_malformed_cursor_is_rejected(client, cursor):
+    await seed(client)
+    response = await client.get('/api/expense', params={'cursor': cursor})
+    assert response.status_code == 400, response.text
+
+
+async def test_cursor_continues_after_position(client):
+    await seed(client)
+    response = await client.get('/api/expense', params={
+        'cursor': encode_cursor(dt(2026, 1, 2, 10), 5)
+    })
+    assert response.status_code == 200
+    assert [expense['id'] for expense in response.json()] == [4, 3, 2, 1]
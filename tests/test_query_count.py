@@ -0,0 +1,85 @@
+"""Бюджет SQL-выражений на изменяющие запросы к расходам и доходам.
+
+Считаются выражения, отправленные в БД за время запроса на всех движках
+(событие before_cursor_execute). Помимо самой записи в транзакцию входят
+обновление дневных итогов, сумм бюджетов и версии данных пользователя;
+ответ на запись расхода дополнительно читает состояние бюджетов
+категории. Первый запрос прогревает кэши пользователя и категорий.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core.db import get_engines
+
+pytestmark = pytest.mark.anyio
+
+EXPENSE = {
+    'amount': 10, 'category_id': 1, 'date': '2026-01-01T10:00:00',
+    'description': None, 'is_paid': False,
+}
+INCOME = {
+    'amount': 100, 'category_id': 1, 'date': '2026-01-01T10:00:00',
+    'description': None,
+}
+# (метод, путь, тело, ожидаемый код, не больше стольких выражений)
+EXPENSE_REQUESTS = {
+    'create': ('POST', '/api/expense', EXPENSE, 200, 6),
+    'update_description': ('PATCH', '/api/expense/1', {
+        **EXPENSE, 'description': 'Обед'
+    }, 200, 4),
+    'update_amount_and_category': ('PATCH', '/api/expense/1', {
+        **EXPENSE, 'amount': 25, 'category_id': 2
+    }, 200, 8),
+    'delete': ('DELETE', '/api/expense/1', None, 200, 7),
+    'delete_missing': ('DELETE', '/api/expense/1', None, 404, 2),
+}
+INCOME_REQUESTS = {
+    'create': ('POST', '/api/income', INCOME, 200, 4),
+    'update_description': ('PATCH', '/api/income/1', {
+        **INCOME, 'description': 'Аванс'
+    }, 200, 3),
+    'update_amount_and_category': ('PATCH', '/api/income/1', {
+        **INCOME, 'amount': 250, 'category_id': 2
+    }, 200, 6),
+    'delete': ('DELETE', '/api/income/1', None, 200, 5),
+    'delete_missing': ('DELETE', '/api/income/1', None, 404, 2),
+}
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def count(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    engines = {engine.sync_engine for engine in get_engines().values()}
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', count)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', count)
+
+
+async def check_budgets(client, warm_up: tuple, requests: dict) -> None:
+    method, url, body, *_ = warm_up
+    assert (await client.request(method, url, json=body)).status_code == 200
+    for name, (method, url, body, status, budget) in requests.items():
+        with count_statements() as statements:
+            response = await client.request(method, url, json=body)
+        assert response.status_code == status, (name, response.text)
+        assert len(statements) <= budget, (name, statements)
+
+
+async def test_expense_statement_budget(client):
+    await check_budgets(
+        client, EXPENSE_REQUESTS['create'], EXPENSE_REQUESTS
+    )
+
+
+async def test_income_statement_budget(client):
+    await check_budgets(client, INCOME_REQUESTS['create'], INCOME_REQUESTS)
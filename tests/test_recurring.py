@@ -0,0 +1,134 @@
+"""Повторения заносятся ровно один раз: при повторном запуске
+планировщика, при параллельных воркерах и после перехвата аренды."""
+import asyncio
+from datetime import datetime as dt, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.scheduler import LEASE_NAME, RecurringScheduler
+from app.crud.recurring import recurring_rule_crud
+from app.models import (
+    Expense, Income, Lease, RecurringOccurrence, RecurringRule)
+
+pytestmark = pytest.mark.anyio
+
+# Расход каждый день и доход каждую неделю; end_at ограничивает число
+# повторений, поэтому оно не зависит от времени запуска
+DAILY_OCCURRENCES = 5
+WEEKLY_OCCURRENCES = 4
+PERIOD_DAYS = {'day': 1, 'week': 7}
+
+
+@pytest.fixture
+def batch_size(monkeypatch):
+    # Пакет меньше числа повторений: tick проходит несколько пакетов
+    monkeypatch.setattr(settings, 'recurring_batch_size', 2)
+
+
+async def create_rule(client, kind: str, period: str,
+                      occurrences: int) -> int:
+    """Правило, все occurrences повторений которого уже наступили."""
+    step = timedelta(days=PERIOD_DAYS[period])
+    start = dt.now().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) - 2 * occurrences * step
+    response = await client.post('/api/recurring', json={
+        'kind': kind, 'category_id': 1, 'amount': 100, 'period': period,
+        'start_at': start.isoformat(),
+        'end_at': (start + occurrences * step).isoformat(),
+    })
+    assert response.status_code == 200, response.text
+    return response.json()['id']
+
+
+async def create_rules(client) -> None:
+    await create_rule(client, 'expense', 'day', DAILY_OCCURRENCES)
+    await create_rule(client, 'income', 'week', WEEKLY_OCCURRENCES)
+
+
+async def counts() -> tuple:
+    """Число ключей повторений, различных ключей и записей учета."""
+    async with AsyncSessionLocal() as session:
+        occurrences = await session.scalar(
+            select(func.count()).select_from(RecurringOccurrence)
+        )
+        keys = await session.scalar(select(func.count()).select_from(
+            select(RecurringOccurrence.rule_id, RecurringOccurrence.sequence)
+            .distinct().subquery()
+        ))
+        ledger = 0
+        for model in (Expense, Income):
+            ledger += await session.scalar(
+                select(func.count()).select_from(model)
+            )
+    return occurrences, keys, ledger
+
+
+async def test_tick_twice_inserts_once(client, batch_size):
+    await create_rules(client)
+    expected = DAILY_OCCURRENCES + WEEKLY_OCCURRENCES
+    scheduler = RecurringScheduler()
+    assert await scheduler.tick() == expected
+    assert await scheduler.tick() == 0
+    assert await counts() == (expected, expected, expected)
+    response = await client.get('/api/recurring')
+    assert [rule['next_at'] for rule in response.json()] == [None, None]
+
+
+async def test_stale_rules_do_not_duplicate(client):
+    await create_rules(client)
+    expected = DAILY_OCCURRENCES + WEEKLY_OCCURRENCES
+    async with AsyncSessionLocal() as session:
+        assert await recurring_rule_crud.materialize_due(
+            session, dt.now(), settings.recurring_batch_size
+        ) == expected
+        # Воркер, прочитавший правила до того, как другой их сдвинул,
+        # снова проходит те же повторения: ключи уже есть, записей нет
+        await session.execute(
+            update(RecurringRule).values(
+                sequence=0, next_at=RecurringRule.start_at
+            )
+        )
+        await session.commit()
+        assert await recurring_rule_crud.materialize_due(
+            session, dt.now(), settings.recurring_batch_size
+        ) == expected
+    assert await counts() == (expected, expected, expected)
+
+
+async def test_two_workers_insert_once(client, batch_size):
+    await create_rules(client)
+    expected = DAILY_OCCURRENCES + WEEKLY_OCCURRENCES
+    first, second = RecurringScheduler(), RecurringScheduler()
+    processed = await asyncio.gather(first.tick(), second.tick())
+    assert sorted(processed) == [0, expected]
+    assert await first.tick() + await second.tick() == 0
+    assert await counts() == (expected, expected, expected)
+
+
+async def test_lease_handoff(client, batch_size):
+    first, second = RecurringScheduler(), RecurringScheduler()
+    await create_rule(client, 'expense', 'day', DAILY_OCCURRENCES)
+    assert await first.tick() == DAILY_OCCURRENCES
+    await create_rule(client, 'income', 'week', WEEKLY_OCCURRENCES)
+    # Аренда еще у первого воркера: второй ничего не заносит
+    assert await second.tick() == 0
+    async with AsyncSessionLocal() as session:
+        # Первый воркер упал, срок его аренды истек
+        await session.execute(
+            update(Lease).where(Lease.name == LEASE_NAME).values(
+                expires_at=dt.now() - timedelta(seconds=1)
+            )
+        )
+        await session.commit()
+    assert await second.tick() == WEEKLY_OCCURRENCES
+    assert await first.tick() == 0
+    async with AsyncSessionLocal() as session:
+        assert await session.scalar(
+            select(Lease.owner).where(Lease.name == LEASE_NAME)
+        ) == second.owner
+    expected = DAILY_OCCURRENCES + WEEKLY_OCCURRENCES
+    assert await counts() == (expected, expected, expected)
@@ -0,0 +1,83 @@
+"""Чтения из реплики и возврат к основной БД после записи клиента.
+
+Репликой служит второй файл SQLite: копия основной базы, в которую
+затем добавлен расход, которого нет в основной. По описанию
+возвращенных расходов видно, из какой базы прочитан список.
+"""
+import os
+import sqlite3
+from itertools import cycle
+from time import time
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import db
+from app.core.config import settings
+from tests.conftest import DB_PATH
+
+pytestmark = pytest.mark.anyio
+
+REPLICA_PATH = os.path.join(os.path.dirname(DB_PATH), 'replica.db')
+EXPENSE = {
+    'amount': 10, 'category_id': 1, 'date': '2026-01-01T10:00:00',
+    'is_paid': False,
+}
+
+
+def copy_to_replica() -> None:
+    source = sqlite3.connect(DB_PATH)
+    replica = sqlite3.connect(REPLICA_PATH)
+    source.backup(replica)
+    replica.execute(
+        'INSERT INTO expense (amount, description, category_id, user_id, '
+        "date, created_at, is_paid) VALUES (10, 'реплика', 1, 1, "
+        "'2026-01-01 10:00:00', '2026-01-01 10:00:00', 0)"
+    )
+    replica.commit()
+    replica.close()
+    source.close()
+
+
+@pytest.fixture
+async def replica(client, monkeypatch):
+    copy_to_replica()
+    url = f'sqlite+aiosqlite:///{REPLICA_PATH}'
+    monkeypatch.setattr(settings, 'database_replica_urls', [url])
+    engine = db.create_engine(url)
+    monkeypatch.setattr(db, 'replica_engines', [engine])
+    monkeypatch.setattr(db, 'replica_sessionmakers', cycle([
+        async_sessionmaker(engine, expire_on_commit=False)
+    ]))
+    yield engine
+    await engine.dispose()
+
+
+async def descriptions(client) -> list:
+    response = await client.get('/api/expense')
+    assert response.status_code == 200, response.text
+    return [expense['description'] for expense in response.json()]
+
+
+async def test_reads_go_to_replica_until_write(client, replica):
+    assert await descriptions(client) == ['реплика']
+    response = await client.post(
+        '/api/expense', json={**EXPENSE, 'description': 'основная'}
+    )
+    assert response.status_code == 200, response.text
+    primary_until = float(response.cookies[db.PRIMARY_UNTIL_COOKIE])
+    assert time() < primary_until <= (
+        time() + settings.replica_read_your_writes_seconds
+    )
+    assert await descriptions(client) == ['основная']
+    client.cookies.set(db.PRIMARY_UNTIL_COOKIE, str(time() - 1))
+    assert await descriptions(client) == ['реплика']
+
+
+async def test_failed_write_does_not_stick_to_primary(client, replica):
+    response = await client.post(
+        '/api/expense', json={**EXPENSE, 'category_id': 999}
+    )
+    assert response.status_code == 404
+    assert db.PRIMARY_UNTIL_COOKIE not in response.cookies
+    assert await descriptions(client) == ['реплика']
@@ -0,0 +1,37 @@
+from datetime import datetime as dt
+
+import pytest
+from sqlalchemy import func, select
+
+from app.commands.seed_ledger import (
+    DEFAULT_DOMAIN, DEFAULT_PASSWORD, seed_ledger)
+from app.core.db import AsyncSessionLocal
+from app.models import Expense, Income, User
+
+pytestmark = pytest.mark.anyio
+
+SEED = {
+    'users': 3, 'months': 2, 'seed': 0, 'end': dt(2026, 1, 1),
+    'domain': DEFAULT_DOMAIN, 'password': DEFAULT_PASSWORD,
+}
+
+
+async def counts() -> tuple[int, int, int]:
+    async with AsyncSessionLocal() as session:
+        return tuple([
+            await session.scalar(select(func.count()).select_from(model))
+            for model in (User, Expense, Income)
+        ])
+
+
+async def test_rerun_skips_existing_users(client):
+    first = await seed_ledger(**SEED)
+    assert first['users'] == 3
+    assert first['skipped_users'] == 0
+    assert first['expense'] > 0 and first['income'] > 0
+    seeded = await counts()
+    second = await seed_ledger(**SEED)
+    assert second['users'] == 0
+    assert second['skipped_users'] == 3
+    assert second['expense'] == second['income'] == 0
+    assert await counts() == seeded